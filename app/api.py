@@ -1,13 +1,33 @@
+import asyncio
+import json
 import os
-from fastapi import Depends, FastAPI, HTTPException, Header
+from bisect import bisect_left
+from contextlib import aclosing
+from typing import Literal
+
+from fastapi import Depends, FastAPI, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, Counter
 
 from .logging_setup import setup_logging
-from .db import get_engine
 from .config import settings
+from .api_metrics import ApiMetrics, MetricsMiddleware
+from .columnar import DIMENSIONS, GoldStore, store_window
+from .db_async import AsyncDB
+from .db_instrument import DbMetrics, instrument_engine
+from .geo import GRID_ZOOMS, bbox_tiles, parse_bbox, tile_bounds
+from .keyset import decode_cursor, encode_cursor, row_key, stops_query
+from .export import MEDIA_TYPES, WRITERS, iter_silver_chunks, month_range
+from .http_cache import CompressionMiddleware, conditional_response, make_etag
+from .cache import SliceCache, TTLCache
+from .cache_events import start_done_listener
+from .singleflight import SingleFlight
+from .timeseries import (
+    DAILY_SQL, GRAINS, HOUR_OF_WEEK_SQL, date_series, hour_of_week_series, month_bounds,
+)
+from .utils import last_month_yyyymm, ym_to_date
 
 
 logger = setup_logging(
@@ -31,36 +51,448 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.api_compress_min_bytes)
 
 REGISTRY = CollectorRegistry()
-API_REQS = Counter("api_requests_total", "API requests", ["endpoint"], registry=REGISTRY)
+# per route template: requests, duration, in-flight, response size, DB time
+API_METRICS = ApiMetrics(REGISTRY)
+app.add_middleware(MetricsMiddleware, metrics=API_METRICS, router=app.router)  # outermost
+API_CACHE_HITS = Counter("api_cache_hits_total", "API response cache hits", ["cache"], registry=REGISTRY)
+API_CACHE_MISSES = Counter("api_cache_misses_total", "API response cache misses", ["cache"], registry=REGISTRY)
+API_COALESCED = Counter(
+    "api_coalesced_requests_total", "Requests served by joining an in-flight identical query", ["query"],
+    registry=REGISTRY,
+)
+API_CACHE_INVALIDATIONS = Counter(
+    "api_cache_invalidations_total", "Cache entries evicted by ingest events", ["cache"], registry=REGISTRY
+)
+
+# Gold rows per (force, YYYY-MM). Keys always start with (force, month) so
+# entries for a slice can be evicted together.
+GOLD_CACHE = TTLCache(maxsize=settings.api_cache_max_entries, ttl=settings.api_cache_ttl_seconds)
+# one DB query per key at a time; concurrent misses share its result
+FLIGHTS = SingleFlight()
+# loads that started before an ingest event are not cached (per-slice generation)
+SLICES = SliceCache(GOLD_CACHE, FLIGHTS)
+
+# Gold for the last api_store_months months, columnar in memory (/analytics)
+STORE = GoldStore()
+
+# Handlers are async; blocking pyodbc calls go through DB's own bounded pool
+DB = AsyncDB(
+    settings.database_url,
+    pool_size=settings.api_db_pool_size,
+    max_overflow=settings.api_db_max_overflow,
+    pool_timeout=settings.api_db_pool_timeout,
+    query_timeout=settings.api_query_timeout_seconds,
+)
+instrument_engine(DB.engine, DbMetrics(REGISTRY, prefix="api_db"), slow_ms=settings.db_slow_query_ms)
+
+# Each export holds one pooled connection for its duration; cap them so
+# the short gold queries always have connections left.
+EXPORT_SLOTS = asyncio.Semaphore(settings.api_export_max_concurrent)
+
+class _SlotStreamingResponse(StreamingResponse):
+    """Releases an already-acquired slot once sent, failed or cancelled (even before the body starts)."""
+    def __init__(self, slot: asyncio.Semaphore, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.slot.release()
+
+@app.on_event("startup")
+def subscribe_cache_events():
+    if not settings.api_cache_events:
+        return
+    try:
+        app.state.done_listener = start_done_listener(_on_slice_changed)
+    except Exception:
+        # TTL expiry still bounds staleness; don't block the API on the broker
+        logger.exception("[api] Could not subscribe to ingest events")
 
-@app.middleware("http")
-async def metrics_middleware(request, call_next):
-    resp = await call_next(request)
-    API_REQS.labels(endpoint=request.url.path).inc()
-    return resp
+@app.on_event("startup")
+def load_gold_store():
+    try:
+        _load_store_sync()
+    except Exception:
+        # /analytics retries the load on first use
+        logger.exception("[api] Could not load the gold store")
 
-def require_api_key(x_api_key: str = Header(default=None)):
+@app.on_event("shutdown")
+def unsubscribe_cache_events():
+    listener = getattr(app.state, "done_listener", None)
+    if listener:
+        listener.disconnect()
+    DB.close()
+
+async def require_api_key(x_api_key: str = Header(default=None)):
     if API_KEY and x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Unauthorized")
     return True
 
 @app.get("/metrics")
-def metrics():
+async def metrics():
     return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/")
-def root():
+async def root():
     return {"name": "Stop & Search API", "docs": "/docs", "health": "/health"}
 
 @app.get("/health")
-def health():
+async def health():
     return {"ok": True}
 
 @app.get("/forces", dependencies=[Depends(require_api_key)])
-def list_forces():
+async def list_forces(request: Request):
     sql = text("SELECT id, name FROM dbo.dim_force ORDER BY name;")
-    with get_engine(settings.database_url).connect() as conn:
-        rows = conn.execute(sql).mappings().all()
+    rows, shared = await FLIGHTS.do(("forces",), lambda: DB.fetch_all(sql), request=request)
+    if shared:
+        API_COALESCED.labels(query="forces").inc()
     return {"forces": rows}
+
+async def _cached(name: str, key: tuple, loader, request: Request | None = None):
+    value, how = await SLICES.get(name, key, loader, request)
+    if how == "hit":
+        API_CACHE_HITS.labels(cache=name).inc()
+        return value
+    API_CACHE_MISSES.labels(cache=name).inc()
+    if how == "shared":
+        API_COALESCED.labels(query=name).inc()
+    return value
+
+_GOLD_OUTCOMES_SQL = text("""
+    SELECT outcome, [count], updated_at
+    FROM dbo.gold_monthly_outcomes
+    WHERE force_id = :force AND [month] = :month
+    ORDER BY [count] DESC, outcome;
+""").execution_options(statement_name="api_gold_outcomes")
+
+def _gold_slice(rows: list[dict]) -> dict:
+    """
+    Cached value for one (force, month): outcome rows plus the gold data
+    version (latest updated_at) used for ETags, and a memo of rendered bodies.
+    """
+    versions = [r["updated_at"] for r in rows if r.get("updated_at") is not None]
+    return {
+        "outcomes": [{"outcome": r["outcome"], "count": r["count"]} for r in rows],
+        "version": str(max(versions)) if versions else "",
+        "rendered": {},
+    }
+
+async def _gold_outcomes(force: str, ym: str) -> dict:
+    # no request-bound cancellation here: SingleFlight cancels once every waiter is gone
+    return _gold_slice(await DB.fetch_all(_GOLD_OUTCOMES_SQL, {"force": force, "month": ym_to_date(ym)}))
+
+def _on_slice_changed(force: str, ym: str):
+    """
+    Ingest finished for (force, month): drop only that slice's cache entries
+    first (in memory, cannot fail), then update that slice in the gold store
+    and, with API_CACHE_REFRESH_ON_EVENT, reload it. Refresh failures are
+    logged, never raised: the next request loads the evicted slice, and a
+    store that missed an update is reloaded in full on next use.
+    """
+    dropped = SLICES.invalidate(force, ym)
+    API_CACHE_INVALIDATIONS.labels(cache="gold").inc(dropped)
+    # runs on the MQ receiver thread, so the sync path is fine here
+    if STORE.loaded:
+        try:
+            STORE.replace_slice(force, ym, DB.fetch_all_sync(_STORE_SLICE_SQL, {"force": force, "month": ym_to_date(ym)}))
+        except Exception:
+            STORE.loaded = False  # stale: /analytics reloads it on next use
+            logger.exception("[api] Gold store refresh for %s %s failed", force, ym)
+    if dropped and settings.api_cache_refresh_on_event:
+        try:
+            generation = SLICES.generation(force, ym)
+            rows = DB.fetch_all_sync(_GOLD_OUTCOMES_SQL, {"force": force, "month": ym_to_date(ym)})
+            SLICES.put((force, ym), _gold_slice(rows), generation)
+        except Exception:
+            logger.exception("[api] Cache refresh for %s %s failed", force, ym)
+
+async def _last_month_slice(force: str, request: Request) -> tuple[str, dict]:
+    ym = last_month_yyyymm()
+    return ym, await _cached("gold", (force, ym), lambda: _gold_outcomes(force, ym), request)
+
+def _cache_control() -> str:
+    scope = "private" if API_KEY else "public"
+    return f"{scope}, max-age={settings.api_http_max_age}"
+
+def _gold_response(request: Request, kind: str, force: str, ym: str, gold: dict, build) -> Response:
+    """
+    Conditional JSON response for a cached gold slice (build gets the slice).
+    The ETag derives from the endpoint, slice and gold version; the serialized
+    body is memoized on the cached slice, so polling clients cost neither a
+    query nor a json.dumps.
+    """
+    def render() -> bytes:
+        body = gold["rendered"].get(kind)
+        if body is None:
+            body = json.dumps(build(gold), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            gold["rendered"][kind] = body
+        return body
+    etag = make_etag(kind, force, ym, gold["version"])
+    return conditional_response(request, etag, _cache_control(), render)
+
+@app.get("/outcomes/last-month", dependencies=[Depends(require_api_key)])
+async def outcomes_last_month(request: Request, force: str = Query(..., description="force id, e.g. metropolitan")):
+    ym, gold = await _last_month_slice(force, request)
+    return _gold_response(request, "outcomes", force, ym, gold,
+                          lambda g: {"force": force, "month": ym, "outcomes": g["outcomes"]})
+
+def _stats(force: str, ym: str, outcomes: list[dict]) -> dict:
+    total = sum(o["count"] for o in outcomes)
+    return {
+        "force": force,
+        "month": ym,
+        "total": total,
+        "outcome_types": len(outcomes),
+        "top_outcome": outcomes[0]["outcome"] if outcomes else None,
+        "shares": {o["outcome"]: round(o["count"] / total, 4) for o in outcomes} if total else {},
+    }
+
+@app.get("/stats/last-month", dependencies=[Depends(require_api_key)])
+async def stats_last_month(request: Request, force: str = Query(..., description="force id, e.g. metropolitan")):
+    ym, gold = await _last_month_slice(force, request)
+    return _gold_response(request, "stats", force, ym, gold, lambda g: _stats(force, ym, g["outcomes"]))
+
+_YM = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+@app.get("/export", dependencies=[Depends(require_api_key)])
+async def export_silver(
+    force: str = Query(..., description="force id, e.g. metropolitan"),
+    start: str = Query(..., pattern=_YM, description="first month, YYYY-MM"),
+    end: str | None = Query(None, pattern=_YM, description="last month, YYYY-MM (default: start)"),
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+):
+    """
+    Stream silver stop-and-search rows for a force and month range. Rows are
+    read per month through a cursor in chunks and written out as they
+    arrive, so memory stays flat whatever the size of the range.
+    """
+    months = month_range(start, end or start)
+    if not months:
+        raise HTTPException(status_code=400, detail="end is before start")
+    if len(months) > settings.api_export_max_months:
+        raise HTTPException(status_code=400, detail=f"At most {settings.api_export_max_months} months per export")
+    if EXPORT_SLOTS.locked():
+        raise HTTPException(status_code=429, detail="Too many exports in progress", headers={"Retry-After": "5"})
+    # take the slot now, not when the body starts: checks made before any body
+    # ran would all pass. No await since locked(), so this never waits.
+    await EXPORT_SLOTS.acquire()
+
+    async def body():
+        chunks = WRITERS[format](iter_silver_chunks(
+            DB.engine, force, months,
+            chunk_rows=settings.api_export_chunk_rows,
+            timeout=settings.api_export_query_timeout_seconds,
+        ))
+        async with aclosing(DB.stream(chunks)) as stream:
+            async for data in stream:
+                yield data
+
+    filename = f"stop-search_{force}_{months[0]}_{months[-1]}.{format}"
+    return _SlotStreamingResponse(EXPORT_SLOTS, body(), media_type=MEDIA_TYPES[format],
+                                  headers={"Content-Disposition": f'attachment; filename="{filename}"',
+                                           "Cache-Control": "no-store"})
+
+@app.get("/stops", dependencies=[Depends(require_api_key)])
+async def list_stops(
+    request: Request,
+    force: str = Query(..., description="force id, e.g. metropolitan"),
+    start: str = Query(..., pattern=_YM, description="first month, YYYY-MM"),
+    end: str | None = Query(None, pattern=_YM, description="last month, YYYY-MM (default: start)"),
+    outcome: str | None = None,
+    ethnicity: str | None = Query(None, description="officer-defined ethnicity"),
+    legislation: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+):
+    """Individual stops, keyset-paginated: pass next_cursor back to get the following page."""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    sql, params = stops_query({"outcome": outcome, "ethnicity": ethnicity, "legislation": legislation}, after)
+    params.update(force=force, start_month=ym_to_date(start), end_month=ym_to_date(end or start), limit=limit + 1)
+    rows = await DB.fetch_all(sql, params, request=request)
+
+    page = rows[:limit]
+    next_cursor = encode_cursor(row_key(page[-1])) if len(rows) > limit else None
+    for r in page:
+        del r["stop_datetime_key"]
+    return {"force": force, "stops": page, "next_cursor": next_cursor}
+
+# ---------- spatial grid (dbo.gold_grid_cells) ----------
+_GRID_CELLS_SQL = text("""
+    SELECT tile_x, tile_y, [count], lat_avg, lon_avg, updated_at
+    FROM dbo.gold_grid_cells
+    WHERE force_id = :force AND [month] = :month AND zoom = :zoom;
+""").execution_options(statement_name="api_grid_cells")
+
+def _grid_layer(rows: list[dict]) -> dict:
+    """Cached value for one (force, month, zoom): cells sorted by tile, plus version and render memo."""
+    versions = [r["updated_at"] for r in rows if r.get("updated_at") is not None]
+    cells = sorted((r["tile_x"], r["tile_y"], r["count"], r["lat_avg"], r["lon_avg"]) for r in rows)
+    return {"cells": cells, "version": str(max(versions)) if versions else "", "rendered": {}}
+
+async def _grid_slice(force: str, ym: str, zoom: int, request: Request) -> dict:
+    async def load():
+        return _grid_layer(await DB.fetch_all(_GRID_CELLS_SQL, {"force": force, "month": ym_to_date(ym), "zoom": zoom}))
+    return await _cached("grid", (force, ym, "grid", zoom), load, request)
+
+def _check_zoom(zoom: int):
+    if zoom not in GRID_ZOOMS:
+        raise HTTPException(status_code=400, detail=f"zoom must be one of {list(GRID_ZOOMS)}")
+
+@app.get("/heatmap", dependencies=[Depends(require_api_key)])
+async def heatmap(
+    request: Request,
+    force: str = Query(..., description="force id, e.g. metropolitan"),
+    month: str | None = Query(None, pattern=_YM, description="YYYY-MM (default: last month)"),
+    zoom: int = Query(12, description=f"grid zoom, one of {list(GRID_ZOOMS)}"),
+):
+    """Heatmap points [lat, lon, count] (cell centroid of its stops) for a force-month."""
+    _check_zoom(zoom)
+    ym = month or last_month_yyyymm()
+    grid = await _grid_slice(force, ym, zoom, request)
+    return _gold_response(request, f"heatmap:{zoom}", force, ym, grid, lambda g: {
+        "force": force, "month": ym, "zoom": zoom,
+        "points": [[round(lat, 5), round(lon, 5), n] for _, _, n, lat, lon in g["cells"]],
+    })
+
+@app.get("/cells", dependencies=[Depends(require_api_key)])
+async def cells_in_bbox(
+    request: Request,
+    force: str = Query(..., description="force id, e.g. metropolitan"),
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    month: str | None = Query(None, pattern=_YM, description="YYYY-MM (default: last month)"),
+    zoom: int = Query(14, description=f"grid zoom, one of {list(GRID_ZOOMS)}"),
+):
+    """Grid cells (tile, bounds, stop count) intersecting a bounding box."""
+    _check_zoom(zoom)
+    try:
+        x0, y0, x1, y1 = bbox_tiles(parse_bbox(bbox), zoom)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+    ym = month or last_month_yyyymm()
+    grid = await _grid_slice(force, ym, zoom, request)
+    # cells are sorted by (x, y): slice the x range, then filter y
+    lo = bisect_left(grid["cells"], (x0,))
+    hi = bisect_left(grid["cells"], (x1 + 1,))
+    cells = [
+        {"x": x, "y": y, "count": n, "bounds": [round(v, 6) for v in tile_bounds(x, y, zoom)]}
+        for x, y, n, _, _ in grid["cells"][lo:hi]
+        if y0 <= y <= y1
+    ]
+    return {"force": force, "month": ym, "zoom": zoom, "total": sum(c["count"] for c in cells), "cells": cells}
+
+@app.get("/timeseries", dependencies=[Depends(require_api_key)])
+async def timeseries(
+    request: Request,
+    force: str = Query(..., description="force id, e.g. metropolitan"),
+    start: str = Query(..., pattern=_YM, description="first month, YYYY-MM"),
+    end: str | None = Query(None, pattern=_YM, description="last month, YYYY-MM (default: last month)"),
+    grain: Literal[GRAINS] = "day",
+):
+    """
+    Stop counts over time from the daily / hour-of-week rollups only, so a
+    multi-year range reads a few hundred rows per year, not the fact table.
+    """
+    end = end or last_month_yyyymm()
+    if end < start:
+        raise HTTPException(status_code=400, detail="end is before start")
+    try:
+        first, last = month_bounds(start, end, max_months=settings.api_timeseries_max_months)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    params = {"force": force, "start_month": ym_to_date(start), "end_month": ym_to_date(end)}
+    if grain == "hour_of_week":
+        series = hour_of_week_series(await DB.fetch_all(HOUR_OF_WEEK_SQL, params, request=request))
+    else:
+        series = date_series(await DB.fetch_all(DAILY_SQL, params, request=request), first, last, grain)
+    return {"force": force, "start": start, "end": end, "grain": grain, "series": series}
+
+# ---------- in-memory analytics over gold (GoldStore) ----------
+_STORE_SQL = text("""
+    SELECT force_id, [month], outcome, [count], updated_at
+    FROM dbo.gold_monthly_outcomes
+    WHERE [month] >= :since;
+""").execution_options(statement_name="api_store_load")
+_STORE_SLICE_SQL = text("""
+    SELECT force_id, [month], outcome, [count], updated_at
+    FROM dbo.gold_monthly_outcomes
+    WHERE force_id = :force AND [month] = :month;
+""").execution_options(statement_name="api_store_slice")
+
+def _store_since() -> str:
+    return ym_to_date(store_window(last_month_yyyymm(), settings.api_store_months)[0])
+
+def _require_store_window(start: str | None, end: str | None):
+    """The store only holds the last API_STORE_MONTHS months; a range outside them would be partial or empty."""
+    first, last = store_window(last_month_yyyymm(), settings.api_store_months)
+    if any(ym and not first <= ym <= last for ym in (start, end)):
+        raise HTTPException(status_code=400,
+                            detail=f"analytics covers {first}..{last} (API_STORE_MONTHS); use /timeseries for other months")
+
+def _load_store_sync():
+    rows = DB.fetch_all_sync(_STORE_SQL, {"since": _store_since()})
+    STORE.load(rows)
+    logger.info("[api] Gold store loaded: %d rows", len(rows))
+
+async def _ensure_store():
+    if STORE.loaded:
+        return
+    async def load():
+        STORE.load(await DB.fetch_all(_STORE_SQL, {"since": _store_since()}))
+    await FLIGHTS.do(("store",), load)
+
+def _csv_param(value: str | None) -> list[str] | None:
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+def _store_response(request: Request, kind: str, build) -> Response:
+    """Conditional JSON from the store; the ETag is the query plus the store version."""
+    etag = make_etag(kind, str(request.query_params), STORE.version)
+    return conditional_response(
+        request, etag, _cache_control(),
+        lambda: json.dumps(build(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+    )
+
+@app.get("/analytics/outcomes", dependencies=[Depends(require_api_key)])
+async def analytics_outcomes(
+    request: Request,
+    force: str | None = Query(None, description="comma-separated force ids (default: all)"),
+    outcome: str | None = Query(None, description="comma-separated outcomes (default: all)"),
+    start: str | None = Query(None, pattern=_YM, description="first month, YYYY-MM"),
+    end: str | None = Query(None, pattern=_YM, description="last month, YYYY-MM"),
+    group_by: str = Query("outcome", description=f"comma-separated, from {list(DIMENSIONS)}"),
+):
+    """Filtered, grouped gold counts answered from memory (no database round-trip)."""
+    by = _csv_param(group_by) or []
+    if any(d not in DIMENSIONS for d in by) or len(set(by)) != len(by):
+        raise HTTPException(status_code=400, detail=f"group_by must be distinct values from {list(DIMENSIONS)}")
+    _require_store_window(start, end)
+    await _ensure_store()
+    return _store_response(request, "analytics:outcomes", lambda: {
+        "group_by": by,
+        "rows": STORE.group_counts(by, forces=_csv_param(force), outcomes=_csv_param(outcome), start=start, end=end),
+    })
+
+@app.get("/analytics/compare", dependencies=[Depends(require_api_key)])
+async def analytics_compare(
+    request: Request,
+    forces: str = Query(..., description="comma-separated force ids, e.g. metropolitan,city-of-london"),
+    start: str | None = Query(None, pattern=_YM, description="first month, YYYY-MM"),
+    end: str | None = Query(None, pattern=_YM, description="last month, YYYY-MM"),
+):
+    """Outcome mix of several forces over the same period, side by side."""
+    names = _csv_param(forces)
+    if not names:
+        raise HTTPException(status_code=400, detail="forces is required")
+    _require_store_window(start, end)
+    await _ensure_store()
+    return _store_response(request, "analytics:compare", lambda: {
+        "start": start, "end": end, "forces": STORE.compare(names, start=start, end=end),
+    })
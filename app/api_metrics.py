@@ -0,0 +1,93 @@
+# app/api_metrics.py
+from __future__ import annotations
+
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .db_async import DB_TIME
+
+UNMATCHED = "<unmatched>"
+
+_LATENCY_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1 << 20, 4 << 20, 16 << 20, 64 << 20, 256 << 20)
+
+
+class ApiMetrics:
+    """
+    Request metrics labelled by route template ("/stops", never "/stops?..."
+    or a concrete path), HTTP method and status class, so label cardinality
+    is bounded by the route table.
+    """
+    def __init__(self, registry: CollectorRegistry):
+        self.requests = Counter(
+            "api_requests_total", "API requests", ["route", "method", "status_class"], registry=registry
+        )
+        self.duration = Histogram(
+            "api_request_duration_seconds", "API request duration, until the last body byte is sent",
+            ["route", "method"], buckets=_LATENCY_BUCKETS, registry=registry,
+        )
+        self.in_flight = Gauge("api_requests_in_flight", "API requests being served", ["route"], registry=registry)
+        self.response_size = Histogram(
+            "api_response_size_bytes", "API response body size as sent (after compression)", ["route"],
+            buckets=_SIZE_BUCKETS, registry=registry,
+        )
+        self.db_time = Histogram(
+            "api_request_db_seconds", "Time a request spent waiting on the database", ["route"],
+            buckets=_LATENCY_BUCKETS, registry=registry,
+        )
+
+
+def route_template(router: Router, scope: Scope) -> str:
+    """Path template of the route that will handle scope (a method mismatch still names the route)."""
+    partial = None
+    for route in router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED
+
+
+class MetricsMiddleware:
+    """Pure ASGI, so it also times streaming bodies to the end; add it outermost."""
+    def __init__(self, app: ASGIApp, metrics: ApiMetrics, router: Router):
+        self.app = app
+        self.metrics = metrics
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(self.router, scope)
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        m = self.metrics
+        db_time = [0.0]
+        token = DB_TIME.set(db_time)
+        m.in_flight.labels(route=route).inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            m.duration.labels(route=route, method=method).observe(time.perf_counter() - t0)
+            m.in_flight.labels(route=route).dec()
+            m.requests.labels(route=route, method=method, status_class=f"{status // 100}xx").inc()
+            m.response_size.labels(route=route).observe(size)
+            m.db_time.labels(route=route).observe(db_time[0])
+            DB_TIME.reset(token)
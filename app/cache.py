@@ -0,0 +1,116 @@
+# app/cache.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from .singleflight import SingleFlight
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process TTL + LRU cache (thread-safe).
+    Entries expire `ttl` seconds after they were stored; once `maxsize`
+    entries are held, the least recently used one is dropped.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires <= self._clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return item[1] if item else None
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate. Returns number dropped."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SliceCache:
+    """
+    TTLCache of per-(force, month) values (keys start with (force, month)),
+    loaded once per key at a time through SingleFlight.
+
+    invalidate() drops a slice's entries and bumps its generation. A load
+    that was already in flight returns its result to its own callers but
+    does not cache it (it may predate the ingest that triggered the
+    invalidation), and callers arriving after the bump start a fresh load
+    instead of joining it.
+    """
+    def __init__(self, cache: TTLCache, flights: SingleFlight):
+        self.cache = cache
+        self.flights = flights
+        self._generations: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, force: str, ym: str) -> int:
+        with self._lock:
+            return self._generations.get((force, ym), 0)
+
+    def invalidate(self, force: str, ym: str) -> int:
+        """Bump the slice's generation, then drop its entries. Returns number dropped."""
+        with self._lock:
+            self._generations[(force, ym)] = self._generations.get((force, ym), 0) + 1
+        return self.cache.evict(lambda k: k[:2] == (force, ym))
+
+    def put(self, key: tuple, value: Any, generation: int) -> bool:
+        """Cache value unless key's slice was invalidated since `generation` was read."""
+        with self._lock:
+            if self._generations.get(key[:2], 0) != generation:
+                return False
+            self.cache.set(key, value)
+            return True
+
+    async def get(self, name: str, key: tuple, loader: Callable[[], Awaitable[Any]],
+                  request: Any = None) -> tuple[Any, str]:
+        """Returns (value, how); how is "hit", "miss" (this caller loaded) or "shared" (joined a load)."""
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value, "hit"
+        generation = self.generation(*key[:2])
+
+        async def load():
+            loaded = await loader()
+            self.put(key, loaded, generation)
+            return loaded
+
+        value, shared = await self.flights.do((name, generation, *key), load, request=request)
+        return value, "shared" if shared else "miss"
@@ -0,0 +1,47 @@
+# app/cache_events.py
+from __future__ import annotations
+
+import logging
+from typing import Callable
+
+from .config import settings
+from .mq import MQClient
+
+
+def make_done_handler(on_slice_changed: Callable[[str, str], None]):
+    """
+    Build an MQ handler for job-completion messages
+    ({"force": ..., "month": "YYYY-MM", "status": "ok", ...}).
+    Successful jobs call on_slice_changed(force, month); errors changed nothing.
+    A failing callback is logged, not raised: the message is consumed either
+    way (a redelivery or the DLQ would not make it succeed), and the callback
+    evicts before it does anything that can fail.
+    """
+    def handler(body: dict, headers: dict):
+        if body.get("status") != "ok":
+            return
+        force, ym = body.get("force"), body.get("month")
+        if not force or not ym:
+            logging.warning("[cache-events] Ignoring malformed done message: %s", body)
+            return
+        try:
+            on_slice_changed(force, ym)
+        except Exception:
+            logging.exception("[cache-events] Handling %s %s failed", force, ym)
+    return handler
+
+
+def start_done_listener(on_slice_changed: Callable[[str, str], None],
+                        destination: str | None = None) -> MQClient:
+    """
+    Subscribe (on stomp.py's receiver thread) to the worker's done stream.
+
+    The done destination is a queue, so every consumer competes for messages:
+    run one API instance per queue, or point MQ_QUEUE_DONE at a topic
+    (/topic/...) when scaling the API out.
+    """
+    destination = destination or settings.mq_queue_done
+    mq = MQClient(settings.mq_host, settings.mq_port, settings.mq_user, settings.mq_password)
+    mq.subscribe_json(destination, make_done_handler(on_slice_changed))
+    logging.info("[cache-events] Subscribed to %s", destination)
+    return mq
@@ -0,0 +1,104 @@
+# app/circuit_breaker.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from .config import settings
+from .metrics import CIRCUIT_REJECTED_TOTAL, CIRCUIT_STATE
+
+
+class RetryLater(Exception):
+    """
+    The call failed in a way worth retrying later rather than now.
+    retry_after: seconds the upstream asked for (Retry-After, open circuit), if known.
+    """
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RetryLater):
+    """Rejected without calling: the endpoint's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+      closed     calls go through; failure_threshold consecutive failures open it
+      open       calls fail fast with CircuitOpenError until reset_seconds pass
+      half_open  one trial call; success closes, failure re-opens
+    """
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        self._set(self.CLOSED)
+
+    def _set(self, state: str):
+        self.state = state
+        CIRCUIT_STATE.labels(endpoint=self.name).set(self._GAUGE[state])
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_seconds - self.clock()
+                if remaining > 0:
+                    CIRCUIT_REJECTED_TOTAL.labels(endpoint=self.name).inc()
+                    raise CircuitOpenError(f"circuit open for {self.name}", retry_after=remaining)
+                self._set(self.HALF_OPEN)
+                self._trial = False
+            if self.state == self.HALF_OPEN:
+                if self._trial:
+                    CIRCUIT_REJECTED_TOTAL.labels(endpoint=self.name).inc()
+                    raise CircuitOpenError(f"circuit half-open for {self.name}", retry_after=self.reset_seconds)
+                self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial = False
+            if self.state != self.CLOSED:
+                self._set(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                self._set(self.OPEN)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def endpoint_key(url: str) -> str:
+    """host + path: one circuit per API endpoint, whatever the query string."""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """Shared breaker for url's endpoint (CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)."""
+    key = endpoint_key(url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, settings.circuit_failure_threshold, settings.circuit_reset_seconds)
+            _breakers[key] = breaker
+        return breaker
@@ -1,15 +1,29 @@
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from .disk_cache import http_cache
+
 BASE = "https://data.police.uk/api"
 
 class RateLimitError(Exception): ...
 @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=30), reraise=True)
-def _get(url: str, params: dict | None = None):
+def _fetch(url: str, params: dict | None = None) -> requests.Response:
     r = requests.get(url, params=params, timeout=30)
     if r.status_code == 429:
         raise RateLimitError("Rate limited")
     r.raise_for_status()
+    return r
+
+def _get(url: str, params: dict | None = None):
+    # on-disk cache first (HTTP_CACHE_DIR), see app/disk_cache.py
+    cache = http_cache()
+    if cache is not None:
+        hit = cache.get(url, params)
+        if hit is not None:
+            return hit.to_response(url).json()
+    r = _fetch(url, params)
+    if cache is not None:
+        cache.put_safe(url, params, r.content, r.headers.get("Content-Type"))
     return r.json()
 
 def list_forces():
@@ -0,0 +1,213 @@
+# app/columnar.py
+from __future__ import annotations
+
+import datetime as dt
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# group-by / filter dimensions of dbo.gold_monthly_outcomes
+DIMENSIONS = ("force", "month", "outcome")
+# largest group-key space aggregated with a dense bincount instead of a sort
+_DENSE_GROUPS = 1 << 20
+
+
+class _Dictionary:
+    """
+    String <-> int32 code. Codes are append-only, so a code seen in any
+    snapshot stays decodable while writers add new values.
+    """
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.codes.get(value)
+
+
+class _Columns:
+    """One immutable snapshot of the table; readers never see a partial update."""
+    __slots__ = ("force", "month", "outcome", "count", "updated")
+
+    def __init__(self, force, month, outcome, count, updated):
+        self.force, self.month, self.outcome, self.count = force, month, outcome, count
+        self.updated = updated  # updated_at as epoch seconds (0 when unknown)
+
+    @classmethod
+    def empty(cls) -> "_Columns":
+        i32, i64 = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        return cls(i32, i32, i32, i64, i64)
+
+    def __len__(self):
+        return len(self.count)
+
+
+def _month_key(value) -> int:
+    """date / 'YYYY-MM[-DD]' -> YYYYMM int (orders like the month)."""
+    if isinstance(value, dt.date):
+        return value.year * 100 + value.month
+    y, m = str(value)[:7].split("-")
+    return int(y) * 100 + int(m)
+
+
+def _epoch(value) -> int:
+    """updated_at (datetime, driver string or None; UTC) -> epoch seconds."""
+    if value is None:
+        return 0
+    if not isinstance(value, dt.datetime):
+        value = dt.datetime.fromisoformat(str(value))
+    return int(value.replace(tzinfo=dt.timezone.utc).timestamp())
+
+
+def _month_label(key: int) -> str:
+    return f"{key // 100:04d}-{key % 100:02d}"
+
+
+def store_window(last_ym: str, months: int) -> tuple[str, str]:
+    """(first, last) YYYY-MM of the `months` months ending at last_ym that the store holds."""
+    y, m = map(int, last_ym.split("-"))
+    k = y * 12 + m - 1 - (months - 1)
+    return f"{k // 12:04d}-{k % 12 + 1:02d}", last_ym
+
+
+class GoldStore:
+    """
+    In-memory columnar copy of dbo.gold_monthly_outcomes for the API hot set.
+
+    Columns are NumPy arrays; force and outcome are dictionary-encoded to
+    int32 codes, months are YYYYMM ints. Writers (startup load, ingest events
+    on the MQ thread) build a new snapshot and swap it in under a lock;
+    readers take the current snapshot reference and work on it lock-free.
+    `version` (latest updated_at and row count) is meant for ETags. It is
+    derived from the data, so every API process holding the same gold rows
+    reports the same version.
+    """
+    def __init__(self):
+        self.forces = _Dictionary()
+        self.outcomes = _Dictionary()
+        self._cols = _Columns.empty()
+        self._lock = threading.Lock()
+        self.version = "0-0"
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._cols)
+
+    # ---------- writes ----------
+    def _encode(self, rows: Sequence[dict]) -> _Columns:
+        n = len(rows)
+        force = np.fromiter((self.forces.encode(r["force_id"]) for r in rows), dtype=np.int32, count=n)
+        month = np.fromiter((_month_key(r["month"]) for r in rows), dtype=np.int32, count=n)
+        outcome = np.fromiter((self.outcomes.encode(r["outcome"]) for r in rows), dtype=np.int32, count=n)
+        count = np.fromiter((r["count"] for r in rows), dtype=np.int64, count=n)
+        updated = np.fromiter((_epoch(r.get("updated_at")) for r in rows), dtype=np.int64, count=n)
+        return _Columns(force, month, outcome, count, updated)
+
+    def _swap(self, cols: _Columns) -> None:
+        self._cols = cols
+        self.version = f"{int(cols.updated.max()) if len(cols) else 0}-{len(cols)}"
+
+    def load(self, rows: Sequence[dict]) -> None:
+        """Replace everything (rows: force_id, month, outcome, count, updated_at)."""
+        with self._lock:
+            self._swap(self._encode(rows))
+            self.loaded = True
+
+    def replace_slice(self, force: str, ym: str, rows: Sequence[dict]) -> None:
+        """Swap in the current gold rows of one (force, month); O(table) copy, i.e. microseconds here."""
+        with self._lock:
+            cur = self._cols
+            f, m = self.forces.encode(force), _month_key(ym)
+            keep = ~((cur.force == f) & (cur.month == m))
+            new = self._encode(rows)
+            self._swap(_Columns(*(np.concatenate([getattr(cur, c)[keep], getattr(new, c)])
+                                  for c in _Columns.__slots__)))
+
+    # ---------- reads ----------
+    def mask(self, forces: Optional[Iterable[str]] = None, start: Optional[str] = None,
+             end: Optional[str] = None, outcomes: Optional[Iterable[str]] = None):
+        """Boolean row mask (None: no filter) plus the snapshot it applies to."""
+        cols = self._cols
+        if forces is None and outcomes is None and start is None and end is None:
+            return cols, None
+        m = np.ones(len(cols), dtype=bool)
+        if forces is not None:
+            codes = [c for c in (self.forces.lookup(f) for f in forces) if c is not None]
+            m &= np.isin(cols.force, codes)
+        if outcomes is not None:
+            codes = [c for c in (self.outcomes.lookup(o) for o in outcomes) if c is not None]
+            m &= np.isin(cols.outcome, codes)
+        if start is not None:
+            m &= cols.month >= _month_key(start)
+        if end is not None:
+            m &= cols.month <= _month_key(end)
+        return cols, m
+
+    def group_counts(self, by: Sequence[str], **filters) -> List[dict]:
+        """
+        Summed counts grouped by any of DIMENSIONS (in the given order), sorted
+        by group key. With no dimensions, a single total row.
+        """
+        cols, m = self.mask(**filters)
+        pick = (lambda a: a) if m is None else (lambda a: a[m])
+        counts = pick(cols.count)
+        if not by:
+            return [{"count": int(counts.sum())}]
+
+        # one int64 key per row in mixed radix over the selected columns
+        # (offset by each column's minimum to keep the key space small)
+        arrays = [pick(getattr(cols, d)) for d in by]
+        offsets = [int(a.min()) if len(a) else 0 for a in arrays]
+        arrays = [a.astype(np.int64) - o for a, o in zip(arrays, offsets)]
+        radices = [int(a.max()) + 1 if len(a) else 1 for a in arrays]
+        key = arrays[0]
+        for a, r in zip(arrays[1:], radices[1:]):
+            key = key * r + a
+        space = int(np.prod(radices))
+        if space <= _DENSE_GROUPS:
+            # small key space (the usual case): direct bincount, no sort
+            uniq = np.flatnonzero(np.bincount(key, minlength=space))
+            sums = np.bincount(key, weights=counts, minlength=space)[uniq]
+        else:
+            uniq, inverse = np.unique(key, return_inverse=True)
+            sums = np.bincount(inverse, weights=counts, minlength=len(uniq))
+
+        decoded = []
+        for r in reversed(radices):
+            decoded.append(uniq % r)
+            uniq = uniq // r
+        decoded.reverse()
+
+        columns = []
+        for codes, d, o in zip(decoded, by, offsets):
+            codes = (codes + o).tolist()
+            if d == "month":
+                names = {c: _month_label(c) for c in set(codes)}
+                columns.append([names[c] for c in codes])
+            else:
+                values = (self.forces if d == "force" else self.outcomes).values
+                columns.append([values[c] for c in codes])
+        columns.append(sums.astype(np.int64).tolist())
+        names = (*by, "count")
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    def compare(self, forces: Sequence[str], start: Optional[str] = None, end: Optional[str] = None) -> Dict:
+        """Per-force totals and outcome shares over the same period, side by side."""
+        rows = self.group_counts(("force", "outcome"), forces=forces, start=start, end=end)
+        out = {f: {"total": 0, "outcomes": {}} for f in forces}
+        for r in rows:
+            out[r["force"]]["outcomes"][r["outcome"]] = {"count": r["count"]}
+            out[r["force"]]["total"] += r["count"]
+        for f in out.values():
+            for o in f["outcomes"].values():
+                o["share"] = round(o["count"] / f["total"], 4) if f["total"] else 0.0
+        return out
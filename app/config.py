@@ -19,6 +19,8 @@ class Settings(BaseSettings):
         alias="FORCES"
     )
     cron_schedule: str = Field("10 3 * * *", alias="CRON_SCHEDULE")
+    # re-read force display names from the Police API at most this often
+    force_names_max_age_seconds: float = Field(7 * 86400, alias="FORCE_NAMES_MAX_AGE_SECONDS")
 
     @property
     def forces(self) -> List[str]:
@@ -53,6 +55,60 @@ class Settings(BaseSettings):
     # Metrics
     # ----------------
     metrics_port: int = Field(9000, alias="METRICS_PORT")
+    # log database statements slower than this
+    db_slow_query_ms: float = Field(1000.0, alias="DB_SLOW_QUERY_MS")
+    # per-job stage timings as JSON lines (empty: off)
+    trace_file: str = Field("", alias="TRACE_FILE")
+
+    # ----------------
+    # Upstream circuit breaker (app/circuit_breaker.py)
+    # ----------------
+    # open after N consecutive failures, let one trial call through after M seconds
+    circuit_failure_threshold: int = Field(5, alias="CIRCUIT_FAILURE_THRESHOLD")
+    circuit_reset_seconds: float = Field(30.0, alias="CIRCUIT_RESET_SECONDS")
+
+    # ----------------
+    # On-disk Police API response cache (app/disk_cache.py)
+    # ----------------
+    # empty: off
+    http_cache_dir: str = Field("", alias="HTTP_CACHE_DIR")
+    http_cache_max_mb: int = Field(2048, alias="HTTP_CACHE_MAX_MB")
+    # months older than the last N are historical (immutable)
+    http_cache_recent_months: int = Field(3, alias="HTTP_CACHE_RECENT_MONTHS")
+    # TTLs in seconds per endpoint class (0: don't cache)
+    http_cache_ttl_historical: float = Field(90 * 86400, alias="HTTP_CACHE_TTL_HISTORICAL")
+    http_cache_ttl_recent: float = Field(6 * 3600, alias="HTTP_CACHE_TTL_RECENT")
+    http_cache_ttl_availability: float = Field(3600, alias="HTTP_CACHE_TTL_AVAILABILITY")
+    http_cache_ttl_reference: float = Field(86400, alias="HTTP_CACHE_TTL_REFERENCE")
+
+    # ----------------
+    # API database access
+    # ----------------
+    api_db_pool_size: int = Field(10, alias="API_DB_POOL_SIZE")
+    api_db_max_overflow: int = Field(0, alias="API_DB_MAX_OVERFLOW")
+    api_db_pool_timeout: float = Field(5.0, alias="API_DB_POOL_TIMEOUT")
+    api_query_timeout_seconds: float = Field(10.0, alias="API_QUERY_TIMEOUT_SECONDS")
+
+    # ----------------
+    # API response cache
+    # ----------------
+    api_cache_ttl_seconds: float = Field(300.0, alias="API_CACHE_TTL_SECONDS")
+    api_cache_max_entries: int = Field(2048, alias="API_CACHE_MAX_ENTRIES")
+    # evict cached slices when the worker reports a finished (force, month)
+    api_cache_events: bool = Field(True, alias="API_CACHE_EVENTS")
+    api_cache_refresh_on_event: bool = Field(False, alias="API_CACHE_REFRESH_ON_EVENT")
+    # in-memory columnar copy of gold for /analytics: months kept (back from last month)
+    api_store_months: int = Field(36, alias="API_STORE_MONTHS")
+    # HTTP validators / compression
+    api_http_max_age: int = Field(60, alias="API_HTTP_MAX_AGE")
+    api_compress_min_bytes: int = Field(1024, alias="API_COMPRESS_MIN_BYTES")
+    # bulk /export: rows per fetch, concurrent exports, widest month range
+    api_export_chunk_rows: int = Field(5000, alias="API_EXPORT_CHUNK_ROWS")
+    api_export_max_concurrent: int = Field(2, alias="API_EXPORT_MAX_CONCURRENT")
+    api_export_max_months: int = Field(36, alias="API_EXPORT_MAX_MONTHS")
+    api_export_query_timeout_seconds: float = Field(60.0, alias="API_EXPORT_QUERY_TIMEOUT_SECONDS")
+    # /timeseries: widest month range (the zero-filled day series grows with it)
+    api_timeseries_max_months: int = Field(120, alias="API_TIMESERIES_MAX_MONTHS")
 
     # ----------------
     # Rate limiting / backoff
@@ -67,6 +123,18 @@ class Settings(BaseSettings):
     # Worker / parallelism
     # ----------------
     max_workers: int = Field(4, alias="MAX_WORKERS")
+    replay_db_concurrency: int = Field(2, alias="REPLAY_DB_CONCURRENCY")
+    # archive ingest: CSV rows per bronze/silver batch (bounded memory per member)
+    archive_batch_rows: int = Field(20000, alias="ARCHIVE_BATCH_ROWS")
+
+    # ----------------
+    # Parquet lake export
+    # ----------------
+    lake_dir: str = Field("data/lake", alias="LAKE_DIR")
+    lake_compression: str = Field("zstd", alias="LAKE_COMPRESSION")
+    # the stored watermark trails the export start by this much: updated_at is stamped
+    # when a statement runs, not when it commits, so it must cover the longest write transaction
+    lake_watermark_lag_seconds: int = Field(3600, alias="LAKE_WATERMARK_LAG_SECONDS")
 
     # ----------------
     # Pydantic settings
@@ -1,10 +1,31 @@
 # app/db.py
+import json
 import re
+import threading
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
+from .config import settings
+from .db_instrument import TimedQueuePool, instrument_engine
+from .metrics import DB_METRICS
+from .utils import sha256_row
+
+# one engine (and connection pool) per database URL per process
+_engines: dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
 def get_engine(db_url: str) -> Engine:
-    return create_engine(db_url, pool_pre_ping=True, future=True)
+    """
+    Shared, instrumented engine for db_url: statement timings, rowcounts,
+    pool wait and slow-query log (app/db_instrument.py).
+    """
+    with _engines_lock:
+        engine = _engines.get(db_url)
+        if engine is None:
+            engine = create_engine(db_url, pool_pre_ping=True, future=True, poolclass=TimedQueuePool)
+            instrument_engine(engine, DB_METRICS, slow_ms=settings.db_slow_query_ms)
+            _engines[db_url] = engine
+        return engine
 
 def _split_batches_on_go(ddl: str) -> list[str]:
     # split on lines that are just "GO" (case-insensitive)
@@ -23,20 +44,48 @@ def ensure_schema(engine: Engine):
                 preview = batch[:400].replace("\n", "\\n")
                 raise RuntimeError(f"DDL batch #{i} failed. Preview: {preview}") from e
 
-def upsert_forces(engine: Engine, forces: list[dict]):
+def force_ids(engine: Engine) -> set[str]:
+    """Ids already in dbo.dim_force."""
+    with engine.connect() as conn:
+        return set(conn.execute(text("SELECT id FROM dbo.dim_force;")
+                                .execution_options(statement_name="dim_force_ids")).scalars())
+
+# version hash of the last force list synced, per database URL
+_dim_force_versions: dict[str, str] = {}
+
+def upsert_forces(engine: Engine, forces: list[dict]) -> int:
     """
     Upsert the list of forces into dbo.dim_force.
     expects items like {"id": "metropolitan", "name": "Metropolitan Police Service"}
+
+    Set-based: the whole list goes over as one JSON parameter and is merged in a
+    single round-trip via OPENJSON. A version hash of the list is cached, so
+    syncing an unchanged list again is a no-op.
+    Returns number of rows inserted or renamed.
     """
+    rows = sorted({f["id"]: f["name"] for f in forces}.items())
+    if not rows:
+        return 0
+    version = sha256_row(rows)
+    key = str(engine.url)
+    if _dim_force_versions.get(key) == version:
+        return 0
+
     merge_sql = text("""
 MERGE dbo.dim_force AS t
-USING (VALUES (:id, :name)) AS s(id, name)
+USING (
+    SELECT id, name
+    FROM OPENJSON(:payload) WITH (id NVARCHAR(100) '$.id', name NVARCHAR(255) '$.name')
+) AS s
 ON (t.id = s.id)
-WHEN MATCHED THEN 
+WHEN MATCHED AND t.name <> s.name THEN
     UPDATE SET name = s.name
-WHEN NOT MATCHED THEN 
-    INSERT (id, name) VALUES (s.id, s.name);
-""")
+WHEN NOT MATCHED THEN
+    INSERT (id, name) VALUES (s.id, s.name)
+OUTPUT $action AS merge_action;
+""").execution_options(statement_name="dim_force_merge")
+    payload = json.dumps([{"id": i, "name": n} for i, n in rows], ensure_ascii=False)
     with engine.begin() as conn:
-        for f in forces:
-            conn.execute(merge_sql, {"id": f["id"], "name": f["name"]})
+        changed = sum(1 for _ in conn.execute(merge_sql, {"payload": payload}))
+    _dim_force_versions[key] = version
+    return changed
@@ -0,0 +1,155 @@
+# app/db_async.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.sql.elements import TextClause
+
+from .db_instrument import TimedQueuePool
+
+_END = object()
+
+# Per-request accumulator of seconds spent waiting on the database (queue +
+# query), set by the API metrics middleware; None outside a request.
+DB_TIME: ContextVar[list | None] = ContextVar("db_time", default=None)
+
+
+def _add_db_time(seconds: float) -> None:
+    acc = DB_TIME.get()
+    if acc is not None:
+        acc[0] += seconds
+
+
+class AsyncDB:
+    """
+    Async data access for the FastAPI handlers.
+
+    Queries run on a dedicated thread pool sized to the connection pool, so
+    they never occupy Starlette's shared threadpool and at most
+    pool_size + max_overflow of them hit SQL Server at once. Each query gets
+    a timeout; on timeout or client disconnect the running statement is
+    cancelled at the driver (pyodbc Cursor.cancel / sqlite3 interrupt).
+    """
+
+    def __init__(self, db_url: str, *, pool_size: int = 10, max_overflow: int = 0,
+                 pool_timeout: float = 5.0, query_timeout: float = 10.0):
+        self.engine = create_engine(
+            db_url, pool_pre_ping=True, future=True,
+            pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout,
+            poolclass=TimedQueuePool,
+        )
+        self.query_timeout = query_timeout
+        self._executor = ThreadPoolExecutor(max_workers=pool_size + max_overflow, thread_name_prefix="db")
+        event.listen(self.engine, "before_cursor_execute", _remember_cursor)
+
+    # ---------- sync path (executor threads, MQ listener) ----------
+    def fetch_all_sync(self, sql: TextClause, params: dict | None = None,
+                       timeout: float | None = None, _holder: dict | None = None) -> list[dict]:
+        with self.engine.connect() as conn:
+            conn.info.pop("cursor", None)  # info outlives the checkout
+            if _holder is not None:
+                _holder["conn"] = conn
+            dbapi_conn = conn.connection.dbapi_connection
+            if hasattr(dbapi_conn, "timeout"):
+                # pyodbc: server-side query timeout in whole seconds
+                dbapi_conn.timeout = math.ceil(timeout or self.query_timeout)
+            return [dict(r) for r in conn.execute(sql, params or {}).mappings().all()]
+
+    # ---------- async path ----------
+    async def fetch_all(self, sql: TextClause, params: dict | None = None, *,
+                        request: Any = None, timeout: float | None = None) -> list[dict]:
+        """
+        Run a read query off the event loop. Raises 504 on timeout, 503 when the
+        pool is exhausted, 499 when the client went away (query cancelled).
+        """
+        timeout = timeout or self.query_timeout
+        holder: dict = {}
+        loop = asyncio.get_running_loop()
+        query = asyncio.ensure_future(
+            loop.run_in_executor(self._executor, self.fetch_all_sync, sql, params, timeout, holder)
+        )
+        watcher = asyncio.ensure_future(wait_disconnect(request)) if request is not None else None
+
+        t0 = time.perf_counter()
+        try:
+            done, _ = await asyncio.wait({query, watcher} - {None}, timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            self._cancel(query, holder)
+            raise
+        finally:
+            _add_db_time(time.perf_counter() - t0)
+            if watcher is not None:
+                watcher.cancel()
+
+        if query in done:
+            try:
+                return query.result()
+            except PoolTimeoutError:
+                raise HTTPException(status_code=503, detail="Database busy")
+
+        self._cancel(query, holder)
+        if watcher is not None and watcher in done:
+            raise HTTPException(status_code=499, detail="Client closed request")
+        raise HTTPException(status_code=504, detail="Query timed out")
+
+    async def stream(self, chunks: Iterator[Any]) -> AsyncIterator[Any]:
+        """
+        Drive a blocking generator (e.g. a cursor read) from the event loop, one
+        next() per item on the DB executor. The generator is closed on its
+        executor thread once any in-flight next() finishes, so its connection
+        goes back to the pool even when the consumer is cancelled mid-fetch.
+        """
+        pending: Future | None = None
+        try:
+            while True:
+                pending = self._executor.submit(next, chunks, _END)
+                t0 = time.perf_counter()
+                try:
+                    item = await asyncio.wrap_future(pending)
+                finally:
+                    _add_db_time(time.perf_counter() - t0)
+                if item is _END:
+                    return
+                yield item
+        finally:
+            if pending is None:
+                chunks.close()
+            else:
+                pending.add_done_callback(lambda _: chunks.close())
+
+    def _cancel(self, query: asyncio.Future, holder: dict):
+        query.cancel()  # not started yet: never runs
+        conn = holder.get("conn")
+        if conn is None:
+            return
+        try:
+            cursor = conn.info.get("cursor")
+            if cursor is not None and hasattr(cursor, "cancel"):
+                cursor.cancel()
+            elif hasattr(conn.connection.dbapi_connection, "interrupt"):
+                conn.connection.dbapi_connection.interrupt()
+        except Exception:
+            logging.debug("[db] cancel failed", exc_info=True)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.engine.dispose()
+
+
+def _remember_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info["cursor"] = cursor
+
+
+async def wait_disconnect(request, interval: float = 0.1):
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
@@ -0,0 +1,107 @@
+# app/db_instrument.py
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import Callable, Optional
+
+from prometheus_client import CollectorRegistry, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+_VERB = re.compile(r"^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*(\w+)", re.DOTALL)
+_SECONDS_BUCKETS = (.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+_ROWS_BUCKETS = (0, 1, 10, 100, 1000, 5000, 10000, 50000, 100000, 500000)
+
+logger = logging.getLogger("app.db")
+
+
+class DbMetrics:
+    """Statement and pool metrics; statement is the logical name (see statement_name)."""
+    def __init__(self, registry: CollectorRegistry, prefix: str = "police_db"):
+        self.statement_seconds = Histogram(
+            f"{prefix}_statement_seconds", "Database statement duration", ["statement"],
+            buckets=_SECONDS_BUCKETS, registry=registry,
+        )
+        self.statement_rows = Histogram(
+            f"{prefix}_statement_rows", "Rows affected per statement (when the driver reports it)", ["statement"],
+            buckets=_ROWS_BUCKETS, registry=registry,
+        )
+        self.pool_wait_seconds = Histogram(
+            f"{prefix}_pool_wait_seconds", "Time waiting to check a connection out of the pool",
+            buckets=_SECONDS_BUCKETS, registry=registry,
+        )
+
+
+def statement_name(context, statement: str) -> str:
+    """
+    Logical name from text(...).execution_options(statement_name=...), else
+    the SQL verb ("select", "merge", ...) to keep label cardinality bounded.
+    """
+    name = context.execution_options.get("statement_name") if context is not None else None
+    if name:
+        return name
+    m = _VERB.match(statement)
+    return m.group(1).lower() if m else "other"
+
+
+def _param_count(parameters, executemany: bool) -> tuple[int, int]:
+    """(bound values, parameter sets)"""
+    if not parameters:
+        return 0, 0
+    sets = parameters if executemany else [parameters]
+    return sum(len(p) for p in sets), len(sets)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited (wait_observer)."""
+    wait_observer: Optional[Callable[[float], None]] = None
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_observer is not None:
+                self.wait_observer(time.perf_counter() - t0)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_observer = self.wait_observer
+        return pool
+
+
+def instrument_engine(engine: Engine, metrics: DbMetrics, slow_ms: float = 1000.0) -> Engine:
+    """
+    Attach statement timing, rowcount and slow-query logging to an engine,
+    plus pool wait timing when it uses TimedQueuePool.
+    """
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.wait_observer = metrics.pool_wait_seconds.observe
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._instrument_t0 = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _done(conn, cursor, statement, parameters, context, executemany):
+        t0 = getattr(context, "_instrument_t0", None)
+        if t0 is None:
+            return
+        elapsed = time.perf_counter() - t0
+        name = statement_name(context, statement)
+        metrics.statement_seconds.labels(statement=name).observe(elapsed)
+        rowcount = getattr(cursor, "rowcount", -1)
+        if rowcount is not None and rowcount >= 0:
+            metrics.statement_rows.labels(statement=name).observe(rowcount)
+        if elapsed * 1000 >= slow_ms:
+            values, sets = _param_count(parameters, executemany)
+            logger.warning(
+                "[db] Slow statement %s: %.0f ms, rowcount=%s, params=%d in %d set(s): %s",
+                name, elapsed * 1000, rowcount, values, sets, " ".join(statement.split())[:300],
+            )
+
+    return engine
@@ -0,0 +1,251 @@
+# app/disk_cache.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .config import settings
+from .metrics import HTTP_CACHE_REQUESTS
+from .utils import last_month_yyyymm
+
+logger = logging.getLogger("app.cache")
+
+_INDEX_DDL = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    endpoint_class TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    content_type TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_entries_lru ON entries (last_access);
+CREATE INDEX IF NOT EXISTS ix_entries_digest ON entries (digest);
+CREATE TABLE IF NOT EXISTS bodies (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    content_type: Optional[str]
+    endpoint_class: str
+    stored_at: float
+
+    def to_response(self, url: str) -> requests.Response:
+        """A requests.Response for callers that expect one (.content, .json())."""
+        r = requests.Response()
+        r.status_code = 200
+        r._content = self.body
+        r.headers = CaseInsensitiveDict({"Content-Type": self.content_type or "application/json",
+                                         "X-Cache": "HIT"})
+        r.url = url
+        r.encoding = "utf-8"
+        return r
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    """sha256 of the GET with its query parameters in canonical (sorted) order."""
+    query = urlencode(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+    return hashlib.sha256(f"GET {url}?{query}".encode("utf-8")).hexdigest()
+
+
+def endpoint_class(url: str, params: dict | None = None, recent_months: int = 3) -> str:
+    """
+    TTL class of a Police API call:
+      stops_historical  stops for a month older than the last `recent_months` (immutable)
+      stops_recent      stops for a recent month (may still be revised)
+      availability      crimes-street-dates (changes on each data release)
+      reference         forces list and other rarely changing lookups
+      other             anything else (not cached)
+    """
+    path = urlsplit(url).path.rstrip("/")
+    if path.endswith("/crimes-street-dates"):
+        return "availability"
+    if path.endswith("/forces"):
+        return "reference"
+    if path.endswith("/stops-force") or path.endswith("/stops-street") or path.endswith("/stops-no-location"):
+        ym = (params or {}).get("date")
+        if not ym:
+            return "stops_recent"  # no date: the API's latest month
+        y, m = (int(p) for p in last_month_yyyymm().split("-"))
+        idx = y * 12 + m - 1 - (recent_months - 1)
+        oldest_recent = f"{idx // 12:04d}-{idx % 12 + 1:02d}"
+        return "stops_historical" if str(ym) < oldest_recent else "stops_recent"
+    return "other"
+
+
+class HttpDiskCache:
+    """
+    Content-addressed on-disk cache for GET responses.
+
+    Entries are keyed by cache_key(url, params) and point at a body stored
+    once per content digest (sha256 of the raw body), zlib-compressed under
+    objects/<2>/<digest>.z. A SQLite index (WAL, so several worker
+    processes can share the directory) tracks expiry per endpoint class
+    (ttls, seconds; 0 or missing = not cached) and last access; puts evict
+    expired entries, then least recently used ones, until the compressed
+    bodies fit in max_bytes.
+    """
+    def __init__(self, directory: str, max_bytes: int, ttls: dict[str, float], recent_months: int = 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = dict(ttls)
+        self.recent_months = recent_months
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self._local = threading.local()
+        with self._db() as db:
+            db.executescript(_INDEX_DDL)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.z")
+
+    def classify(self, url: str, params: dict | None = None) -> str:
+        return endpoint_class(url, params, self.recent_months)
+
+    # ---------- read ----------
+    def get(self, url: str, params: dict | None = None) -> Optional[CachedResponse]:
+        cls = self.classify(url, params)
+        if not self.ttls.get(cls):
+            return None
+        key, now = cache_key(url, params), time.time()
+        db = self._db()
+        row = db.execute(
+            "SELECT digest, content_type, stored_at, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[3] <= now:
+            HTTP_CACHE_REQUESTS.labels(endpoint_class=cls, result="miss" if row is None else "expired").inc()
+            return None
+        try:
+            with open(self._path(row[0]), "rb") as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            HTTP_CACHE_REQUESTS.labels(endpoint_class=cls, result="miss").inc()
+            return None
+        db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        HTTP_CACHE_REQUESTS.labels(endpoint_class=cls, result="hit").inc()
+        return CachedResponse(body, row[1], cls, row[2])
+
+    # ---------- write ----------
+    def put(self, url: str, params: dict | None, body: bytes, content_type: str | None = None) -> bool:
+        """Store a 200 response body; False when its endpoint class is not cached."""
+        cls = self.classify(url, params)
+        ttl = self.ttls.get(cls)
+        if not ttl:
+            return False
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(body, 6))
+            os.replace(tmp, path)
+        size = os.path.getsize(path)
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("INSERT OR IGNORE INTO bodies (digest, size) VALUES (?, ?)", (digest, size))
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, url, endpoint_class, digest, content_type, stored_at, "
+                "expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(url, params), url, cls, digest, content_type, now, now + ttl, now),
+            )
+            removed = self._evict(db, now)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        self._unlink(removed)
+        return True
+
+    def put_safe(self, url: str, params: dict | None, body: bytes, content_type: str | None = None) -> bool:
+        """put() for fetch paths: a cache write failure is logged, never raised."""
+        try:
+            return self.put(url, params, body, content_type)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("[cache] Could not store %s: %s", url, e)
+            return False
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> list[str]:
+        """Drop expired, then LRU entries until bodies fit; returns digests no longer referenced."""
+        db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        removed = [d for (d,) in db.execute(
+            "SELECT digest FROM bodies WHERE digest NOT IN (SELECT digest FROM entries)").fetchall()]
+        db.executemany("DELETE FROM bodies WHERE digest = ?", [(d,) for d in removed])
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        if total > self.max_bytes:
+            for key, digest in db.execute("SELECT key, digest FROM entries ORDER BY last_access").fetchall():
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                if not db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                    total -= db.execute("SELECT size FROM bodies WHERE digest = ?", (digest,)).fetchone()[0]
+                    db.execute("DELETE FROM bodies WHERE digest = ?", (digest,))
+                    removed.append(digest)
+                if total <= self.max_bytes:
+                    break
+        return removed
+
+    def _unlink(self, digests: list[str]):
+        for d in digests:
+            try:
+                os.remove(self._path(d))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        db = self._db()
+        entries, = db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        bodies, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM bodies").fetchone()
+        return {"entries": entries, "bodies": bodies, "bytes": size}
+
+
+_cache: Optional[HttpDiskCache] = None
+_cache_lock = threading.Lock()
+
+
+def http_cache() -> Optional[HttpDiskCache]:
+    """Process-wide cache from settings (HTTP_CACHE_DIR); None when disabled."""
+    global _cache
+    if not settings.http_cache_dir:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.directory != settings.http_cache_dir:
+            _cache = HttpDiskCache(
+                settings.http_cache_dir,
+                max_bytes=settings.http_cache_max_mb * 1024 * 1024,
+                ttls={
+                    "stops_historical": settings.http_cache_ttl_historical,
+                    "stops_recent": settings.http_cache_ttl_recent,
+                    "availability": settings.http_cache_ttl_availability,
+                    "reference": settings.http_cache_ttl_reference,
+                },
+                recent_months=settings.http_cache_recent_months,
+            )
+        return _cache
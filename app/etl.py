@@ -3,12 +3,20 @@ from __future__ import annotations
 
 import datetime as dt
 import json
+import logging
+import time
 from typing import Iterable, List, Dict, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from . import client
+from .config import settings
+from .db import force_ids, upsert_forces
+from .geo import GRID_MAX_ZOOM, GRID_ZOOMS
+from .tracing import span
 from .transform import to_silver_rows
+from .utils import sha256_row
 
 
 # -----------------------
@@ -30,44 +38,130 @@ def _force_display_name(force_id: str) -> str:
 # Bronze
 # -----------------------
 
-def upsert_bronze(engine: Engine, force: str, ym: str, raw_records: List[Dict]) -> int:
+class SourceConflict(Exception):
+    """The (force, month) partition was already loaded from another source (api / archive)."""
+
+
+def other_source(engine: Engine, force: str, ym: str, source: str) -> str | None:
+    """A source other than `source` that already has bronze rows for the partition, else None."""
+    with engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT TOP 1 source FROM dbo.bronze_stop_search
+            WHERE force_id = :force AND [month] = :month AND source <> :source;
+        """).execution_options(statement_name="bronze_other_source"),
+            {"force": force, "month": _month_first_day(ym), "source": source}).scalar()
+
+
+def check_source(engine: Engine, force: str, ym: str, source: str) -> None:
     """
-    Insert raw JSON rows into dbo.bronze_stop_search.
-    One row per source record (idempotency at bronze is not required; keep raw history).
+    Raise SourceConflict if another source already populated the partition.
+    API and archive records hash differently, so loading both would count
+    every stop twice in silver and gold.
+    """
+    other = other_source(engine, force, ym, source)
+    if other:
+        raise SourceConflict(f"{force} {ym} already loaded from {other}; not loading from {source}")
+
+def bronze_rows(force: str, month_date: dt.date, raw_records: List[Dict]) -> List[Dict]:
+    """#bronze_in parameter rows: one per distinct record, keyed by sha256_row."""
+    rows = {}
+    for rec in raw_records:
+        h = sha256_row(rec)
+        if h not in rows:
+            rows[h] = {
+                "row_hash": h,
+                "force_id": force,
+                "month": month_date,
+                "payload": json.dumps(rec, ensure_ascii=False),
+            }
+    return list(rows.values())
+
+
+def upsert_bronze(engine: Engine, force: str, ym: str, raw_records: List[Dict], source: str = "api") -> int:
+    """
+    Insert raw JSON rows into dbo.bronze_stop_search, keyed by sha256 of the record.
+    Records already present are skipped, so re-ingesting a month is safe and bronze
+    keeps exactly one copy of every raw record (the source for replay).
+    source: where the records came from ("api" or "archive").
+    Returns number of new bronze rows.
     """
     if not raw_records:
         return 0
 
-    rows = [
-        {
-            "force_id": force,
-            "month": _month_first_day(ym),
-            "raw_json": json.dumps(rec, ensure_ascii=False),
-        }
-        for rec in raw_records
-    ]
-
-    sql = text("""
-        INSERT INTO dbo.bronze_stop_search (force_id, [month], raw_json)
-        VALUES (:force_id, :month, :raw_json)
-    """)
-    # Use fast_executemany when pyodbc is present (SQLAlchemy 2.x sets it automatically on connection)
-    with engine.begin() as conn:
-        conn.execute(sql, rows)
-    return len(rows)
+    with span("bronze_prepare", force):
+        rows = bronze_rows(force, _month_first_day(ym), raw_records)
+
+    with span("bronze_insert", force) as sp, engine.begin() as conn:
+        conn.execute(text("""
+            IF OBJECT_ID('tempdb..#bronze_in') IS NOT NULL DROP TABLE #bronze_in;
+            CREATE TABLE #bronze_in (
+                row_hash CHAR(64) NOT NULL PRIMARY KEY,
+                force_id NVARCHAR(100) NOT NULL,
+                [month] DATE NOT NULL,
+                payload NVARCHAR(MAX) NOT NULL
+            );
+        """).execution_options(statement_name="bronze_temp_create"))
+        conn.execute(text("""
+            INSERT INTO #bronze_in (row_hash, force_id, [month], payload)
+            VALUES (:row_hash, :force_id, :month, :payload)
+        """).execution_options(statement_name="bronze_temp_load"), rows)
+        result = conn.execute(text("""
+            INSERT INTO dbo.bronze_stop_search (row_hash, force_id, [month], payload, source)
+            SELECT s.row_hash, s.force_id, s.[month], s.payload, :source
+            FROM #bronze_in AS s
+            WHERE NOT EXISTS (SELECT 1 FROM dbo.bronze_stop_search AS b WHERE b.row_hash = s.row_hash);
+        """).execution_options(statement_name="bronze_insert"), {"source": source})
+        sp["rows"] = result.rowcount
+        return result.rowcount
 
 
 # -----------------------
 # Silver
 # -----------------------
 
+def silver_payload(force: str, month_date: dt.date, silver_rows: List[Dict]) -> List[Dict]:
+    """#silver_in parameter rows, with all columns the temp table expects."""
+    payload = []
+    for r in silver_rows:
+        payload.append({
+            "row_hash": r["row_hash"],
+            "force_id": r.get("force_id") or r.get("force") or force,
+            "stop_datetime": r.get("stop_datetime") or r.get("datetime"),
+            "stop_date": r.get("stop_date"),
+            "type": r.get("type"),
+            "involved_person": r.get("involved_person"),
+            "gender": r.get("gender"),
+            "age_range": r.get("age_range"),
+            "self_defined_ethnicity": r.get("self_defined_ethnicity"),
+            "officer_defined_ethnicity": r.get("officer_defined_ethnicity"),
+            "legislation": r.get("legislation"),
+            "object_of_search": r.get("object_of_search"),
+            "outcome": r.get("outcome") or "",
+            "outcome_linked_to_object_of_search": r.get("outcome_linked_to_object_of_search")
+                                                   or r.get("outcome_linked_to_object"),
+            "outcome_object_id": r.get("outcome_object_id"),
+            "outcome_object_name": r.get("outcome_object_name"),
+            "removal_more_than_outer_clothing": r.get("removal_more_than_outer_clothing")
+                                                  or r.get("removal_of_more_than_outer_clothing"),
+            "latitude": r.get("latitude"),
+            "longitude": r.get("longitude"),
+            "tile_x": r.get("tile_x"),
+            "tile_y": r.get("tile_y"),
+            "street_id": r.get("street_id"),
+            "street_name": r.get("street_name"),
+            "month": r.get("month") or month_date,
+        })
+    return payload
+
+
 def upsert_silver(engine: Engine, force: str, ym: str, raw_records: List[Dict]) -> int:
     """
     Transform raw JSON -> silver rows; upsert into dbo.fact_stop_search by row_hash.
     Returns number of rows inserted (new).
     """
     month_date = _month_first_day(ym)
-    silver_rows = list(to_silver_rows(force, ym, raw_records))
+    with span("silver_transform", force):
+        silver_rows = list(to_silver_rows(force, ym, raw_records))
     if not silver_rows:
         return 0
 
@@ -80,6 +174,7 @@ def upsert_silver(engine: Engine, force: str, ym: str, raw_records: List[Dict])
                 row_hash CHAR(64) NOT NULL,
                 force_id NVARCHAR(100) NOT NULL,
                 stop_datetime DATETIME2(0) NULL,
+                stop_date DATE NULL,
                 [type] NVARCHAR(200) NULL,
                 involved_person BIT NULL,
                 gender NVARCHAR(50) NULL,
@@ -95,88 +190,79 @@ def upsert_silver(engine: Engine, force: str, ym: str, raw_records: List[Dict])
                 removal_more_than_outer_clothing BIT NULL,
                 latitude FLOAT NULL,
                 longitude FLOAT NULL,
+                tile_x INT NULL,
+                tile_y INT NULL,
                 street_id BIGINT NULL,
                 street_name NVARCHAR(300) NULL,
                 [month] DATE NOT NULL
             );
-        """))
+        """).execution_options(statement_name="silver_temp_create"))
 
         # Prepare rows with all columns expected by #silver_in
-        payload = []
-        for r in silver_rows:
-            payload.append({
-                "row_hash": r["row_hash"],
-                "force_id": r.get("force_id") or r.get("force") or force,
-                "stop_datetime": r.get("stop_datetime") or r.get("datetime"),
-                "type": r.get("type"),
-                "involved_person": r.get("involved_person"),
-                "gender": r.get("gender"),
-                "age_range": r.get("age_range"),
-                "self_defined_ethnicity": r.get("self_defined_ethnicity"),
-                "officer_defined_ethnicity": r.get("officer_defined_ethnicity"),
-                "legislation": r.get("legislation"),
-                "object_of_search": r.get("object_of_search"),
-                "outcome": r.get("outcome") or "",
-                "outcome_linked_to_object_of_search": r.get("outcome_linked_to_object_of_search")
-                                                       or r.get("outcome_linked_to_object"),
-                "outcome_object_id": r.get("outcome_object_id"),
-                "outcome_object_name": r.get("outcome_object_name"),
-                "removal_more_than_outer_clothing": r.get("removal_more_than_outer_clothing")
-                                                      or r.get("removal_of_more_than_outer_clothing"),
-                "latitude": r.get("latitude"),
-                "longitude": r.get("longitude"),
-                "street_id": r.get("street_id"),
-                "street_name": r.get("street_name"),
-                "month": r.get("month") or month_date,
-            })
+        with span("silver_prepare", force):
+            payload = silver_payload(force, month_date, silver_rows)
 
         # Bulk insert into temp table
-        conn.execute(text("""
-            INSERT INTO #silver_in (
-                row_hash, force_id, stop_datetime, [type], involved_person, gender, age_range,
-                self_defined_ethnicity, officer_defined_ethnicity, legislation, object_of_search, outcome,
-                outcome_linked_to_object_of_search, outcome_object_id, outcome_object_name,
-                removal_more_than_outer_clothing, latitude, longitude, street_id, street_name, [month]
-            )
-            VALUES (
-                :row_hash, :force_id, :stop_datetime, :type, :involved_person, :gender, :age_range,
-                :self_defined_ethnicity, :officer_defined_ethnicity, :legislation, :object_of_search, :outcome,
-                :outcome_linked_to_object_of_search, :outcome_object_id, :outcome_object_name,
-                :removal_more_than_outer_clothing, :latitude, :longitude, :street_id, :street_name, :month
-            )
-        """), payload)
-
-        # MERGE into silver fact
-        result = conn.execute(text("""
-            MERGE dbo.fact_stop_search AS tgt
-            USING #silver_in AS s
-            ON (tgt.row_hash = s.row_hash)
-            WHEN NOT MATCHED BY TARGET THEN
-                INSERT (
-                    row_hash, force_id, stop_datetime, [type], involved_person, gender, age_range,
+        with span("silver_load", force, rows=len(payload)):
+            conn.execute(text("""
+                INSERT INTO #silver_in (
+                    row_hash, force_id, stop_datetime, stop_date, [type], involved_person, gender, age_range,
                     self_defined_ethnicity, officer_defined_ethnicity, legislation, object_of_search, outcome,
                     outcome_linked_to_object_of_search, outcome_object_id, outcome_object_name,
-                    removal_more_than_outer_clothing, latitude, longitude, street_id, street_name, [month]
+                    removal_more_than_outer_clothing, latitude, longitude, tile_x, tile_y, street_id, street_name, [month]
                 )
                 VALUES (
-                    s.row_hash, s.force_id, s.stop_datetime, s.[type], s.involved_person, s.gender, s.age_range,
-                    s.self_defined_ethnicity, s.officer_defined_ethnicity, s.legislation, s.object_of_search, s.outcome,
-                    s.outcome_linked_to_object_of_search, s.outcome_object_id, s.outcome_object_name,
-                    s.removal_more_than_outer_clothing, s.latitude, s.longitude, s.street_id, s.street_name, s.[month]
+                    :row_hash, :force_id, :stop_datetime, :stop_date, :type, :involved_person, :gender, :age_range,
+                    :self_defined_ethnicity, :officer_defined_ethnicity, :legislation, :object_of_search, :outcome,
+                    :outcome_linked_to_object_of_search, :outcome_object_id, :outcome_object_name,
+                    :removal_more_than_outer_clothing, :latitude, :longitude, :tile_x, :tile_y, :street_id, :street_name, :month
                 )
-            WHEN MATCHED THEN
-                UPDATE SET
-                    tgt.outcome = s.outcome,
-                    tgt.street_name = s.street_name,
-                    tgt.latitude = s.latitude,
-                    tgt.longitude = s.longitude,
-                    tgt.officer_defined_ethnicity = s.officer_defined_ethnicity,
-                    tgt.self_defined_ethnicity = s.self_defined_ethnicity
-            OUTPUT $action AS merge_action;
-        """))
+            """).execution_options(statement_name="silver_temp_load"), payload)
 
-        # Count inserts from MERGE output
-        inserted = sum(1 for row in result if row.merge_action == "INSERT")
+        # MERGE into silver fact
+        with span("silver_merge", force) as sp:
+            result = conn.execute(text("""
+                MERGE dbo.fact_stop_search AS tgt
+                USING #silver_in AS s
+                ON (tgt.row_hash = s.row_hash)
+                WHEN NOT MATCHED BY TARGET THEN
+                    INSERT (
+                        row_hash, force_id, stop_datetime, stop_date, [type], involved_person, gender, age_range,
+                        self_defined_ethnicity, officer_defined_ethnicity, legislation, object_of_search, outcome,
+                        outcome_linked_to_object_of_search, outcome_object_id, outcome_object_name,
+                        removal_more_than_outer_clothing, latitude, longitude, tile_x, tile_y, street_id, street_name, [month]
+                    )
+                    VALUES (
+                        s.row_hash, s.force_id, s.stop_datetime, s.stop_date, s.[type], s.involved_person, s.gender, s.age_range,
+                        s.self_defined_ethnicity, s.officer_defined_ethnicity, s.legislation, s.object_of_search, s.outcome,
+                        s.outcome_linked_to_object_of_search, s.outcome_object_id, s.outcome_object_name,
+                        s.removal_more_than_outer_clothing, s.latitude, s.longitude, s.tile_x, s.tile_y, s.street_id, s.street_name, s.[month]
+                    )
+                WHEN MATCHED AND EXISTS (
+                    SELECT tgt.outcome, tgt.street_name, tgt.latitude, tgt.longitude, tgt.tile_x, tgt.tile_y,
+                           tgt.officer_defined_ethnicity, tgt.self_defined_ethnicity, tgt.stop_date
+                    EXCEPT
+                    SELECT s.outcome, s.street_name, s.latitude, s.longitude, s.tile_x, s.tile_y,
+                           s.officer_defined_ethnicity, s.self_defined_ethnicity, s.stop_date
+                ) THEN
+                    -- only real revisions are written, and they move updated_at (lake export watermark)
+                    UPDATE SET
+                        tgt.outcome = s.outcome,
+                        tgt.street_name = s.street_name,
+                        tgt.latitude = s.latitude,
+                        tgt.longitude = s.longitude,
+                        tgt.tile_x = s.tile_x,
+                        tgt.tile_y = s.tile_y,
+                        tgt.officer_defined_ethnicity = s.officer_defined_ethnicity,
+                        tgt.self_defined_ethnicity = s.self_defined_ethnicity,
+                        tgt.stop_date = s.stop_date,
+                        tgt.updated_at = SYSUTCDATETIME()
+                OUTPUT $action AS merge_action;
+            """).execution_options(statement_name="silver_merge"))
+
+            # Count inserts from MERGE output
+            inserted = sum(1 for row in result if row.merge_action == "INSERT")
+            sp["rows"] = inserted
         return inserted
 
 
@@ -203,7 +289,7 @@ def refresh_gold_month(engine: Engine, force: str, ym: str) -> int:
             FROM dbo.fact_stop_search WITH (NOLOCK)
             WHERE force_id = :force AND [month] = :month
             GROUP BY force_id, [month], NULLIF(LTRIM(RTRIM(outcome)), N'');
-        """), {"force": force, "month": month_date})
+        """).execution_options(statement_name="gold_aggregate"), {"force": force, "month": month_date})
 
         # Upsert into gold
         result = conn.execute(text("""
@@ -218,34 +304,114 @@ def refresh_gold_month(engine: Engine, force: str, ym: str) -> int:
             WHEN NOT MATCHED THEN
                 INSERT (force_id, [month], outcome, [count])
                 VALUES (a.force_id, a.[month], a.outcome, a.cnt)
-            WHEN MATCHED THEN
-                UPDATE SET tgt.[count] = a.cnt
+            WHEN MATCHED AND tgt.[count] <> a.cnt THEN
+                UPDATE SET tgt.[count] = a.cnt, tgt.updated_at = SYSUTCDATETIME()
             OUTPUT $action AS merge_action;
-        """))
+        """).execution_options(statement_name="gold_merge"))
 
-        changed = sum(1 for row in result)  # INSERT or UPDATE rows counted
+        # INSERT or UPDATE rows counted; unchanged counts keep their updated_at (API ETags)
+        changed = sum(1 for row in result)
         return changed
 
 
+def refresh_grid_month(engine: Engine, force: str, ym: str) -> int:
+    """
+    Rebuild the spatial grid aggregates (dbo.gold_grid_cells) for one force &
+    month at every zoom in GRID_ZOOMS, from the z16 tile keys on silver.
+    Returns number of cells written.
+    """
+    month_date = _month_first_day(ym)
+    zooms = ", ".join(f"({z})" for z in GRID_ZOOMS)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            DELETE FROM dbo.gold_grid_cells WHERE force_id = :force AND [month] = :month;
+        """).execution_options(statement_name="grid_delete"), {"force": force, "month": month_date})
+        result = conn.execute(text(f"""
+            INSERT INTO dbo.gold_grid_cells (force_id, [month], zoom, tile_x, tile_y, [count], lat_avg, lon_avg)
+            SELECT :force, :month, z.zoom, f.tile_x / p.d, f.tile_y / p.d, COUNT(*), AVG(f.latitude), AVG(f.longitude)
+            FROM dbo.fact_stop_search AS f WITH (NOLOCK)
+            CROSS JOIN (VALUES {zooms}) AS z(zoom)
+            CROSS APPLY (SELECT POWER(2, {GRID_MAX_ZOOM} - z.zoom) AS d) AS p
+            WHERE f.force_id = :force AND f.[month] = :month AND f.tile_x IS NOT NULL
+            GROUP BY z.zoom, f.tile_x / p.d, f.tile_y / p.d;
+        """).execution_options(statement_name="grid_insert"), {"force": force, "month": month_date})
+        return result.rowcount
+
+
+def refresh_timeseries_month(engine: Engine, force: str, ym: str) -> int:
+    """
+    Rebuild the time-series rollups for one force & month:
+      - dbo.gold_daily_counts: stops per stop_date (UK local day, set by the transform)
+      - dbo.gold_hour_of_week: stops per (weekday, hour), UK local time
+    Stops without a datetime are left out of both.
+    Returns number of rollup rows written.
+    """
+    month_date = _month_first_day(ym)
+    params = {"force": force, "month": month_date}
+    with engine.begin() as conn:
+        conn.execute(text("""
+            DELETE FROM dbo.gold_daily_counts WHERE force_id = :force AND [month] = :month;
+            DELETE FROM dbo.gold_hour_of_week WHERE force_id = :force AND [month] = :month;
+        """).execution_options(statement_name="timeseries_delete"), params)
+        daily = conn.execute(text("""
+            INSERT INTO dbo.gold_daily_counts (force_id, [month], stop_date, [count])
+            SELECT :force, :month, stop_date, COUNT(*)
+            FROM dbo.fact_stop_search WITH (NOLOCK)
+            WHERE force_id = :force AND [month] = :month AND stop_date IS NOT NULL
+            GROUP BY stop_date;
+        """).execution_options(statement_name="daily_insert"), params)
+        # stop_datetime is UTC; DATEDIFF from 1900-01-01 (a Monday) avoids DATEFIRST
+        hourly = conn.execute(text("""
+            INSERT INTO dbo.gold_hour_of_week (force_id, [month], dow, [hour], [count])
+            SELECT :force, :month, DATEDIFF(DAY, '19000101', l.local_dt) % 7 + 1, DATEPART(HOUR, l.local_dt), COUNT(*)
+            FROM dbo.fact_stop_search AS f WITH (NOLOCK)
+            CROSS APPLY (SELECT CAST(f.stop_datetime AT TIME ZONE 'UTC' AT TIME ZONE 'GMT Standard Time'
+                                     AS DATETIME2(0)) AS local_dt) AS l
+            WHERE f.force_id = :force AND f.[month] = :month AND f.stop_datetime IS NOT NULL
+            GROUP BY DATEDIFF(DAY, '19000101', l.local_dt) % 7 + 1, DATEPART(HOUR, l.local_dt);
+        """).execution_options(statement_name="hour_of_week_insert"), params)
+        return daily.rowcount + hourly.rowcount
+
+
 # -----------------------
 # Orchestration called by worker
 # -----------------------
 
+def refresh_aggregates(engine: Engine, force: str, ym: str) -> None:
+    """Gold (outcomes, grid cells, time-series rollups) refresh for one (force, month) slice."""
+    with span("gold_refresh", force):
+        refresh_gold_month(engine, force, ym)
+    with span("grid_refresh", force):
+        refresh_grid_month(engine, force, ym)
+    with span("timeseries_refresh", force):
+        refresh_timeseries_month(engine, force, ym)
+
+
+def upsert_silver_and_gold(engine: Engine, force: str, ym: str, raw_records: List[Dict]) -> int:
+    """
+    Silver upsert + gold (outcomes, grid cells, time-series rollups) refresh for one (force, month) slice.
+    Shared by the worker and by replay (which re-reads raw records from bronze).
+    Returns inserted count for silver.
+    """
+    inserted = upsert_silver(engine, force, ym, raw_records)
+    refresh_aggregates(engine, force, ym)
+    return inserted
+
+
 def upsert_bronze_and_silver(engine: Engine, force: str, ym: str, raw_records: List[Dict]) -> int:
     """
     Entry-point used by the worker:
+      - refuse partitions already loaded from the bulk archive (SourceConflict)
       - write bronze
       - upsert silver
       - refresh gold for that slice
     Returns inserted count for silver.
     """
+    check_source(engine, force, ym, "api")
     # Bronze (raw history)
     upsert_bronze(engine, force, ym, raw_records)
-    # Silver
-    inserted = upsert_silver(engine, force, ym, raw_records)
-    # Gold
-    refresh_gold_month(engine, force, ym)
-    return inserted
+    # Silver + Gold
+    return upsert_silver_and_gold(engine, force, ym, raw_records)
 
 
 # -----------------------
@@ -275,29 +441,41 @@ def discover_months_for_forces(start_month: str, forces: Iterable[str]) -> List[
     return jobs
 
 
-def load_dim_force(engine: Engine, forces: Iterable[str]) -> int:
+# display names from the last Police API force list, and when it was fetched (monotonic)
+_force_names: Dict[str, str] = {}
+_force_names_at: float | None = None
+
+
+def load_dim_force(engine: Engine, forces: Iterable[str] | None = None, max_age: float | None = None) -> int:
     """
-    Ensure dbo.dim_force has the list of forces (id, name).
+    Ensure dbo.dim_force has every force (id, name), using the display names
+    from the Police API force list. The list is fetched again only when a
+    configured force is missing from the table or the last fetch is older
+    than max_age (FORCE_NAMES_MAX_AGE_SECONDS); a process that starts with
+    every force present counts as fresh, so the producer is never held up
+    by an unreachable API. Missing forces the API did not name (or all of
+    them, if it is unreachable) get a title-cased id; names already in the
+    table are never replaced by derived ones.
+    Single set-based MERGE; a no-op when nothing changed since the last sync.
     Returns number of upserts.
     """
-    rows = [{"id": f, "name": _force_display_name(f)} for f in forces]
-    if not rows:
-        return 0
-    with engine.begin() as conn:
-        # temp table
-        conn.execute(text("""
-            IF OBJECT_ID('tempdb..#forces') IS NOT NULL DROP TABLE #forces;
-            CREATE TABLE #forces (id NVARCHAR(100) NOT NULL, name NVARCHAR(255) NOT NULL);
-        """))
-        conn.execute(text("INSERT INTO #forces (id, name) VALUES (:id, :name)"), rows)
-        result = conn.execute(text("""
-            MERGE dbo.dim_force AS tgt
-            USING #forces AS s
-            ON (tgt.id = s.id)
-            WHEN NOT MATCHED THEN
-                INSERT (id, name) VALUES (s.id, s.name)
-            WHEN MATCHED AND ISNULL(tgt.name, N'') <> ISNULL(s.name, N'') THEN
-                UPDATE SET tgt.name = s.name
-            OUTPUT $action AS merge_action;
-        """))
-        return sum(1 for _ in result)
+    global _force_names_at
+    max_age = settings.force_names_max_age_seconds if max_age is None else max_age
+    wanted = list(forces or [])
+    existing = force_ids(engine) if wanted else set()
+    missing = [f for f in wanted if f not in existing]
+    now = time.monotonic()
+    if _force_names_at is None and wanted and not missing:
+        _force_names_at = now
+    if missing or _force_names_at is None or now - _force_names_at >= max_age:
+        _force_names_at = now  # a failed fetch also waits for the next interval
+        try:
+            names = {f["id"]: f["name"] for f in client.list_forces()}
+            _force_names.clear()
+            _force_names.update(names)
+        except Exception:
+            logging.warning("[etl] list_forces failed; using derived force names", exc_info=True)
+    names = dict(_force_names)
+    for f in missing:
+        names.setdefault(f, _force_display_name(f))
+    return upsert_forces(engine, [{"id": i, "name": n} for i, n in names.items()])
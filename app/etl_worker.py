@@ -6,8 +6,9 @@ import time
 
 from app.logging_setup import setup_logging
 from .config import settings
+from .worker_supervisor import CHILD_ENV, Supervisor, child_log_filename
 from .db import get_engine, ensure_schema
-from .etl import upsert_bronze_and_silver
+from .etl import SourceConflict, upsert_bronze_and_silver
 from .mq import MQClient
 
 from .job_events import Subject, JobEvent
@@ -15,7 +16,7 @@ from .observers import ActiveMQReporter, EmailReporter, LogReporter
 
 logger = setup_logging(
     app="police-tracker",
-    filename="logs/police-tracker.log",
+    filename=child_log_filename("logs/police-tracker.log"),  # prefork children: one file each
     use_stream=True,
     stream_json=True,
     alert_to="test@example.com",
@@ -35,7 +36,12 @@ from .metrics import (
 
 # ----- Rate limiting + backoff HTTP client -----
 from .rate_limit import RateLimiter
-from .http_client import http_get_with_backoff
+from .circuit_breaker import RetryLater, breaker_for
+from .http_client import backoff_delay, http_get_with_backoff
+from .tracing import job_trace, span
+
+# Per-job INFO lines (sampled / rate-limited via LOG_SAMPLE, LOG_RATE_LIMIT)
+job_log = logging.getLogger("app.worker.jobs")
 
 # ---- Config ----
 MQ_HOST = os.getenv("MQ_HOST", "activemq")
@@ -46,6 +52,14 @@ MQ_QUEUE_FETCH = os.getenv("MQ_QUEUE_FETCH", "/queue/police.fetch")
 MQ_QUEUE_DONE  = os.getenv("MQ_QUEUE_DONE",  "/queue/police.done")
 MQ_QUEUE_NOTIFY = os.getenv("MQ_QUEUE_NOTIFY", "/queue/police.notify")
 
+# Police API (overridable for local load tests: benchmarks/worker_load.py)
+POLICE_API_URL = os.getenv("POLICE_API_URL", "https://data.police.uk/api/stops-force")
+
+# Prefork mode (app/worker_supervisor.py): N child processes (at most
+# API_BURST), each started with 1/N of the API_RPS/API_BURST below
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
+IS_CHILD = CHILD_ENV in os.environ
+
 # Rate limit config
 API_RPS = float(os.getenv("API_RPS", "2"))
 API_BURST = int(os.getenv("API_BURST", "4"))
@@ -53,7 +67,16 @@ API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "5"))
 API_BACKOFF_BASE = float(os.getenv("API_BACKOFF_BASE", "0.5"))
 API_BACKOFF_CAP  = float(os.getenv("API_BACKOFF_CAP", "8.0"))
 
+# Retryable fetch failures re-enqueue the job with a broker-side delay
+# (Artemis AMQ_SCHEDULED_DELAY) instead of sleeping in the listener thread.
+# API_DEFER_RETRIES=0 restores the in-thread backoff.
+API_DEFER_RETRIES = os.getenv("API_DEFER_RETRIES", "1").lower() in ("1", "true", "yes")
+API_RETRY_DELAY_BASE = float(os.getenv("API_RETRY_DELAY_BASE", "5"))
+API_RETRY_DELAY_CAP = float(os.getenv("API_RETRY_DELAY_CAP", "300"))
+RETRY_ATTEMPT_HEADER = "x-retry-attempt"
+
 RATE_LIMITER = RateLimiter(API_RPS, burst=API_BURST)
+API_BREAKER = breaker_for(POLICE_API_URL)
 
 # ---- Observer setup -----
 SUBJECT = Subject()
@@ -70,89 +93,148 @@ def on_message(body: dict, headers: dict):
     """
     Callback for each job from ActiveMQ.
     body is already a dict: {"force": "...", "month": "YYYY-MM"}
+    Every stage runs in a tracing span (police_stage_seconds, TRACE_FILE).
     """
-    try:
-        force = body.get("force")
-        ym    = body.get("month")
-        if not force or not ym:
-            raise ValueError(f"Bad message: {body}")
-
-        logging.info("[worker] Processing %s %s", force, ym)
-
-        # 1) Fetch raw (rate-limited with backoff)
+    with job_trace(body.get("force") or "?", body.get("month") or "?",
+                   message_id=headers.get("message-id")) as trace:
+        try:
+            force = body.get("force")
+            ym    = body.get("month")
+            if not force or not ym:
+                raise ValueError(f"Bad message: {body}")
+
+            job_log.info("[worker] Processing %s %s", force, ym)
+
+            # 1) Fetch raw (rate-limited with backoff; disk cache hits skip the limiter)
+            with span("fetch") as s:
+                resp = http_get_with_backoff(
+                    POLICE_API_URL,
+                    params={"force": force, "date": ym},
+                    timeout=60,
+                    max_retries=API_MAX_RETRIES,
+                    backoff_base=API_BACKOFF_BASE,
+                    backoff_cap=API_BACKOFF_CAP,
+                    force_label=force,
+                    breaker=API_BREAKER,
+                    defer=API_DEFER_RETRIES,
+                    before_request=_rate_limit_wait,
+                )
+                s["bytes"] = len(resp.content)
+            with span("decode"):
+                data = resp.json()
+            if not isinstance(data, list):
+                data = []
+            rows = len(data)
+            trace.attrs["rows"] = rows
+
+            # 2) Ensure DB schema
+            with span("schema"):
+                engine = get_engine(settings.database_url)
+                ensure_schema(engine)
+
+            # 3) Upsert bronze + silver and refresh gold (stages traced in etl)
+            inserted = upsert_bronze_and_silver(engine, force, ym, data)
+            trace.attrs["inserted"] = inserted
+
+            # Prometheus: success
+            INGESTED_ROWS_TOTAL.labels(force=force).inc(rows)
+            JOBS_TOTAL.labels(status="ok").inc()
+
+            # 4) Publish 'done'
+            with span("publish"):
+                MQClient(MQ_HOST, MQ_PORT, MQ_USER, MQ_PASSWORD).send_json(
+                    MQ_QUEUE_DONE, {"force": force, "month": ym, "rows": rows, "inserted": inserted, "status": "ok"}
+                )
+
+            job_log.info("[worker] Completed %s %s: %d rows (inserted %d)", force, ym, rows, inserted)
+
+            # 5) Notify observers (AMQ + Email + Log)
+            with span("notify"):
+                SUBJECT.notify(JobEvent(force=force, month=ym, rows=rows, inserted=inserted, status="ok"))
+
+        except SourceConflict as e:
+            # partition came from the bulk archive; API rows would double-count it
+            trace.status = "skipped"
+            trace.attrs["error"] = str(e)
+            JOBS_TOTAL.labels(status="skipped").inc()
+            logging.warning("[worker] Skipped %s %s: %s", body.get("force"), body.get("month"), e)
+            return
+
+        except Exception as e:
+            if isinstance(e, RetryLater) and _defer(body, headers, e, trace):
+                return
+            trace.status = "error"
+            trace.attrs["error"] = str(e)
+            logging.exception("[worker] Error processing job: %s", body)
+
+            # Prometheus: error
+            JOBS_TOTAL.labels(status="error").inc()
+
+            # Notify observers about error
+            try:
+                SUBJECT.notify(JobEvent(
+                    force=body.get("force","?"), month=body.get("month","?"),
+                    rows=0, inserted=0, status="error", message=str(e)
+                ))
+            except Exception:
+                pass
+
+            # Emit error message (optional)
+            try:
+                MQClient(MQ_HOST, MQ_PORT, MQ_USER, MQ_PASSWORD).send_json(
+                    MQ_QUEUE_DONE,
+                    {"force": body.get("force"), "month": body.get("month"), "status": "error", "error": str(e)}
+                )
+            except Exception:
+                pass
+
+            # IMPORTANT: return (do not raise) if your mq listener handles DLQ/ack
+            return
+
+def _rate_limit_wait():
+    with span("rate_limit_wait"):
         RATE_LIMITER.acquire()
-        resp = http_get_with_backoff(
-            "https://data.police.uk/api/stops-force",
-            params={"force": force, "date": ym},
-            timeout=60,
-            max_retries=API_MAX_RETRIES,
-            backoff_base=API_BACKOFF_BASE,
-            backoff_cap=API_BACKOFF_CAP,
-            force_label=force,
-        )
-        data = resp.json()
-        if not isinstance(data, list):
-            data = []
-        rows = len(data)
-
-        # 2) Ensure DB schema
-        engine = get_engine(settings.database_url)
-        ensure_schema(engine)
 
-        # 3) Upsert bronze + silver and refresh gold
-        inserted = upsert_bronze_and_silver(engine, force, ym, data)
-
-        # Prometheus: success
-        INGESTED_ROWS_TOTAL.labels(force=force).inc(rows)
-        JOBS_TOTAL.labels(status="ok").inc()
-
-        # 4) Publish 'done'
+def _defer(body: dict, headers: dict, exc: RetryLater, trace) -> bool:
+    """
+    Re-enqueue the job on the fetch queue with a scheduled delivery delay
+    (upstream's Retry-After / the open circuit's remaining time, else
+    exponential backoff). False once API_MAX_RETRIES deferrals are used up.
+    """
+    attempt = int(headers.get(RETRY_ATTEMPT_HEADER) or 0) + 1
+    if attempt > API_MAX_RETRIES:
+        return False
+    delay = exc.retry_after if exc.retry_after is not None else \
+        backoff_delay(attempt - 1, API_RETRY_DELAY_BASE, API_RETRY_DELAY_CAP)
+    delay = min(delay, API_RETRY_DELAY_CAP)
+    with span("defer", attempt=attempt, delay_s=round(delay, 3)):
         MQClient(MQ_HOST, MQ_PORT, MQ_USER, MQ_PASSWORD).send_json(
-            MQ_QUEUE_DONE, {"force": force, "month": ym, "rows": rows, "inserted": inserted, "status": "ok"}
+            MQ_QUEUE_FETCH, body,
+            headers={"AMQ_SCHEDULED_DELAY": int(delay * 1000), RETRY_ATTEMPT_HEADER: attempt},
         )
+    trace.status = "deferred"
+    trace.attrs["error"] = str(exc)
+    JOBS_TOTAL.labels(status="deferred").inc()
+    logging.warning("[worker] Deferred %s %s by %.1fs (attempt %d/%d): %s",
+                    body.get("force"), body.get("month"), delay, attempt, API_MAX_RETRIES, exc)
+    return True
 
-        logging.info("[worker] Completed %s %s: %d rows (inserted %d)", force, ym, rows, inserted)
-
-        # 5) Notify observers (AMQ + Email + Log)
-        SUBJECT.notify(JobEvent(force=force, month=ym, rows=rows, inserted=inserted, status="ok"))
-
-    except Exception as e:
-        logging.exception("[worker] Error processing job: %s", body)
-
-        # Prometheus: error
-        JOBS_TOTAL.labels(status="error").inc()
-
-        # Notify observers about error
-        try:
-            SUBJECT.notify(JobEvent(
-                force=body.get("force","?"), month=body.get("month","?"),
-                rows=0, inserted=0, status="error", message=str(e)
-            ))
-        except Exception:
-            pass
-
-        # Emit error message (optional)
-        try:
-            MQClient(MQ_HOST, MQ_PORT, MQ_USER, MQ_PASSWORD).send_json(
-                MQ_QUEUE_DONE,
-                {"force": body.get("force"), "month": body.get("month"), "status": "error", "error": str(e)}
-            )
-        except Exception:
-            pass
-
-        # IMPORTANT: return (do not raise) if your mq listener handles DLQ/ack
+def main():
+    port = int(os.getenv("METRICS_PORT", "9000"))
+    if WORKER_PROCESSES > 1 and not IS_CHILD:
+        logging.info("[worker] Starting %d worker processes…", WORKER_PROCESSES)
+        Supervisor(WORKER_PROCESSES, api_rps=API_RPS, api_burst=API_BURST).run(port)
         return
 
-def main():
     logging.info("[worker] Starting…")
     mq = MQClient(MQ_HOST, MQ_PORT, MQ_USER, MQ_PASSWORD)
     mq.subscribe_json(MQ_QUEUE_FETCH, on_message)
     logging.info("[worker] Subscribed to %s", MQ_QUEUE_FETCH)
 
-    # Start metrics HTTP server
-    port = int(os.getenv("METRICS_PORT", "9000"))
-    start_worker_metrics_server(port)
-    logging.info("[worker] Prometheus metrics on :%s", port)
+    # Start metrics HTTP server (children: the supervisor serves the aggregate)
+    if not IS_CHILD:
+        start_worker_metrics_server(port)
+        logging.info("[worker] Prometheus metrics on :%s", port)
 
     while True:
         time.sleep(5)
@@ -0,0 +1,168 @@
+# app/export.py
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import io
+import json
+import math
+from typing import Iterable, Iterator, List, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from .lake_export import SILVER_COLUMNS
+from .utils import ym_to_date
+
+# Arrow types for the silver columns (dbo.fact_stop_search)
+SILVER_SCHEMA = pa.schema([
+    ("row_hash", pa.string()),
+    ("force_id", pa.string()),
+    ("stop_datetime", pa.timestamp("s")),
+    ("stop_date", pa.date32()),
+    ("type", pa.string()),
+    ("involved_person", pa.bool_()),
+    ("gender", pa.string()),
+    ("age_range", pa.string()),
+    ("self_defined_ethnicity", pa.string()),
+    ("officer_defined_ethnicity", pa.string()),
+    ("legislation", pa.string()),
+    ("object_of_search", pa.string()),
+    ("outcome", pa.string()),
+    ("outcome_linked_to_object_of_search", pa.bool_()),
+    ("outcome_object_id", pa.string()),
+    ("outcome_object_name", pa.string()),
+    ("removal_more_than_outer_clothing", pa.bool_()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("street_id", pa.int64()),
+    ("street_name", pa.string()),
+    ("month", pa.date32()),
+    ("inserted_at", pa.timestamp("s")),
+    ("updated_at", pa.timestamp("s")),
+])
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+# -----------------------
+# Reader
+# -----------------------
+
+def month_range(start: str, end: str) -> List[str]:
+    """Inclusive list of YYYY-MM from start to end."""
+    y, m = map(int, start.split("-"))
+    end_y, end_m = map(int, end.split("-"))
+    out = []
+    while (y, m) <= (end_y, end_m):
+        out.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def iter_silver_chunks(engine: Engine, force: str, months: Sequence[str],
+                       chunk_rows: int = 5000, timeout: float | None = None) -> Iterator[List[tuple]]:
+    """
+    Yield silver rows for a force over the given YYYY-MM months in chunks of
+    at most chunk_rows, fetched incrementally from the cursor (fetchmany), one
+    NOLOCK statement per month so no single read spans the whole range.
+    Ordered like /stops on IX_fact_stops_keyset (stop_datetime_key, row_hash),
+    so the index streams rows without a sort.
+    """
+    cols = ", ".join(f"[{c}]" for c in SILVER_COLUMNS)
+    sql = text(f"""
+        SELECT {cols}
+        FROM dbo.fact_stop_search WITH (NOLOCK)
+        WHERE force_id = :force AND [month] = :month
+        ORDER BY stop_datetime_key, row_hash;
+    """)
+    with engine.connect() as conn:
+        dbapi_conn = conn.connection.dbapi_connection
+        if timeout and hasattr(dbapi_conn, "timeout"):
+            dbapi_conn.timeout = math.ceil(timeout)
+        conn = conn.execution_options(stream_results=True)
+        for ym in months:
+            result = conn.execute(sql, {"force": force, "month": ym_to_date(ym)})
+            for part in result.partitions(chunk_rows):
+                yield [tuple(r) for r in part]
+
+
+# -----------------------
+# Writers: row chunks -> byte chunks
+# -----------------------
+
+def _json_default(v):
+    if isinstance(v, (dt.date, dt.datetime)):
+        return v.isoformat()
+    return str(v)
+
+
+def ndjson_chunks(chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(SILVER_COLUMNS, r)), ensure_ascii=False, default=_json_default) + "\n"
+            for r in rows
+        ).encode("utf-8")
+
+
+def csv_chunks(chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(SILVER_COLUMNS)
+    for rows in chunks:
+        w.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _DrainSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes are handed out (and dropped) as they are produced."""
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+def parquet_chunks(chunks: Iterable[List[tuple]], compression: str = "zstd") -> Iterator[bytes]:
+    """One row group per chunk; bytes are flushed to the client as each group is written."""
+    sink = _DrainSink()
+    writer = pq.ParquetWriter(sink, SILVER_SCHEMA, compression=compression)
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows)) if rows else [[] for _ in SILVER_COLUMNS]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(c, type=f.type) for c, f in zip(columns, SILVER_SCHEMA)], schema=SILVER_SCHEMA
+            ))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {"ndjson": ndjson_chunks, "csv": csv_chunks, "parquet": parquet_chunks}
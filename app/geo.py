@@ -0,0 +1,54 @@
+# app/geo.py
+from __future__ import annotations
+
+import math
+from typing import Optional, Tuple
+
+# Stops are keyed by their Web Mercator (slippy map) tile at GRID_MAX_ZOOM,
+# about 600 m x 400 m at UK latitudes. A tile at a lower zoom z contains
+# exactly the z16 tiles sharing (x >> (16 - z), y >> (16 - z)), so every
+# coarser grid is an integer division of the stored key.
+GRID_MAX_ZOOM = 16
+GRID_ZOOMS = (8, 10, 12, 14, 16)
+
+_MAX_LAT = 85.05112878  # Web Mercator cut-off
+
+
+def tile_xy(lat: Optional[float], lon: Optional[float], zoom: int = GRID_MAX_ZOOM) -> Optional[Tuple[int, int]]:
+    """Tile (x, y) containing the point, or None for missing/out-of-range coordinates."""
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    n = 1 << zoom
+    lat = max(-_MAX_LAT, min(_MAX_LAT, lat))
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(x, n - 1), min(y, n - 1)
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) of a tile."""
+    n = 1 << zoom
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def bbox_tiles(bbox: Tuple[float, float, float, float], zoom: int) -> Tuple[int, int, int, int]:
+    """Inclusive tile range (x0, y0, x1, y1) covering bbox = (min_lon, min_lat, max_lon, max_lat)."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    x0, y0 = tile_xy(max_lat, min_lon, zoom)  # tile y grows southwards
+    x1, y1 = tile_xy(min_lat, max_lon, zoom)
+    return x0, y0, x1, y1
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """'min_lon,min_lat,max_lon,max_lat' -> floats; raises ValueError."""
+    parts = [float(p) for p in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox needs 4 numbers")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValueError("bbox out of range")
+    return min_lon, min_lat, max_lon, max_lat
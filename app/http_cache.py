@@ -0,0 +1,200 @@
+# app/http_cache.py
+from __future__ import annotations
+
+import hashlib
+import zlib
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except Exception:
+    HAS_BROTLI = False
+
+
+# ---------- Validators ----------
+def make_etag(*parts) -> str:
+    """
+    Weak ETag from the parts that define a representation (endpoint, force,
+    month, data version...). Weak because CompressionMiddleware may send the
+    same tag with identity, gzip or br bodies, which are not byte-identical.
+    """
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison: ignore W/ prefixes; '*' matches anything."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag.removeprefix("W/") for t in tags)
+
+
+def conditional_response(request: Request, etag: str, cache_control: str, render: Callable[[], bytes],
+                         media_type: str = "application/json") -> Response:
+    """
+    304 when the client already holds this representation (render is never
+    called), else the rendered body with ETag + Cache-Control.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(render(), media_type=media_type, headers=headers)
+
+
+# ---------- Compression ----------
+_COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/")
+
+
+class _Gzip:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+def _accepted(accept_encoding: str) -> dict[str, float]:
+    """Codings from Accept-Encoding with their q-values, minus any refused with q=0."""
+    out = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        if q > 0 and coding.strip():
+            out[coding.strip().lower()] = q
+    return out
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Supported coding with the highest q ("*" stands for any not listed);
+    br wins ties when available. None means send the body as is.
+    """
+    accepted = _accepted(accept_encoding)
+    q = {c: accepted.get(c, accepted.get("*", 0.0)) for c in (("br", "gzip") if HAS_BROTLI else ("gzip",))}
+    best = max(q, key=q.get)
+    if q[best] <= 0 or q[best] < accepted.get("identity", 0.0):
+        return None
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Brotli (when the brotli package is installed) or gzip, whichever the
+    client's Accept-Encoding prefers, for textual responses of at least minimum_size bytes. Streaming bodies
+    are compressed chunk by chunk. Bodies already encoded, 304s and binary
+    types (e.g. Parquet) pass through untouched.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding == "br":
+            factory = lambda: _Brotli(self.brotli_quality)
+        elif coding == "gzip":
+            factory = lambda: _Gzip(self.gzip_level)
+        else:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self.app, self.minimum_size, factory)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, minimum_size: int, factory):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.factory = factory
+        self.start: Message | None = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self._send)
+
+    async def _send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            ctype = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not ctype.startswith(_COMPRESSIBLE)
+            )
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if self.passthrough or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = self.factory()
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.compressor.name
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+            else:
+                message["body"] = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(start)
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        out = self.compressor.compress(body)
+        if not more_body:
+            out += self.compressor.finish()
+        message["body"] = out
+        await self.send(message)
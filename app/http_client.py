@@ -1,8 +1,13 @@
 from __future__ import annotations
 import time, random
+from typing import Callable
+
 import requests
 
+from .circuit_breaker import CircuitBreaker, RetryLater
+from .disk_cache import http_cache
 from .metrics import API_LATENCY_SECONDS, API_CALLS_TOTAL
+from .tracing import span
 
 _RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
 
@@ -15,16 +20,42 @@ def http_get_with_backoff(
     backoff_base: float = 0.5,
     backoff_cap: float = 10.0,
     force_label: str | None = None,
+    breaker: CircuitBreaker | None = None,
+    defer: bool = False,
+    use_cache: bool = True,
+    before_request: Callable[[], None] | None = None,
 ):
     """
     GET with exponential backoff + jitter on network errors and 429/5xx.
     Emits Prometheus metrics for latency and call outcomes.
+
+    breaker: fail fast (CircuitOpenError) while the endpoint's circuit is open;
+             429/5xx and network errors count as failures.
+    defer:   never sleep; raise RetryLater on the first retryable failure so the
+             caller can reschedule the work (the worker re-enqueues the job
+             with a broker-side delay instead of blocking its listener thread).
+    use_cache: serve from / store into the on-disk cache (HTTP_CACHE_DIR);
+             hits never reach the network or the breaker.
+    before_request: called before every upstream request, after the cache
+             lookup and the breaker check (e.g. a rate limiter's acquire).
     """
+    cache = http_cache() if use_cache else None
+    if cache is not None:
+        hit = cache.get(url, params)
+        if hit is not None:
+            with span("http_cache_hit", force_label, bytes=len(hit.body)):
+                return hit.to_response(url)
     attempt = 0
     while True:
+        if breaker is not None:
+            breaker.before_call()
+        if before_request is not None:
+            before_request()
         start = time.time()
         try:
-            resp = requests.get(url, params=params, timeout=timeout)
+            with span("http_request", force_label, attempt=attempt) as sp:
+                resp = requests.get(url, params=params, timeout=timeout)
+                sp["status"] = resp.status_code
             duration = time.time() - start
             if force_label:
                 API_LATENCY_SECONDS.labels(force=force_label).observe(duration)
@@ -32,27 +63,57 @@ def http_get_with_backoff(
 
             if resp.status_code in _RETRYABLE_STATUSES:
                 # treat as retryable error
+                if breaker is not None:
+                    breaker.record_failure()
+                if defer:
+                    raise RetryLater(f"HTTP {resp.status_code} from {url}", retry_after=retry_after_seconds(resp))
                 if attempt >= max_retries:
                     resp.raise_for_status()
                 _sleep_with_jitter(attempt, backoff_base, backoff_cap)
                 attempt += 1
                 continue
 
+            if breaker is not None:
+                breaker.record_success()  # upstream answered, even if with a 4xx
             resp.raise_for_status()
-            return resp
+            break
 
-        except Exception:
+        except RetryLater:
+            raise
+        except requests.HTTPError:
+            raise
+        except Exception as e:
             duration = time.time() - start
             if force_label:
                 API_LATENCY_SECONDS.labels(force=force_label).observe(duration)
                 API_CALLS_TOTAL.labels(force=force_label, outcome="exception").inc()
+            if breaker is not None:
+                breaker.record_failure()
+            if defer:
+                raise RetryLater(f"{type(e).__name__} calling {url}: {e}") from e
             if attempt >= max_retries:
                 raise
             _sleep_with_jitter(attempt, backoff_base, backoff_cap)
             attempt += 1
 
-def _sleep_with_jitter(attempt: int, base: float, cap: float):
-    # Exponential backoff (base * 2^attempt) with full jitter, capped
+    if cache is not None:
+        cache.put_safe(url, params, resp.content, resp.headers.get("Content-Type"))
+    return resp
+
+def retry_after_seconds(resp) -> float | None:
+    """Retry-After in seconds (delta-seconds form only), else None."""
+    value = resp.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # Exponential backoff (base * 2^attempt) with jitter, capped
     delay = min(cap, base * (2 ** attempt))
-    delay *= random.uniform(0.5, 1.5)  # jitter
-    time.sleep(delay)
+    return delay * random.uniform(0.5, 1.5)  # jitter
+
+def _sleep_with_jitter(attempt: int, base: float, cap: float):
+    delay = backoff_delay(attempt, base, cap)
+    with span("http_backoff", attempt=attempt):
+        time.sleep(delay)
@@ -0,0 +1,86 @@
+# app/keyset.py
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import json
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+# Columns returned by /stops (IX_fact_stops_keyset seeks, then looks up one page of rows)
+STOP_COLUMNS = [
+    "row_hash", "month", "stop_datetime", "type", "gender", "age_range",
+    "self_defined_ethnicity", "officer_defined_ethnicity", "legislation",
+    "object_of_search", "outcome", "latitude", "longitude", "street_name",
+]
+
+# query parameter -> silver column; INCLUDEd in IX_fact_stops_keyset (see schema.sql)
+FILTERS = {
+    "outcome": "outcome",
+    "ethnicity": "officer_defined_ethnicity",
+    "legislation": "legislation",
+}
+
+Key = Tuple[dt.date, dt.datetime, str]  # (month, stop_datetime_key, row_hash)
+
+
+def encode_cursor(key: Key) -> str:
+    """Opaque page token for the last row served."""
+    month, at, row_hash = key
+    raw = json.dumps([month.isoformat(), at.isoformat(), row_hash], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Key:
+    """Raises ValueError on anything that is not a token from encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        month, at, row_hash = json.loads(raw)
+        return dt.date.fromisoformat(month), dt.datetime.fromisoformat(at), str(row_hash)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+def _as_date(v) -> dt.date:
+    return v if isinstance(v, dt.date) and not isinstance(v, dt.datetime) else dt.date.fromisoformat(str(v)[:10])
+
+
+def _as_datetime(v) -> dt.datetime:
+    return v if isinstance(v, dt.datetime) else dt.datetime.fromisoformat(str(v))
+
+
+def row_key(row: dict) -> Key:
+    return _as_date(row["month"]), _as_datetime(row["stop_datetime_key"]), row["row_hash"]
+
+
+def stops_query(filters: dict, after: Optional[Key]) -> Tuple[TextClause, dict]:
+    """
+    Page of silver rows for one force in (month, stop_datetime_key, row_hash)
+    order. Continuing after a cursor is a range predicate on the index key
+    rather than an OFFSET, so page N costs the same as page 1.
+    Expects params force, start_month, end_month and limit to be added.
+    """
+    where = ["force_id = :force", "[month] BETWEEN :start_month AND :end_month"]
+    params: dict = {}
+    for name, value in sorted(filters.items()):
+        if value is not None:
+            where.append(f"{FILTERS[name]} = :f_{name}")
+            params[f"f_{name}"] = value
+    if after is not None:
+        # expanded row-value comparison; the leading >= gives the seek start
+        where.append("""[month] >= :k_month AND (
+            [month] > :k_month
+            OR ([month] = :k_month AND (stop_datetime_key > :k_at
+                                        OR (stop_datetime_key = :k_at AND row_hash > :k_hash)))
+        )""")
+        params.update(k_month=after[0], k_at=after[1], k_hash=after[2])
+    cols = ", ".join(f"[{c}]" for c in STOP_COLUMNS)
+    sql = text(f"""
+        SELECT TOP (:limit) {cols}, stop_datetime_key
+        FROM dbo.fact_stop_search WITH (NOLOCK)
+        WHERE {" AND ".join(where)}
+        ORDER BY [month], stop_datetime_key, row_hash;
+    """)
+    return sql, params
@@ -0,0 +1,231 @@
+# app/lake_export.py
+from __future__ import annotations
+
+import datetime as dt
+import json
+import logging
+import os
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .db import get_engine
+
+
+# -----------------------
+# Layout
+# -----------------------
+#
+# <lake_dir>/
+#   _manifest.json
+#   silver/force_id=<force>/month=<YYYY-MM>/part-0.parquet
+#   gold_monthly_outcomes/force_id=<force>/month=<YYYY-MM>/part-0.parquet
+#
+# Hive-style directories, so pyarrow.dataset / DuckDB / Spark can read the
+# tree directly and prune on force_id and month. Partition columns live in
+# the path only, not inside the files.
+
+MANIFEST_NAME = "_manifest.json"
+
+SILVER_COLUMNS = [
+    "row_hash", "force_id", "stop_datetime", "stop_date", "type", "involved_person", "gender",
+    "age_range", "self_defined_ethnicity", "officer_defined_ethnicity", "legislation",
+    "object_of_search", "outcome", "outcome_linked_to_object_of_search", "outcome_object_id",
+    "outcome_object_name", "removal_more_than_outer_clothing", "latitude", "longitude",
+    "street_id", "street_name", "month", "inserted_at", "updated_at",
+]
+
+GOLD_COLUMNS = ["force_id", "month", "outcome", "count"]
+
+_PARTITION_COLUMNS = ["force_id", "month"]
+
+
+def _ym(month: dt.date) -> str:
+    return f"{month.year:04d}-{month.month:02d}"
+
+
+def partition_path(table: str, force: str, month: dt.date) -> str:
+    """Relative path of a partition file inside the lake."""
+    return f"{table}/force_id={force}/month={_ym(month)}/part-0.parquet"
+
+
+# -----------------------
+# Manifest
+# -----------------------
+
+def load_manifest(lake_dir: str) -> Dict:
+    path = os.path.join(lake_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": 1, "watermark": None, "partitions": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(lake_dir: str, manifest: Dict) -> None:
+    os.makedirs(lake_dir, exist_ok=True)
+    path = os.path.join(lake_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True, default=str)
+    os.replace(tmp, path)
+
+
+# -----------------------
+# Writing
+# -----------------------
+
+def write_partition(lake_dir: str, table: str, force: str, month: dt.date,
+                    df: pd.DataFrame, compression: str = "zstd") -> Dict:
+    """
+    Write one (force, month) partition atomically (tmp file + rename) and
+    return its manifest entry. An existing partition file is replaced.
+    """
+    rel = partition_path(table, force, month)
+    path = os.path.join(lake_dir, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    body = df.drop(columns=[c for c in _PARTITION_COLUMNS if c in df.columns])
+    tmp = path + ".tmp"
+    body.to_parquet(tmp, engine="pyarrow", compression=compression, index=False)
+    os.replace(tmp, path)
+
+    return {
+        "table": table,
+        "force_id": force,
+        "month": _ym(month),
+        "path": rel,
+        "rows": int(len(df)),
+        "bytes": os.path.getsize(path),
+        "exported_at": dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat(),
+    }
+
+
+# -----------------------
+# Export
+# -----------------------
+
+def _changed_partitions(engine: Engine, since: str | None) -> List[Tuple[str, dt.date, dt.datetime]]:
+    """
+    (force_id, month, max updated_at) for every partition whose silver rows
+    were inserted or revised (the silver MERGE sets updated_at on both), or
+    whose gold counts changed, at or after the watermark. `>=` because
+    updated_at has one-second resolution; re-exporting a partition is idempotent.
+    Read committed (no NOLOCK), so rows a writer may still roll back are not seen.
+    """
+    where = "WHERE updated_at >= :since" if since else ""
+    sql = text(f"""
+        SELECT force_id, [month], MAX(max_updated_at) AS max_updated_at
+        FROM (
+            SELECT force_id, [month], MAX(updated_at) AS max_updated_at
+            FROM dbo.fact_stop_search
+            {where}
+            GROUP BY force_id, [month]
+            UNION ALL
+            SELECT force_id, [month], MAX(updated_at)
+            FROM dbo.gold_monthly_outcomes
+            {where}
+            GROUP BY force_id, [month]
+        ) AS c
+        GROUP BY force_id, [month]
+        ORDER BY force_id, [month];
+    """).execution_options(statement_name="lake_changed_partitions")
+    with engine.connect() as conn:
+        rows = conn.execute(sql, {"since": since} if since else {}).all()
+    return [(r.force_id, r.month, r.max_updated_at) for r in rows]
+
+
+def _db_now(engine: Engine) -> dt.datetime:
+    """Server clock (the one that stamps updated_at), so app/DB clock skew can't move the watermark."""
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT SYSUTCDATETIME() AS now;")).scalar_one()
+
+
+def _read_silver(engine: Engine, force: str, month: dt.date) -> pd.DataFrame:
+    cols = ", ".join(f"[{c}]" for c in SILVER_COLUMNS)
+    sql = text(f"""
+        SELECT {cols}
+        FROM dbo.fact_stop_search
+        WHERE force_id = :force AND [month] = :month
+        ORDER BY row_hash;
+    """).execution_options(statement_name="lake_read_silver")
+    with engine.connect() as conn:
+        return pd.read_sql(sql, conn, params={"force": force, "month": month})
+
+
+def _read_gold(engine: Engine, force: str, month: dt.date) -> pd.DataFrame:
+    sql = text("""
+        SELECT force_id, [month], outcome, [count]
+        FROM dbo.gold_monthly_outcomes
+        WHERE force_id = :force AND [month] = :month
+        ORDER BY outcome;
+    """).execution_options(statement_name="lake_read_gold")
+    with engine.connect() as conn:
+        return pd.read_sql(sql, conn, params={"force": force, "month": month})
+
+
+def export_lake(engine: Engine, lake_dir: str, *, full: bool = False, compression: str = "zstd") -> int:
+    """
+    Incrementally export silver + gold to month-partitioned Parquet.
+
+    Only partitions whose silver rows were inserted or revised, or whose gold
+    counts changed, since the last run are rewritten (silver and gold together).
+    Pass full=True to ignore the watermark and re-export everything.
+    Returns number of (force, month) partitions exported.
+
+    updated_at is stamped when a MERGE runs, not when it commits, so a slow
+    writer can commit rows older than ones already exported. The stored
+    watermark therefore never passes export start minus
+    LAKE_WATERMARK_LAG_SECONDS; partitions revised inside that window are
+    simply exported again next run.
+    """
+    manifest = load_manifest(lake_dir)
+    since = None if full else manifest.get("watermark")
+    lag = dt.timedelta(seconds=settings.lake_watermark_lag_seconds)
+    settled = (_db_now(engine) - lag).replace(microsecond=0).isoformat()
+    changed = _changed_partitions(engine, since)
+    if not changed:
+        logging.info("[lake] Nothing to export (watermark=%s)", since)
+        return 0
+
+    watermark = since
+    for force, month, max_updated_at in changed:
+        silver = _read_silver(engine, force, month)
+        gold = _read_gold(engine, force, month)
+
+        entry = write_partition(lake_dir, "silver", force, month, silver, compression)
+        entry["max_updated_at"] = max_updated_at.isoformat() if max_updated_at else None
+        manifest["partitions"][entry["path"]] = entry
+
+        entry = write_partition(lake_dir, "gold_monthly_outcomes", force, month, gold, compression)
+        manifest["partitions"][entry["path"]] = entry
+
+        if max_updated_at and (watermark is None or max_updated_at.isoformat() > watermark):
+            watermark = max_updated_at.isoformat()
+
+        # persist progress per partition so an interrupted run resumes cleanly
+        manifest["watermark"] = since
+        save_manifest(lake_dir, manifest)
+        logging.info("[lake] Exported %s %s (%d silver rows)", force, _ym(month), len(silver))
+
+    manifest["watermark"] = min(watermark, settled) if watermark else watermark
+    save_manifest(lake_dir, manifest)
+    return len(changed)
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.logging_setup import setup_logging
+
+    setup_logging(app="police-tracker", filename="logs/police-tracker.log", use_stream=True, stream_json=True)
+
+    parser = argparse.ArgumentParser(description="Export silver + gold to a Parquet lake")
+    parser.add_argument("--lake-dir", default=settings.lake_dir)
+    parser.add_argument("--compression", default=settings.lake_compression)
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and re-export everything")
+    args = parser.parse_args()
+
+    n = export_lake(get_engine(settings.database_url), args.lake_dir, full=args.full, compression=args.compression)
+    logging.info("[lake] Done: %d partitions", n)
@@ -1,5 +1,6 @@
-import json, logging, os, sys, time, socket
-from logging.handlers import RotatingFileHandler, SMTPHandler
+import atexit, json, logging, math, os, queue, smtplib, sys, threading, time, socket
+from email.message import EmailMessage
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, SMTPHandler
 
 try:
     from concurrent_log_handler import ConcurrentRotatingFileHandler
@@ -8,17 +9,49 @@ except Exception:
     HAS_CONCURRENT = False
 
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+
 # ---------- Formatters ----------
+# LogRecord attributes that are never user extras
+_RESERVED = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+_BASE_KEYS = frozenset({"ts", "level", "logger", "msg", "pid", "thread", "file", "line", "exc_info"})
+
+
 class JsonFormatter(logging.Formatter):
-    """JSON formatter that includes common context + exception text."""
-    def __init__(self, *, level_as_name=True, extra_static=None):
+    """
+    JSON formatter that includes common context + exception text.
+    The static fields are serialized once at construction and the timestamp
+    once per second; orjson is used when installed (use_orjson=False to opt out).
+    """
+    def __init__(self, *, level_as_name=True, extra_static=None, use_orjson: bool | None = None):
         super().__init__()
-        self.extra_static = extra_static or {}
+        self.extra_static = dict(extra_static or {})
         self.level_as_name = level_as_name
+        self.use_orjson = HAS_ORJSON if use_orjson is None else (use_orjson and HAS_ORJSON)
+        self._skip = _RESERVED | _BASE_KEYS | self.extra_static.keys()
+        static = self._dumps(self.extra_static)
+        self._tail = "," + static[1:] if self.extra_static else "}"
+        self._ts = (None, "")
+
+    def _dumps(self, obj: dict) -> str:
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=str).decode("utf-8")
+            except TypeError:  # e.g. non-str keys in an extra
+                pass
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
 
     def format(self, record: logging.LogRecord) -> str:
+        second = int(record.created)
+        if self._ts[0] != second:
+            self._ts = (second, time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second)))
         base = {
-            "ts": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)),
+            "ts": self._ts[1],
             "level": record.levelname if self.level_as_name else record.levelno,
             "logger": record.name,
             "msg": record.getMessage(),
@@ -29,22 +62,17 @@ class JsonFormatter(logging.Formatter):
         }
 
         # Pull any logger.extra(...) fields
-        reserved = {
-            "args","asctime","created","exc_info","exc_text","filename","funcName",
-            "levelname","levelno","lineno","module","msecs","message","msg","name",
-            "pathname","process","processName","relativeCreated","stack_info","thread",
-            "threadName","taskName",
-        }
+        skip = self._skip
         for k, v in record.__dict__.items():
-            if not (k in base or k in reserved or k.startswith("_")):
+            if k not in skip and k[0] != "_":
                 base[k] = v
 
-        base.update(self.extra_static)
-
         if record.exc_info:
             base["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # already rendered by BoundedQueueHandler
+            base["exc_info"] = record.exc_text
 
-        return json.dumps(base, ensure_ascii=False)
+        return self._dumps(base)[:-1] + self._tail
 
 
 class TextFormatter(logging.Formatter):
@@ -54,6 +82,241 @@ class TextFormatter(logging.Formatter):
                          "[%(filename)s:%(lineno)d] %(message)s")
 
 
+# ---------- Non-blocking handlers ----------
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest", "block")
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler onto a bounded queue, so the calling thread only pays for
+    an enqueue. When the queue is full:
+      drop_new     discard the new record (default)
+      drop_oldest  discard the oldest queued record to make room
+      block        wait up to block_timeout seconds, then discard
+    Discarded records are counted and reported by a WARNING once the queue
+    has room again.
+    """
+    def __init__(self, q: queue.Queue, overflow: str = "drop_new", block_timeout: float = 0.5):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        super().__init__(q)
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render message and traceback now (args may not survive the thread hop),
+        # but keep the record's fields for the formatters on the listener side.
+        msg = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg, record.args, record.message = msg, None, msg
+        record.exc_info, record.exc_text = None, exc_text
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self._unreported and self._put(self._dropped_record(self._unreported)):
+            self._unreported = 0
+        if not self._put(record):
+            self.dropped += 1
+            self._unreported += 1
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        try:
+            if self.overflow == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            if self.overflow != "drop_oldest":
+                return False
+        try:
+            self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    @staticmethod
+    def _dropped_record(n: int) -> logging.LogRecord:
+        return logging.makeLogRecord({
+            "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+            "msg": f"[logging] Queue full: dropped {n} log record(s)",
+        })
+
+
+class BatchingSMTPHandler(SMTPHandler):
+    """
+    SMTPHandler that mails alerts in batches: records are buffered and sent
+    together batch_seconds after the first one (or at batch_size). At most
+    max_per_hour emails go out; beyond that records stay buffered (up to
+    max_buffer, older ones counted as suppressed) until the window allows.
+    emit() only buffers and (re)arms one timer; the mail goes out on that
+    timer's thread, so a slow SMTP server never stalls the QueueListener or
+    the application. Only explicit flush()/close() send inline.
+    """
+    def __init__(self, *args, batch_seconds: float = 60.0, batch_size: int = 100,
+                 max_per_hour: int = 10, max_buffer: int = 1000, timeout: float = 10.0, **kwargs):
+        super().__init__(*args, timeout=timeout, **kwargs)
+        self.batch_seconds = batch_seconds
+        self.batch_size = batch_size
+        self.max_per_hour = max_per_hour
+        self.max_buffer = max_buffer
+        self.buffer: list[logging.LogRecord] = []
+        self.suppressed = 0
+        self.sent_at: list[float] = []
+        self._timer: threading.Timer | None = None
+        self._due = 0.0  # monotonic time the pending timer fires
+
+    def emit(self, record: logging.LogRecord):
+        with self.lock:
+            if len(self.buffer) >= self.max_buffer:
+                self.buffer.pop(0)
+                self.suppressed += 1
+            self.buffer.append(record)
+            full = len(self.buffer) >= self.batch_size
+            if self._timer is None:
+                self._schedule(0.0 if full else self.batch_seconds)
+            elif full and self._due > (now := time.monotonic()) and not self._allowance(now):
+                # bring the pending batch timer forward; over the hourly cap it is already due when the window opens
+                self._schedule(0.0)
+
+    def _schedule(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._due = time.monotonic() + delay
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _allowance(self, now: float) -> float:
+        """0 when a mail may go out now, else seconds until one may."""
+        self.sent_at = [t for t in self.sent_at if now - t < 3600]
+        if len(self.sent_at) < self.max_per_hour:
+            return 0.0
+        return 3600 - (now - self.sent_at[0])
+
+    def flush(self):
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.buffer:
+                return
+            wait = self._allowance(time.monotonic())
+            if wait > 0:
+                self._schedule(wait)
+                return
+            records, suppressed = self.buffer, self.suppressed
+            self.buffer, self.suppressed = [], 0
+            self.sent_at.append(time.monotonic())
+        try:
+            self._send(records, suppressed)
+        except Exception:
+            self.handleError(records[-1])
+
+    def _send(self, records: list[logging.LogRecord], suppressed: int):
+        msg = EmailMessage()
+        msg["From"] = self.fromaddr
+        msg["To"] = ",".join(self.toaddrs)
+        msg["Subject"] = f"{self.getSubject(records[0])} ({len(records)} record(s))"
+        lines = [self.format(r) for r in records]
+        if suppressed:
+            lines.append(f"... and {suppressed} earlier record(s) not shown")
+        msg.set_content("\n\n".join(lines))
+        port = self.mailport or smtplib.SMTP_PORT
+        with smtplib.SMTP(self.mailhost, port, timeout=self.timeout) as smtp:
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(msg)
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+# ---------- Sampling ----------
+class SamplingFilter(logging.Filter):
+    """
+    Thins out chatty low-level records per logger. Rules are keyed by logger
+    name and match that logger and its children (most specific wins):
+      sample      keep this fraction of records (0.1 = every 10th, first kept)
+      rate_limit  keep at most this many records per second
+    A "root" rule applies to loggers no other rule matches. Only records
+    below min_level (WARNING by default) are affected. Once a rule has
+    dropped records, the next record it keeps carries suppressed=<count>.
+    """
+    def __init__(self, sample: dict[str, float] | None = None, rate_limit: dict[str, float] | None = None,
+                 min_level: int = logging.WARNING):
+        super().__init__()
+        self.sample = dict(sample or {})
+        self.rate_limit = dict(rate_limit or {})
+        self.min_level = min_level
+        self._names = sorted(self.sample.keys() | self.rate_limit.keys(), key=len, reverse=True)
+        self._rules: dict[str, str | None] = {}
+        self._seen: dict[str, int] = {}
+        self._tokens: dict[str, tuple[float, float]] = {}
+        self._suppressed: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _rule(self, name: str) -> str | None:
+        rule = self._rules.get(name, "")
+        if rule == "":
+            fallback = "root" if "root" in self._names else None
+            rule = next((n for n in self._names if name == n or name.startswith(n + ".")), fallback)
+            self._rules[name] = rule
+        return rule
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level or not self._names:
+            return True
+        decided = getattr(record, "_sampled", None)  # same record seen by another handler
+        if decided is not None:
+            return decided
+        rule = self._rule(record.name)
+        if rule is None:
+            return True
+        with self._lock:
+            keep = True
+            rate = self.sample.get(rule)
+            if rate is not None:
+                n = self._seen.get(rule, 0) + 1
+                self._seen[rule] = n
+                keep = math.ceil(n * rate) > math.ceil((n - 1) * rate)
+            limit = self.rate_limit.get(rule)
+            if keep and limit:
+                now = time.monotonic()
+                tokens, last = self._tokens.get(rule, (limit, now))
+                tokens = min(limit, tokens + (now - last) * limit)
+                keep = tokens >= 1
+                self._tokens[rule] = (tokens - 1 if keep else tokens, now)
+            if not keep:
+                self._suppressed[rule] = self._suppressed.get(rule, 0) + 1
+            suppressed = self._suppressed.pop(rule, 0) if keep else 0
+        record._sampled = keep
+        if suppressed:
+            record.suppressed = suppressed
+        return keep
+
+
+def _parse_rules(spec: str | None) -> dict[str, float]:
+    """'app.worker.jobs=0.1,app.producer=20' -> {'app.worker.jobs': 0.1, 'app.producer': 20.0}"""
+    rules = {}
+    for part in (spec or "").split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip():
+            rules[name.strip()] = float(value)
+    return rules
+
+
 # ---------- Utilities ----------
 def _detect_environment() -> str:
     hostname = socket.gethostname().casefold()
@@ -79,19 +342,22 @@ def _parse_level(val: str | int | None, default_env="LOG_LEVEL", default="INFO")
 
 def _smtp_handler_mailhog(app: str, environment: str, alert_to: str, level: int) -> SMTPHandler:
     """
-    SMTP handler targeting MailHog (or compatible dev SMTP).
+    Batched, rate-limited SMTP handler targeting MailHog (or compatible dev SMTP).
     Configure via env if needed:
       SMTP_HOST=localhost  SMTP_PORT=1025  SMTP_FROM=app@local
+      ALERT_BATCH_SECONDS=60  ALERT_MAX_PER_HOUR=10
     """
     smtp_host = os.getenv("SMTP_HOST", "localhost")
     smtp_port = int(os.getenv("SMTP_PORT", "1025"))
     from_addr = os.getenv("SMTP_FROM", f"{app}@local")
 
-    h = SMTPHandler(
+    h = BatchingSMTPHandler(
         mailhost=(smtp_host, smtp_port),
         fromaddr=from_addr,
         toaddrs=[e.strip() for e in alert_to.split(",") if e.strip()],
         subject=f"[{environment}] Log Alert: {app}",
+        batch_seconds=float(os.getenv("ALERT_BATCH_SECONDS", "60")),
+        max_per_hour=int(os.getenv("ALERT_MAX_PER_HOUR", "10")),
     )
     h.setLevel(level)
     # Emails are nicer as text
@@ -118,9 +384,22 @@ def setup_logging(
     alert_minimum_level: str | int = logging.ERROR,
     # Extra context
     extra_static: dict | None = None,
+    # Background queue (handlers run on a listener thread)
+    use_queue: bool = True,
+    queue_size: int | None = None,
+    overflow: str | None = None,
+    # Sampling / rate limiting of INFO-and-below, per logger
+    sample: dict[str, float] | None = None,
+    rate_limit: dict[str, float] | None = None,
 ) -> logging.Logger:
     """
     Combine JSON stdout + rotating file + MailHog SMTP alerts.
+    With use_queue (default) the root logger only gets a BoundedQueueHandler;
+    the real handlers run on a QueueListener thread, so a slow disk or SMTP
+    server never stalls the caller. LOG_QUEUE_SIZE (10000) and
+    LOG_QUEUE_OVERFLOW (drop_new | drop_oldest | block) tune the buffer.
+    LOG_SAMPLE / LOG_RATE_LIMIT ("logger=value,...") thin out chatty INFO
+    loggers before they are queued (see SamplingFilter).
     Call once at process start.
     """
     env = environment or _detect_environment()
@@ -135,17 +414,19 @@ def setup_logging(
     root = logging.getLogger()
 
     # Clear existing handlers to avoid duplicates on re-init
+    _stop_listener()
     for h in list(root.handlers):
         root.removeHandler(h)
 
     root.setLevel(lvl)
+    handlers: list[logging.Handler] = []
 
     # Stream handler (stdout)
     if use_stream:
         sh = logging.StreamHandler(sys.stdout)
         sh.setLevel(lvl)
         sh.setFormatter(JsonFormatter(extra_static=extra_static) if stream_json else TextFormatter())
-        root.addHandler(sh)
+        handlers.append(sh)
 
     # File handler (rotating)
     if filename:
@@ -156,17 +437,51 @@ def setup_logging(
             fh = RotatingFileHandler(filename=filename, maxBytes=rolling_max_bytes, backupCount=backup_count)
         fh.setLevel(lvl)
         fh.setFormatter(JsonFormatter(extra_static=extra_static) if file_json else TextFormatter())
-        root.addHandler(fh)
+        handlers.append(fh)
 
     # MailHog alerts
     if alert_to:
         ah = _smtp_handler_mailhog(app, env, alert_to, _parse_level(alert_minimum_level, default="ERROR"))
-        root.addHandler(ah)
+        handlers.append(ah)
+
+    sampling = SamplingFilter(
+        sample if sample is not None else _parse_rules(os.getenv("LOG_SAMPLE")),
+        rate_limit if rate_limit is not None else _parse_rules(os.getenv("LOG_RATE_LIMIT")),
+    )
+    if use_queue and handlers:
+        global _listener
+        q: queue.Queue = queue.Queue(queue_size or int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        qh = BoundedQueueHandler(q, overflow or os.getenv("LOG_QUEUE_OVERFLOW", "drop_new"))
+        qh.addFilter(sampling)
+        root.addHandler(qh)
+        _listener = QueueListener(q, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for h in handlers:
+            h.addFilter(sampling)
+            root.addHandler(h)
 
     root.propagate = False
     return root
 
 
+_listener: QueueListener | None = None
+
+
+def _stop_listener():
+    """Drain the queue, then flush and close the listener's handlers."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for h in listener.handlers:
+        h.close()
+
+
+atexit.register(_stop_listener)
+
+
 # ---------- Back-compat wrapper (mirrors your earlier signature) ----------
 def setup_log(
     app: str,
@@ -1,14 +1,16 @@
 from __future__ import annotations
 from prometheus_client import (
-    Counter, Histogram, Gauge,
+    Counter, Histogram, Gauge, CollectorRegistry, multiprocess,
     generate_latest, CONTENT_TYPE_LATEST, REGISTRY, start_http_server
 )
 
+from .db_instrument import DbMetrics
+
 # Worker job metrics
 JOBS_TOTAL = Counter(
     "police_jobs_total",
     "Jobs processed by the worker",
-    ["status"]  # ok|error
+    ["status"]  # ok|error|deferred|skipped
 )
 
 INGESTED_ROWS_TOTAL = Counter(
@@ -30,6 +32,38 @@ API_LATENCY_SECONDS = Histogram(
     ["force"]
 )
 
+# Circuit breakers (app/circuit_breaker.py), one per upstream endpoint
+CIRCUIT_STATE = Gauge(
+    "police_circuit_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["endpoint"],
+    multiprocess_mode="livemax",  # prefork workers: worst state among live children
+)
+
+CIRCUIT_REJECTED_TOTAL = Counter(
+    "police_circuit_rejected_total",
+    "Calls rejected without reaching upstream because the circuit was open",
+    ["endpoint"]
+)
+
+# On-disk Police API response cache (app/disk_cache.py)
+HTTP_CACHE_REQUESTS = Counter(
+    "police_http_cache_requests_total",
+    "Police API response cache lookups",
+    ["endpoint_class", "result"]  # hit|miss|expired
+)
+
+# Pipeline stage timings (app/tracing.py spans)
+STAGE_SECONDS = Histogram(
+    "police_stage_seconds",
+    "Time spent per ETL stage",
+    ["stage", "force"],  # fetch|decode|bronze_insert|silver_merge|gold_refresh|publish|...
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+# Database statements / pool (app/db_instrument.py hooks on get_engine engines)
+DB_METRICS = DbMetrics(REGISTRY)
+
 def start_worker_metrics_server(port: int = 9000, addr: str = "0.0.0.0"):
     """
     Starts a tiny HTTP server in the worker that serves / (the metrics payload)
@@ -37,6 +71,15 @@ def start_worker_metrics_server(port: int = 9000, addr: str = "0.0.0.0"):
     """
     start_http_server(port, addr=addr)
 
+def start_multiprocess_metrics_server(port: int, path: str, addr: str = "0.0.0.0"):
+    """
+    Prefork worker (app/worker_supervisor.py): serves the metrics of all
+    children, aggregated from their files in PROMETHEUS_MULTIPROC_DIR (path).
+    """
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    start_http_server(port, addr=addr, registry=registry)
+
 def render_prometheus() -> bytes:
     """
     Use this in FastAPI to render /metrics.
@@ -19,6 +19,7 @@ class MQClient:
         self.dlq_on_error = os.getenv("DLQ_ON_ERROR", "1").lower() in ("1","true","yes")
         self.dlq_queue = os.getenv("MQ_QUEUE_DLQ", "/queue/police.dlq")
         self._handler = None
+        self._destination = None
 
     def connect(self):
         if not self.conn.is_connected():
@@ -26,6 +27,9 @@ class MQClient:
                 self.user, self.password, wait=True,
                 heartbeats=(self.heartbeat_ms_out, self.heartbeat_ms_in),
             )
+            # a fresh STOMP session has no subscriptions: restore ours
+            if self._destination:
+                self.conn.subscribe(destination=self._destination, id="police-sub", ack="client-individual")
 
     def _reconnect(self, delay=0.5):
         try:
@@ -47,16 +51,18 @@ class MQClient:
         self._handler = handler
         self.connect()
         self.conn.subscribe(destination=destination, id="police-sub", ack="client-individual")
+        self._destination = destination
 
-    def send_json(self, destination: str, obj: dict, _attempt=1):
+    def send_json(self, destination: str, obj: dict, headers: dict | None = None, _attempt=1):
+        """headers: extra STOMP headers, e.g. {"AMQ_SCHEDULED_DELAY": 30000} (Artemis, ms)"""
         try:
             self.connect()
-            self.conn.send(destination, json.dumps(obj))
+            self.conn.send(destination, json.dumps(obj), headers=headers)
         except _RETRYABLE as e:
             if _attempt <= 2:
                 logging.warning("[MQ] send_json retry after %s: %s", type(e).__name__, e)
                 self._reconnect()
-                return self.send_json(destination, obj, _attempt=_attempt+1)
+                return self.send_json(destination, obj, headers, _attempt=_attempt+1)
             raise
 
     # Helpers used by listener with retry
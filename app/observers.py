@@ -8,6 +8,8 @@ import stomp    # make sure stomp.py is in requirements
 from .email import send_email
 from .job_events import JobEvent, Observer # your SMTP helper
 
+logger = logging.getLogger("app.observers")
+
 class ActiveMQReporter(Observer):
     def __init__(self, host: str, port: int, username: str, password: str, destination: str) -> None:
         self.host = host
@@ -25,7 +27,7 @@ class ActiveMQReporter(Observer):
             "status": event.status,
             "message": event.message,
         }
-        logging.info("[ActiveMQReporter] publish -> %s : %s", self.destination, payload)
+        logger.info("[ActiveMQReporter] publish -> %s : %s", self.destination, payload)
         conn = stomp.StompConnection12([(self.host, self.port)], keepalive=True)
         try:
             conn.connect(self.username, self.password, wait=True)
@@ -73,7 +75,7 @@ class EmailReporter(Observer):
         if event.message:
             body += f"<pre>{event.message}</pre>"
 
-        logging.info("[EmailReporter] sending to %s", self.to)
+        logger.info("[EmailReporter] sending to %s", self.to)
         send_email(
             sender=self.sender,
             receivers=self.to,
@@ -85,7 +87,7 @@ class EmailReporter(Observer):
 
 class LogReporter(Observer):
     def update(self, event: JobEvent) -> None:
-        logging.info(
+        logger.info(
             "[LogReporter] %s %s rows=%s inserted=%s status=%s msg=%s",
             event.force, event.month, event.rows, event.inserted, event.status, event.message
         )
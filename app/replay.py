@@ -0,0 +1,131 @@
+# app/replay.py
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .db import get_engine, ensure_schema
+from .etl import _month_first_day, upsert_silver_and_gold
+
+
+# -----------------------
+# Bronze readers
+# -----------------------
+
+def bronze_partitions(engine: Engine, forces: Iterable[str] | None = None,
+                      start_month: str | None = None, end_month: str | None = None) -> List[Tuple[str, str]]:
+    """
+    (force, YYYY-MM) pairs present in bronze, optionally limited to forces and
+    an inclusive month range. forces=None means every force in bronze.
+    """
+    clauses, params = [], {}
+    if start_month:
+        clauses.append("[month] >= :start")
+        params["start"] = _month_first_day(start_month)
+    if end_month:
+        clauses.append("[month] <= :end")
+        params["end"] = _month_first_day(end_month)
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+    sql = text(f"""
+        SELECT DISTINCT force_id, [month]
+        FROM dbo.bronze_stop_search
+        {where}
+        ORDER BY [month], force_id;
+    """).execution_options(statement_name="bronze_partitions")
+    wanted = set(forces) if forces else None
+    with engine.connect() as conn:
+        rows = conn.execute(sql, params).all()
+    return [
+        (r.force_id, f"{r.month.year:04d}-{r.month.month:02d}")
+        for r in rows
+        if wanted is None or r.force_id in wanted
+    ]
+
+
+def read_bronze(engine: Engine, force: str, ym: str) -> List[Dict]:
+    """Raw source records for one (force, month), as originally fetched."""
+    sql = text("""
+        SELECT payload
+        FROM dbo.bronze_stop_search
+        WHERE force_id = :force AND [month] = :month;
+    """).execution_options(statement_name="bronze_read")
+    with engine.connect() as conn:
+        rows = conn.execute(sql, {"force": force, "month": _month_first_day(ym)}).scalars().all()
+    return [json.loads(p) for p in rows]
+
+
+# -----------------------
+# Replay
+# -----------------------
+
+def replay_partition(engine: Engine, force: str, ym: str, db_slots: threading.BoundedSemaphore) -> int:
+    """Rebuild silver + gold for one (force, month) from bronze. Returns silver inserts."""
+    with db_slots:
+        records = read_bronze(engine, force, ym)
+    if not records:
+        return 0
+    with db_slots:
+        return upsert_silver_and_gold(engine, force, ym, records)
+
+
+def replay(engine: Engine, pairs: List[Tuple[str, str]], *,
+           max_workers: int = 4, db_concurrency: int = 2) -> Dict[str, int]:
+    """
+    Re-run the silver/gold pipeline for the given (force, YYYY-MM) pairs
+    straight from bronze - no Police API calls.
+
+    Months run in parallel on max_workers threads; at most db_concurrency of
+    them talk to the database at once so a replay cannot starve live ingest.
+    """
+    db_slots = threading.BoundedSemaphore(max(1, db_concurrency))
+    stats = {"partitions": 0, "inserted": 0, "errors": 0}
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="replay") as pool:
+        futures = {pool.submit(replay_partition, engine, force, ym, db_slots): (force, ym) for force, ym in pairs}
+        for fut in as_completed(futures):
+            force, ym = futures[fut]
+            try:
+                inserted = fut.result()
+                stats["partitions"] += 1
+                stats["inserted"] += inserted
+                logging.info("[replay] %s %s: inserted %d", force, ym, inserted)
+            except Exception:
+                stats["errors"] += 1
+                logging.exception("[replay] Failed %s %s", force, ym)
+
+    logging.info("[replay] Done %d partitions in %.1fs (inserted %d, errors %d)",
+                 stats["partitions"], time.monotonic() - started, stats["inserted"], stats["errors"])
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.logging_setup import setup_logging
+
+    setup_logging(app="police-tracker", filename="logs/police-tracker.log", use_stream=True, stream_json=True)
+
+    parser = argparse.ArgumentParser(description="Rebuild silver + gold from bronze without refetching")
+    parser.add_argument("--forces", default=",".join(settings.forces),
+                        help="comma-separated force ids, or 'all' for every force in bronze")
+    parser.add_argument("--start", default=None, help="first month YYYY-MM (inclusive)")
+    parser.add_argument("--end", default=None, help="last month YYYY-MM (inclusive)")
+    parser.add_argument("--workers", type=int, default=settings.max_workers)
+    parser.add_argument("--db-concurrency", type=int, default=settings.replay_db_concurrency)
+    args = parser.parse_args()
+
+    engine = get_engine(settings.database_url)
+    ensure_schema(engine)
+    forces = None if args.forces == "all" else [f.strip() for f in args.forces.split(",") if f.strip()]
+    pairs = bronze_partitions(engine, forces, args.start, args.end)
+    logging.info("[replay] %d partitions to rebuild", len(pairs))
+    replay(engine, pairs, max_workers=args.workers, db_concurrency=args.db_concurrency)
@@ -24,6 +24,9 @@ logger.info(
     f"forces={settings.forces}, cron='{settings.cron_schedule}'"
 )
 
+# One INFO line per enqueued job (sampled / rate-limited via LOG_SAMPLE, LOG_RATE_LIMIT)
+job_log = logging.getLogger("app.producer.jobs")
+
 MQ_HOST = os.getenv("MQ_HOST", "activemq")
 MQ_PORT = int(os.getenv("MQ_PORT", "61613"))
 MQ_USER = os.getenv("MQ_USER", "admin")
@@ -44,7 +47,7 @@ def enqueue_all():
     mq = MQClient(MQ_HOST, MQ_PORT, MQ_USER, MQ_PASSWORD)
     for force_id, ym in pairs:
         mq.send_json(MQ_QUEUE_FETCH, {"force": force_id, "month": ym})
-        logging.info(f"[producer] Enqueued {force_id} {ym}")
+        job_log.info("[producer] Enqueued %s %s", force_id, ym)
 
 def main_job():
     enqueue_all()
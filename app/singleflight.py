@@ -0,0 +1,69 @@
+# app/singleflight.py
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import HTTPException
+
+from .db_async import wait_disconnect
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical async computations.
+    While a call for `key` is in flight, further callers await the same task
+    instead of starting their own. Waiters are counted: one caller going away
+    (cancelled, or its client disconnected) leaves the work running for the
+    others, and the task is cancelled (so its query is too) only when the
+    last waiter leaves.
+    """
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, _Flight] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], *,
+                 request: Any = None) -> tuple[Any, bool]:
+        """
+        Returns (result, shared); shared is True when this caller joined an
+        existing flight. With `request`, raises 499 once its client disconnects.
+        """
+        flight = self._inflight.get(key)
+        shared = flight is not None
+        if not shared:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda t: self._forget(key, flight))
+        flight.waiters += 1
+        try:
+            if request is None:
+                return await asyncio.shield(flight.task), shared
+            watcher = asyncio.ensure_future(wait_disconnect(request))
+            try:
+                await asyncio.wait({flight.task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                watcher.cancel()
+            if not flight.task.done():
+                raise HTTPException(status_code=499, detail="Client closed request")
+            return flight.task.result(), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._forget(key, flight)  # later callers start a new flight
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if flight.task.done() and not flight.task.cancelled():
+            flight.task.exception()  # mark retrieved; callers already saw it
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,80 @@
+# app/timeseries.py
+from __future__ import annotations
+
+import datetime as dt
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from sqlalchemy import text
+
+# Rollup reads: a few hundred rows per force-year whatever the stop volume
+DAILY_SQL = text("""
+    SELECT stop_date, SUM([count]) AS [count]
+    FROM dbo.gold_daily_counts
+    WHERE force_id = :force AND [month] BETWEEN :start_month AND :end_month
+    GROUP BY stop_date;
+""").execution_options(statement_name="api_daily")
+
+HOUR_OF_WEEK_SQL = text("""
+    SELECT dow, [hour], SUM([count]) AS [count]
+    FROM dbo.gold_hour_of_week
+    WHERE force_id = :force AND [month] BETWEEN :start_month AND :end_month
+    GROUP BY dow, [hour];
+""").execution_options(statement_name="api_hour_of_week")
+
+GRAINS = ("day", "week", "month", "hour_of_week")
+
+# the last day of end_ym is found from the first day of the month after it
+MAX_YEAR = dt.MAXYEAR - 1
+
+
+def month_bounds(start_ym: str, end_ym: str, max_months: int | None = None) -> tuple[dt.date, dt.date]:
+    """
+    First day of start_ym and last day of end_ym. Raises ValueError for years
+    outside 1..MAX_YEAR or for more than max_months months in the range.
+    """
+    (y0, m0), (y1, m1) = (map(int, ym.split("-")) for ym in (start_ym, end_ym))
+    if not (1 <= y0 <= MAX_YEAR and 1 <= y1 <= MAX_YEAR):
+        raise ValueError(f"years must be between 1 and {MAX_YEAR}")
+    if max_months is not None and (y1 * 12 + m1) - (y0 * 12 + m0) + 1 > max_months:
+        raise ValueError(f"at most {max_months} months per request")
+    first = dt.date(y0, m0, 1)
+    last = (dt.date(y1 + m1 // 12, m1 % 12 + 1, 1) - dt.timedelta(days=1))
+    return first, last
+
+
+def _period(d: dt.date, grain: str) -> dt.date:
+    if grain == "week":
+        return d - dt.timedelta(days=d.weekday())  # ISO week, starting Monday
+    if grain == "month":
+        return d.replace(day=1)
+    return d
+
+
+def _as_date(v) -> dt.date:
+    return v if isinstance(v, dt.date) else dt.date.fromisoformat(str(v)[:10])
+
+
+def date_series(rows: Iterable[dict], first: dt.date, last: dt.date, grain: str) -> List[Dict]:
+    """
+    Daily rollup rows -> [{"period", "count"}] at day/week/month grain,
+    with zero-filled periods so charts get a continuous axis.
+    """
+    counts: Counter = Counter()
+    for r in rows:
+        counts[_period(_as_date(r["stop_date"]), grain)] += r["count"]
+    out, seen = [], set()
+    d = first
+    while d <= last:
+        p = _period(d, grain)
+        if p not in seen:
+            seen.add(p)
+            out.append({"period": p.isoformat(), "count": counts.get(p, 0)})
+        d += dt.timedelta(days=1)
+    return out
+
+
+def hour_of_week_series(rows: Iterable[dict]) -> List[Dict]:
+    """All 168 (dow, hour) buckets, Monday 00:00 first."""
+    counts = {(int(r["dow"]), int(r["hour"])): r["count"] for r in rows}
+    return [{"dow": dow, "hour": h, "count": counts.get((dow, h), 0)} for dow in range(1, 8) for h in range(24)]
@@ -0,0 +1,103 @@
+# app/tracing.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from .config import settings
+from .metrics import STAGE_SECONDS
+
+
+class JobTrace:
+    """Spans recorded for one job (force, month), in completion order."""
+    def __init__(self, force: str, month: str, **attrs):
+        self.force = force
+        self.month = month
+        self.attrs = attrs
+        self.spans: list[dict] = []
+        self.started = time.perf_counter()
+        self.status = "ok"
+
+    def record(self) -> dict:
+        return {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "force": self.force,
+            "month": self.month,
+            "status": self.status,
+            "seconds": round(time.perf_counter() - self.started, 6),
+            **self.attrs,
+            "spans": self.spans,
+        }
+
+
+_trace: ContextVar[Optional[JobTrace]] = ContextVar("job_trace", default=None)
+_parent: ContextVar[Optional[str]] = ContextVar("span_parent", default=None)
+_file_lock = threading.Lock()
+
+
+@contextmanager
+def span(stage: str, force: Optional[str] = None, **attrs) -> Iterator[dict]:
+    """
+    Time a pipeline stage into police_stage_seconds{stage, force}; inside a
+    job_trace the span is also kept for the job's trace record. Yields a dict
+    for attributes known only at the end (e.g. rows).
+    """
+    trace = _trace.get()
+    force = force or (trace.force if trace else "")
+    extra = dict(attrs)
+    token = _parent.set(stage)
+    t0 = time.perf_counter()
+    try:
+        yield extra
+    except BaseException:
+        extra["error"] = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        _parent.reset(token)
+        STAGE_SECONDS.labels(stage=stage, force=force).observe(elapsed)
+        if trace is not None:
+            trace.spans.append({
+                "stage": stage,
+                "parent": _parent.get(),
+                "start": round(t0 - trace.started, 6),
+                "seconds": round(elapsed, 6),
+                **extra,
+            })
+
+
+@contextmanager
+def job_trace(force: str, month: str, **attrs) -> Iterator[JobTrace]:
+    """
+    Collect the spans of one job; appended to TRACE_FILE (JSONL) when set.
+    A trace that cannot be written is logged and dropped; it never changes
+    the job's outcome.
+    """
+    trace = JobTrace(force, month, **attrs)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    except BaseException:
+        trace.status = "error"
+        raise
+    finally:
+        _trace.reset(token)
+        if settings.trace_file:
+            try:
+                write_trace(settings.trace_file, trace.record())
+            except OSError:
+                logging.warning("[trace] Could not write %s", settings.trace_file, exc_info=True)
+
+
+def write_trace(path: str, record: dict) -> None:
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _file_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
@@ -1,7 +1,12 @@
 # app/transform.py
 from __future__ import annotations
 from typing import List, Dict
+import datetime as dt
 import hashlib
+from zoneinfo import ZoneInfo
+
+from .geo import tile_xy
+from .utils import parse_dt
 
 def _hash_record(record: dict) -> str:
     """
@@ -11,23 +16,47 @@ def _hash_record(record: dict) -> str:
     raw = str(sorted(record.items()))
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
+def _to_float(v):
+    try:
+        return float(v) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+UK = ZoneInfo("Europe/London")
+
+def _to_utc_naive(d: dt.datetime | None) -> dt.datetime | None:
+    # DATETIME2 has no offset: store UTC
+    if d is not None and d.tzinfo is not None:
+        d = d.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return d
+
+def _uk_date(utc: dt.datetime | None) -> dt.date | None:
+    # calendar day in UK local time, the time base of every time-series rollup
+    return utc.replace(tzinfo=dt.timezone.utc).astimezone(UK).date() if utc is not None else None
+
 def to_silver_rows(force: str, ym: str, raw: List[Dict]) -> List[Dict]:
     """
     Transform raw Police API stop-and-search JSON (bronze)
-    into silver rows ready for SQL upsert.
+    into silver rows (dbo.fact_stop_search columns) ready for SQL upsert.
     """
+    y, m = ym.split("-")
+    month = dt.date(int(y), int(m), 1)
     silver = []
     for rec in raw:
+        loc = rec.get("location") or {}
+        street = loc.get("street") or {}
+        outcome_object = rec.get("outcome_object") or {}
+        stop_dt = _to_utc_naive(parse_dt(rec.get("datetime"))[0])
+        lat, lon = _to_float(loc.get("latitude")), _to_float(loc.get("longitude"))
+        tile_x, tile_y = tile_xy(lat, lon) or (None, None)
         row = {
-            "force": force,
-            "year_month": ym,
+            "row_hash": _hash_record(rec),
+            "force_id": force,
+            "month": month,
+            "stop_datetime": stop_dt,
+            "stop_date": _uk_date(stop_dt),
+            "type": rec.get("type"),
             "involved_person": rec.get("involved_person"),
-            "datetime": rec.get("datetime"),
-            "operation": rec.get("operation"),
-            "operation_name": rec.get("operation_name"),
-            "location_type": rec.get("location", {}).get("location_type") if rec.get("location") else None,
-            "latitude": rec.get("location", {}).get("latitude") if rec.get("location") else None,
-            "longitude": rec.get("location", {}).get("longitude") if rec.get("location") else None,
             "gender": rec.get("gender"),
             "age_range": rec.get("age_range"),
             "self_defined_ethnicity": rec.get("self_defined_ethnicity"),
@@ -35,9 +64,17 @@ def to_silver_rows(force: str, ym: str, raw: List[Dict]) -> List[Dict]:
             "legislation": rec.get("legislation"),
             "object_of_search": rec.get("object_of_search"),
             "outcome": rec.get("outcome"),
-            "outcome_linked_to_object": rec.get("outcome_linked_to_object_of_search"),
-            "removal_of_more_than_outer_clothing": rec.get("removal_of_more_than_outer_clothing"),
-            "row_hash": _hash_record(rec),
+            "outcome_linked_to_object_of_search": rec.get("outcome_linked_to_object_of_search"),
+            "outcome_object_id": outcome_object.get("id"),
+            "outcome_object_name": outcome_object.get("name"),
+            "removal_more_than_outer_clothing": rec.get("removal_of_more_than_outer_clothing",
+                                                        rec.get("removal_more_than_outer_clothing")),
+            "latitude": lat,
+            "longitude": lon,
+            "tile_x": tile_x,
+            "tile_y": tile_y,
+            "street_id": street.get("id"),
+            "street_name": street.get("name"),
         }
         silver.append(row)
     return silver
@@ -0,0 +1,166 @@
+# app/worker_supervisor.py
+"""
+Prefork mode for app.etl_worker (WORKER_PROCESSES > 1).
+
+The supervisor starts N child processes (`python -m app.etl_worker` with
+WORKER_CHILD_INDEX set). Each child has its own STOMP subscription, DB
+pool, GIL and log file, and gets 1/N of API_RPS and API_BURST so the node
+as a whole keeps to the Police API rate limit (N is capped at API_BURST, as
+no child can have a burst below 1). Children write their metrics to
+PROMETHEUS_MULTIPROC_DIR; the supervisor serves the aggregate on
+METRICS_PORT. A child that exits is restarted with exponential backoff
+(reset once it has stayed up for `stable_after` seconds); SIGTERM/SIGINT
+stop the children and then the supervisor.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+CHILD_ENV = "WORKER_CHILD_INDEX"
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+logger = logging.getLogger("app.supervisor")
+
+
+def child_env(index: int, processes: int, api_rps: float, api_burst: int, base: dict | None = None) -> dict:
+    """Environment for child `index`: its share of the API rate limit, multiprocess metrics dir."""
+    env = dict(os.environ if base is None else base)
+    env[CHILD_ENV] = str(index)
+    env["API_RPS"] = repr(api_rps / processes)
+    env["API_BURST"] = str(max(1, api_burst // processes))
+    return env
+
+
+def child_log_filename(filename: str) -> str:
+    """
+    Per-child log file (police-tracker.log -> police-tracker.worker-2.log):
+    rotating one file from several processes is unsafe without
+    concurrent-log-handler. Unchanged outside a child.
+    """
+    index = os.environ.get(CHILD_ENV)
+    if index is None:
+        return filename
+    root, ext = os.path.splitext(filename)
+    return f"{root}.worker-{index}{ext}"
+
+
+def prepare_metrics_dir(directory: str | None = None) -> str:
+    """Empty multiprocess metrics directory (stale files from a previous run would be summed in)."""
+    directory = directory or os.environ.get(MULTIPROC_ENV) or os.path.join(tempfile.gettempdir(), "police-worker-metrics")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+    os.environ[MULTIPROC_ENV] = directory
+    return directory
+
+
+@dataclass
+class _Child:
+    index: int
+    proc: Optional[subprocess.Popen] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    backoff: float = 0.0
+    restart_at: float = 0.0
+    exits: list = field(default_factory=list)
+
+
+class Supervisor:
+    def __init__(self, processes: int, *, api_rps: float, api_burst: int,
+                 command: list[str] | None = None, min_backoff: float = 1.0, max_backoff: float = 30.0,
+                 stable_after: float = 60.0, metrics_dir: str | None = None):
+        if processes > max(1, api_burst):
+            # every child needs a burst of at least 1: more would exceed API_BURST
+            logger.warning("[supervisor] %d processes > API_BURST=%d; starting %d",
+                           processes, api_burst, max(1, api_burst))
+            processes = max(1, api_burst)
+        self.processes = processes
+        self.api_rps = api_rps
+        self.api_burst = api_burst
+        self.command = command or [sys.executable, "-m", "app.etl_worker"]
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.metrics_dir = prepare_metrics_dir(metrics_dir)
+        self.children = [_Child(i) for i in range(processes)]
+        self._stopping = False
+
+    def _spawn(self, child: _Child):
+        env = child_env(child.index, self.processes, self.api_rps, self.api_burst)
+        child.proc = subprocess.Popen(self.command, env=env)
+        child.started_at = time.monotonic()
+        logger.info("[supervisor] Started child %d (pid %d)", child.index, child.proc.pid)
+
+    def start(self):
+        for child in self.children:
+            self._spawn(child)
+
+    def poll(self):
+        """Reap exited children and restart them once their backoff has passed."""
+        now = time.monotonic()
+        for child in self.children:
+            if child.proc is not None:
+                code = child.proc.poll()
+                if code is None:
+                    continue
+                self._reap(child, code, now)
+            if not self._stopping and now >= child.restart_at:
+                child.restarts += 1
+                self._spawn(child)
+
+    def _reap(self, child: _Child, code: int, now: float):
+        from prometheus_client import multiprocess
+        pid, uptime = child.proc.pid, now - child.started_at
+        multiprocess.mark_process_dead(pid, self.metrics_dir)
+        child.proc = None
+        child.exits.append(code)
+        if self._stopping:
+            return
+        # crash loop: back off; a child that ran for a while restarts at once
+        child.backoff = 0.0 if uptime >= self.stable_after else \
+            min(self.max_backoff, max(self.min_backoff, child.backoff * 2))
+        child.restart_at = now + child.backoff
+        logger.error("[supervisor] Child %d (pid %d) exited with %s after %.0fs; restarting in %.0fs",
+                     child.index, pid, code, uptime, child.backoff)
+
+    def stop(self, timeout: float = 15.0):
+        self._stopping = True
+        running = [c for c in self.children if c.proc is not None and c.proc.poll() is None]
+        for c in running:
+            c.proc.terminate()
+        deadline = time.monotonic() + timeout
+        for c in running:
+            try:
+                c.proc.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                c.proc.kill()
+                c.proc.wait()
+        for c in self.children:
+            if c.proc is not None:
+                self._reap(c, c.proc.returncode, time.monotonic())
+
+    def run(self, metrics_port: int | None = None, interval: float = 1.0):
+        from .metrics import start_multiprocess_metrics_server
+        if metrics_port:
+            start_multiprocess_metrics_server(metrics_port, self.metrics_dir)
+            logger.info("[supervisor] Aggregated metrics of %d children on :%s", self.processes, metrics_port)
+
+        def _shutdown(signum, _frame):
+            logger.info("[supervisor] Signal %s: stopping children", signum)
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, _shutdown)
+        signal.signal(signal.SIGINT, _shutdown)
+        self.start()
+        while not self._stopping:
+            time.sleep(interval)
+            self.poll()
+        self.stop()
@@ -0,0 +1,154 @@
+# benchmarks/api_load.py
+"""
+API load test against the local stand-in database.
+
+Compares the blocking handler shape the API used to have (sync `def`,
+pyodbc-style blocking query on Starlette's threadpool) with the current
+async handlers backed by AsyncDB, under the same mixed traffic:
+cache hits for hot forces plus cache misses that pay simulated DB latency.
+
+Both sides get the same connection pool (--pool-size), so the difference
+is only where waiting requests sit: legacy requests hold a threadpool slot
+while they queue for a connection, starving cache hits behind them.
+Read the results per class: "hit" p99 is the improvement; "miss" latency
+is bounded by pool throughput either way (closed-loop clients queue more
+misses once hits stop blocking).
+
+    python -m benchmarks.api_load --requests 2000 --concurrency 100 --latency-ms 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+HOT_FORCES = ["metropolitan", "west-midlands", "greater-manchester", "city-of-london"]
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def summarize(samples: dict[str, list[float]]) -> dict:
+    out = {}
+    for cls, vals in samples.items():
+        ms = [v * 1000 for v in vals]
+        out[cls] = {
+            "n": len(ms),
+            "p50_ms": round(_pct(ms, 50), 2),
+            "p95_ms": round(_pct(ms, 95), 2),
+            "p99_ms": round(_pct(ms, 99), 2),
+            "mean_ms": round(statistics.fmean(ms), 2) if ms else 0.0,
+        }
+    return out
+
+
+async def drive(client, path: str, n: int, concurrency: int, hit_ratio: float, seed: int) -> dict:
+    rnd = random.Random(seed)
+    plan = [
+        ("hit", rnd.choice(HOT_FORCES)) if rnd.random() < hit_ratio else ("miss", f"cold-{i}")
+        for i in range(n)
+    ]
+    samples: dict[str, list[float]] = {"hit": [], "miss": []}
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    async def worker():
+        while not queue.empty():
+            cls, force = queue.get_nowait()
+            t0 = time.perf_counter()
+            r = await client.get(path, params={"force": force})
+            r.raise_for_status()
+            samples[cls].append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    result = summarize(samples)
+    all_samples = samples["hit"] + samples["miss"]
+    result["all"] = summarize({"all": all_samples})["all"]
+    result["rps"] = round(n / elapsed, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="simulated per-query DB latency")
+    parser.add_argument("--hit-ratio", type=float, default=0.8)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="api-load-")
+    from benchmarks.standin_db import attach, create_standin, standin_engine
+    os.environ["DATABASE_URL"] = create_standin(workdir)
+    os.environ["API_CACHE_EVENTS"] = "0"
+    os.environ["API_QUERY_TIMEOUT_SECONDS"] = "60"
+    os.environ["API_DB_POOL_SIZE"] = str(args.pool_size)
+    os.environ["API_DB_MAX_OVERFLOW"] = "0"
+    os.environ["API_DB_POOL_TIMEOUT"] = "60"
+
+    import httpx
+    from app import api
+    from app.cache import TTLCache
+    from app.utils import last_month_yyyymm, ym_to_date
+    from benchmarks.standin_db import seed_gold
+
+    latency = args.latency_ms / 1000
+    attach(api.DB.engine, workdir, latency)
+    ym = last_month_yyyymm()
+    seed_gold(api.DB.engine, [(f, ym_to_date(ym), o, c) for f in HOT_FORCES
+                               for o, c in (("Arrest", 10), ("Nothing found", 40))])
+
+    # The previous handler shape: sync def + blocking query on Starlette's threadpool
+    legacy_engine = standin_engine(workdir, latency, pool_size=args.pool_size, max_overflow=0, pool_timeout=60)
+
+    legacy_cache = TTLCache(maxsize=10_000, ttl=3600)
+
+    @api.app.get("/bench/legacy/outcomes")
+    def legacy_outcomes(force: str):
+        key = (force, ym)
+        rows = legacy_cache.get(key)
+        if rows is None:
+            with legacy_engine.connect() as conn:
+                rows = [dict(r) for r in conn.execute(api._GOLD_OUTCOMES_SQL,
+                                                      {"force": force, "month": ym_to_date(ym)}).mappings()]
+            legacy_cache.set(key, rows)
+        return {"force": force, "month": ym, "outcomes": rows}
+
+    async def run(path):
+        legacy_cache.clear()
+        api.GOLD_CACHE.clear()
+        hot = [{"outcome": "Arrest", "count": 10, "updated_at": "2024-06-01 03:10:00"}]
+        for f in HOT_FORCES:
+            legacy_cache.set((f, ym), hot)
+            api.GOLD_CACHE.set((f, ym), api._gold_slice(hot), ttl=3600)
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await drive(client, path, args.requests, args.concurrency, args.hit_ratio, args.seed)
+
+    results = {
+        "params": vars(args),
+        "legacy_sync": asyncio.run(run("/bench/legacy/outcomes")),
+        "async": asyncio.run(run("/outcomes/last-month")),
+    }
+    print(json.dumps(results, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/fake_police_api.py
+"""
+Fake data.police.uk for load tests: GET /api/stops-force?force=..&date=YYYY-MM
+returns a synthetic payload (benchmarks/payloads.py) after a simulated
+latency. A fraction of requests get 429 Too Many Requests, as the real API
+does when clients exceed its rate limit.
+
+    records    fixed record count, or (min, max) for a per-job size drawn
+               deterministically from (force, date)
+    latency_s  mean response latency; jitter is +-50%
+    rate_429   probability of answering 429 instead of the payload
+"""
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .payloads import generate_stops
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        api: FakePoliceApi = self.server.api
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/api/stops-force":
+            return self._reply(404, b'{"error":"not found"}')
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        force, ym = q.get("force", ""), q.get("date", "")
+        time.sleep(api.latency_s * random.uniform(0.5, 1.5) if api.latency_s else 0)
+        if api.rate_429 and random.random() < api.rate_429:
+            api.count(429)
+            return self._reply(429, b"", {"Retry-After": "1"})
+        try:
+            body = api.body(force, ym)
+        except ValueError:
+            api.count(400)
+            return self._reply(400, b'{"error":"bad date"}')
+        api.count(200, len(body))
+        self._reply(200, body)
+
+    def _reply(self, status: int, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakePoliceApi:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *, records: int | tuple[int, int] = 1000,
+                 latency_s: float = 0.05, rate_429: float = 0.0, seed: int = 0):
+        self.records = records
+        self.latency_s = latency_s
+        self.rate_429 = rate_429
+        self.seed = seed
+        self.statuses: Counter = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.api = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/stops-force"
+
+    def start(self) -> "FakePoliceApi":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-police-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def size_for(self, force: str, ym: str) -> int:
+        if isinstance(self.records, int):
+            return self.records
+        lo, hi = self.records
+        return random.Random(f"{self.seed}:{force}:{ym}:size").randint(lo, hi)
+
+    def body(self, force: str, ym: str) -> bytes:
+        n = self.size_for(force, ym)
+        return json.dumps(generate_stops(n, self.seed, force, ym), ensure_ascii=False).encode("utf-8")
+
+    def count(self, status: int, nbytes: int = 0):
+        with self._lock:
+            self.statuses[status] += 1
+            self.bytes_sent += nbytes
@@ -0,0 +1,212 @@
+# benchmarks/offline.py
+"""
+Offline micro-benchmarks for the ingest and serving hot paths: no network,
+no SQL Server. Each case runs on synthetic stops-force payloads
+(benchmarks/payloads.py) at 1k, 20k and 100k records.
+
+    transform      to_silver_rows (parse, tile, hash)
+    row_hash       transform._hash_record per raw record (silver key)
+    sha256_row     utils.sha256_row per raw record (bronze key)
+    bronze_rows    etl.bronze_rows: hash, dedupe and JSON-encode for #bronze_in
+    silver_payload etl.silver_payload: #silver_in parameter rows
+    api_stops      /stops page bodies (jsonable_encoder + json, 500 rows a page)
+    api_ndjson     export.ndjson_chunks over silver tuples
+    api_csv        export.csv_chunks over silver tuples
+
+Results go to --out as JSON (per case and size: best/median seconds,
+microseconds per record, records per second). With --baseline, every
+case's best us/record is compared to the baseline's; a case is a
+regression when it is slower by more than its threshold (baseline file's
+"thresholds", else --threshold) and the exit status is 1.
+
+    python -m benchmarks.offline --out benchmarks/results/latest.json --baseline benchmarks/baseline.json
+    python -m benchmarks.offline --sizes 1000,20000 --update-baseline benchmarks/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+
+from app.etl import bronze_rows, silver_payload
+from app.export import SILVER_COLUMNS, csv_chunks, ndjson_chunks
+from app.transform import _hash_record, to_silver_rows
+from app.utils import sha256_row
+
+from .payloads import SIZES, generate_stops
+
+FORCE, YM = "metropolitan", "2024-05"
+MONTH = dt.date(2024, 5, 1)
+PAGE_ROWS = 500
+EXPORT_CHUNK_ROWS = 5000
+DEFAULT_THRESHOLD = 0.25
+
+
+def _silver_tuples(silver: list[dict]) -> list[tuple]:
+    return [tuple(r.get(c) for c in SILVER_COLUMNS) for r in silver]
+
+
+def _chunks(rows: list, size: int) -> list[list]:
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def _drain(gen) -> int:
+    return sum(len(b) for b in gen)
+
+
+def _api_stops(pages: list[list[dict]]) -> int:
+    # what FastAPI's JSONResponse does with the /stops handler's return value
+    return sum(
+        len(json.dumps(jsonable_encoder({"force": FORCE, "stops": page, "next_cursor": None}),
+                       ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8"))
+        for page in pages
+    )
+
+
+def cases(raw: list[dict]) -> dict[str, Callable[[], object]]:
+    """Benchmark name -> zero-argument callable over prepared inputs."""
+    silver = to_silver_rows(FORCE, YM, raw)
+    tuples = _silver_tuples(silver)
+    pages = _chunks([{c: r.get(c) for c in SILVER_COLUMNS} for r in silver], PAGE_ROWS)
+    return {
+        "transform": lambda: to_silver_rows(FORCE, YM, raw),
+        "row_hash": lambda: [_hash_record(r) for r in raw],
+        "sha256_row": lambda: [sha256_row(r) for r in raw],
+        "bronze_rows": lambda: bronze_rows(FORCE, MONTH, raw),
+        "silver_payload": lambda: silver_payload(FORCE, MONTH, silver),
+        "api_stops": lambda: _api_stops(pages),
+        "api_ndjson": lambda: _drain(ndjson_chunks(_chunks(tuples, EXPORT_CHUNK_ROWS))),
+        "api_csv": lambda: _drain(csv_chunks(_chunks(tuples, EXPORT_CHUNK_ROWS))),
+    }
+
+
+def _time(fn: Callable[[], object], repeat: int) -> list[float]:
+    times = []
+    gc.collect()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def run(sizes=SIZES, seed: int = 0, only: set[str] | None = None, repeat: int | None = None) -> dict:
+    results: dict[str, dict] = {}
+    for n in sizes:
+        raw = generate_stops(n, seed, FORCE, YM)
+        reps = repeat or (7 if n <= 1_000 else 5 if n <= 20_000 else 3)
+        for name, fn in cases(raw).items():
+            if only and name not in only:
+                continue
+            times = _time(fn, reps)
+            best = min(times)
+            results.setdefault(name, {})[str(n)] = {
+                "repeat": reps,
+                "best_s": round(best, 6),
+                "median_s": round(statistics.median(times), 6),
+                "us_per_record": round(best / n * 1e6, 3),
+                "records_per_s": round(n / best) if best else None,
+            }
+    return {
+        "meta": {
+            "seed": seed,
+            "sizes": list(sizes),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, default_threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Per case and size present in both: us/record ratio to baseline.
+    Entries with "regression": True are slower than their threshold allows.
+    """
+    thresholds = baseline.get("thresholds", {})
+    report = []
+    for name, by_size in current["results"].items():
+        limit = thresholds.get(name, thresholds.get("default", default_threshold))
+        for size, cur in by_size.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if not base or not base.get("us_per_record"):
+                continue
+            ratio = cur["us_per_record"] / base["us_per_record"]
+            report.append({
+                "case": name, "size": int(size),
+                "baseline_us": base["us_per_record"], "current_us": cur["us_per_record"],
+                "ratio": round(ratio, 3), "threshold": limit,
+                "regression": ratio > 1 + limit,
+            })
+    return report
+
+
+def _print_table(results: dict, report: list[dict]):
+    flags = {(r["case"], str(r["size"])): r for r in report}
+    print(f"{'case':<16}{'records':>9}{'best ms':>11}{'us/rec':>10}{'rec/s':>12}{'vs base':>10}")
+    for name, by_size in results["results"].items():
+        for size, r in by_size.items():
+            cmp = flags.get((name, size))
+            vs = f"{cmp['ratio']:.2f}x{' !' if cmp['regression'] else ''}" if cmp else ""
+            print(f"{name:<16}{size:>9}{r['best_s'] * 1000:>11.1f}{r['us_per_record']:>10.2f}"
+                  f"{r['records_per_s'] or 0:>12,}{vs:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingest/serialization benchmarks")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=None, help="runs per case (default 7/5/3 by size)")
+    parser.add_argument("--only", default=None, help="comma-separated case names")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown when the baseline has no threshold for a case (0.25 = +25%%)")
+    parser.add_argument("--update-baseline", default=None, metavar="PATH",
+                        help="write results as the new baseline, keeping its thresholds")
+    args = parser.parse_args()
+
+    sizes = tuple(int(s) for s in args.sizes.split(","))
+    only = set(args.only.split(",")) if args.only else None
+    results = run(sizes, args.seed, only, args.repeat)
+
+    report = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report = compare(results, baseline, args.threshold)
+        results["comparison"] = {"baseline": args.baseline, "cases": report}
+    _print_table(results, report)
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        thresholds = {"default": args.threshold}
+        if os.path.exists(args.update_baseline):
+            with open(args.update_baseline, encoding="utf-8") as f:
+                thresholds = json.load(f).get("thresholds", thresholds)
+        with open(args.update_baseline, "w", encoding="utf-8") as f:
+            json.dump({"thresholds": thresholds, **results}, f, indent=2)
+
+    regressions = [r for r in report if r["regression"]]
+    for r in regressions:
+        print(f"REGRESSION {r['case']} @ {r['size']}: {r['current_us']} us/rec vs {r['baseline_us']} "
+              f"({r['ratio']:.2f}x, allowed {1 + r['threshold']:.2f}x)", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
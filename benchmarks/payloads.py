@@ -0,0 +1,139 @@
+# benchmarks/payloads.py
+"""
+Seedable generator of synthetic stops-force payloads, shaped like the Police
+API's /stops-force response: same keys, nesting, string-typed coordinates,
+null-heavy optional fields, missing locations and a few exact duplicates.
+The same (n, seed, force, ym) always yields the same records.
+
+    python -m benchmarks.payloads --records 20000 --seed 1 > stops.json
+"""
+from __future__ import annotations
+
+import argparse
+import calendar
+import json
+import random
+import sys
+
+SIZES = (1_000, 20_000, 100_000)
+
+_TYPES = [("Person search", 70), ("Person and Vehicle search", 25), ("Vehicle search", 5)]
+_GENDERS = [("Male", 85), ("Female", 12), ("Other", 1), (None, 2)]
+_AGES = [("18-24", 35), ("25-34", 28), ("over 34", 20), ("10-17", 14), ("under 10", 1), (None, 2)]
+_OFFICER_ETHNICITY = [("White", 50), ("Black", 22), ("Asian", 16), ("Other", 4), ("Mixed", 1), (None, 7)]
+_SELF_ETHNICITY = [
+    ("White - English/Welsh/Scottish/Northern Irish/British", 40),
+    ("Black/African/Caribbean/Black British - Any other Black/African/Caribbean background", 10),
+    ("Black/African/Caribbean/Black British - African", 8),
+    ("Asian/Asian British - Pakistani", 6),
+    ("Asian/Asian British - Bangladeshi", 5),
+    ("Mixed/Multiple ethnic groups - White and Black Caribbean", 4),
+    ("White - Any other White background", 9),
+    ("Other ethnic group - Not stated", 13),
+    (None, 5),
+]
+_LEGISLATION = [
+    ("Misuse of Drugs Act 1971 (section 23)", 60),
+    ("Police and Criminal Evidence Act 1984 (section 1)", 28),
+    ("Criminal Justice and Public Order Act 1994 (section 60)", 4),
+    ("Firearms Act 1968 (section 47)", 2),
+    (None, 6),
+]
+_OBJECTS = [
+    ("Controlled drugs", 60), ("Offensive weapons", 15), ("Stolen goods", 10),
+    ("Articles for use in criminal damage", 5), ("Evidence of offences under the Act", 3),
+    ("Firearms", 2), (None, 5),
+]
+_OUTCOMES = [
+    ("A no further action disposal", "bu-no-further-action", 68),
+    ("Arrest", "bu-arrest", 14),
+    ("Community resolution", "bu-community-resolution", 8),
+    ("Penalty Notice for Disorder", "bu-penalty-notice", 3),
+    ("Khat or Cannabis warning", "bu-khat-or-cannabis-warning", 4),
+    ("Summons / charged by post", "bu-summons", 2),
+    ("Caution (simple or conditional)", "bu-caution", 1),
+]
+_STREETS = [
+    "On or near Parking Area", "On or near Shopping Area", "On or near Petrol Station",
+    "On or near High Street", "On or near Station Road", "On or near Church Lane",
+    "On or near Nightclub", "On or near Supermarket", "On or near Park/Open Space",
+]
+# (lat, lon) centres roughly covering England and Wales
+_CENTRES = [(51.507, -0.128), (52.486, -1.890), (53.480, -2.242), (53.801, -1.549), (51.454, -2.588),
+            (54.978, -1.617), (52.954, -1.158), (51.481, -3.179), (50.376, -4.143), (52.629, 1.297)]
+
+
+def _pick(rng: random.Random, table):
+    values = [t[:-1] if len(t) > 2 else t[0] for t in table]
+    return rng.choices(values, weights=[t[-1] for t in table])[0]
+
+
+def _record(rng: random.Random, year: int, month: int, days: int, streets: list[tuple]) -> dict:
+    stamp = (f"{year:04d}-{month:02d}-{rng.randint(1, days):02d}"
+             f"T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00+00:00")
+    outcome, outcome_id = _pick(rng, _OUTCOMES)
+    location = None
+    if rng.random() > 0.08:
+        street_id, name, lat, lon = rng.choice(streets)
+        location = {
+            "latitude": f"{lat + rng.uniform(-0.002, 0.002):.6f}",
+            "street": {"id": street_id, "name": name},
+            "longitude": f"{lon + rng.uniform(-0.002, 0.002):.6f}",
+        }
+    object_of_search = _pick(rng, _OBJECTS)
+    return {
+        "age_range": _pick(rng, _AGES),
+        "self_defined_ethnicity": _pick(rng, _SELF_ETHNICITY),
+        "outcome_linked_to_object_of_search": rng.choice([True, False, None]),
+        "datetime": stamp,
+        "removal_of_more_than_outer_clothing": rng.choice([False, False, False, True, None]),
+        "operation": rng.random() < 0.02,
+        "officer_defined_ethnicity": _pick(rng, _OFFICER_ETHNICITY),
+        "object_of_search": object_of_search,
+        "involved_person": True,
+        "gender": _pick(rng, _GENDERS),
+        "legislation": _pick(rng, _LEGISLATION),
+        "location": location,
+        "type": _pick(rng, _TYPES),
+        "operation_name": None,
+        "outcome": outcome,
+        "outcome_object": {"id": outcome_id, "name": outcome},
+    }
+
+
+def generate_stops(n: int, seed: int = 0, force: str = "metropolitan", ym: str = "2024-05",
+                   duplicate_ratio: float = 0.01) -> list[dict]:
+    """
+    n stops-force records for one force-month. About duplicate_ratio of them
+    repeat an earlier record exactly, as the live API occasionally does.
+    """
+    rng = random.Random(f"{seed}:{force}:{ym}")
+    year, month = (int(p) for p in ym.split("-"))
+    days = calendar.monthrange(year, month)[1]
+    lat0, lon0 = rng.choice(_CENTRES)
+    streets = [
+        (1_000_000 + rng.randrange(9_000_000), rng.choice(_STREETS),
+         lat0 + rng.uniform(-0.25, 0.25), lon0 + rng.uniform(-0.35, 0.35))
+        for _ in range(max(50, n // 20))
+    ]
+    out: list[dict] = []
+    for _ in range(n):
+        if out and rng.random() < duplicate_ratio:
+            out.append(dict(rng.choice(out)))
+        else:
+            out.append(_record(rng, year, month, days, streets))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a synthetic stops-force payload as JSON")
+    parser.add_argument("--records", type=int, default=SIZES[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", default="metropolitan")
+    parser.add_argument("--month", default="2024-05")
+    args = parser.parse_args()
+    json.dump(generate_stops(args.records, args.seed, args.force, args.month), sys.stdout, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
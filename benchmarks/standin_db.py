@@ -0,0 +1,126 @@
+# benchmarks/standin_db.py
+"""
+Local stand-in for SQL Server in benchmarks: SQLite files with a second
+database ATTACHed as `dbo`, so the API's `dbo.<table>` / `[month]` queries
+run unchanged. Optional per-statement latency simulates server time.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from app.etl import _month_first_day, bronze_rows, silver_payload
+from app.transform import to_silver_rows
+
+GOLD_DDL = """
+CREATE TABLE IF NOT EXISTS gold_monthly_outcomes (
+    force_id TEXT NOT NULL, [month] TEXT NOT NULL, outcome TEXT NOT NULL, [count] INT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (force_id, [month], outcome)
+);
+CREATE TABLE IF NOT EXISTS dim_force (id TEXT PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS bronze_stop_search (
+    row_hash TEXT PRIMARY KEY, force_id TEXT NOT NULL, [month] TEXT NOT NULL, payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fact_stop_search (
+    row_hash TEXT PRIMARY KEY, force_id TEXT NOT NULL, stop_datetime TEXT, [type] TEXT,
+    involved_person INT, gender TEXT, age_range TEXT, self_defined_ethnicity TEXT,
+    officer_defined_ethnicity TEXT, legislation TEXT, object_of_search TEXT, outcome TEXT,
+    outcome_linked_to_object_of_search INT, outcome_object_id TEXT, outcome_object_name TEXT,
+    removal_more_than_outer_clothing INT, latitude REAL, longitude REAL, tile_x INT, tile_y INT,
+    street_id INT, street_name TEXT, [month] TEXT NOT NULL
+);
+"""
+
+SILVER_COLUMNS = [
+    "row_hash", "force_id", "stop_datetime", "type", "involved_person", "gender", "age_range",
+    "self_defined_ethnicity", "officer_defined_ethnicity", "legislation", "object_of_search", "outcome",
+    "outcome_linked_to_object_of_search", "outcome_object_id", "outcome_object_name",
+    "removal_more_than_outer_clothing", "latitude", "longitude", "tile_x", "tile_y",
+    "street_id", "street_name", "month",
+]
+
+
+def create_standin(directory: str) -> str:
+    """Create the stand-in files; returns the SQLAlchemy URL of the main database."""
+    os.makedirs(directory, exist_ok=True)
+    with sqlite3.connect(os.path.join(directory, "dbo.db")) as con:
+        con.executescript(GOLD_DDL)
+    return f"sqlite:///{os.path.join(directory, 'main.db')}"
+
+
+def attach(engine: Engine, directory: str, latency_s: float = 0.0) -> Engine:
+    """ATTACH dbo on every new connection and sleep latency_s per statement."""
+    dbo = os.path.join(directory, "dbo.db")
+
+    @event.listens_for(engine, "connect")
+    def _attach(dbapi_conn, _record):
+        dbapi_conn.execute(f"ATTACH DATABASE '{dbo}' AS dbo")
+
+    if latency_s:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _latency(*_args):
+            time.sleep(latency_s)
+    return engine
+
+
+def standin_engine(directory: str, latency_s: float = 0.0, **kwargs) -> Engine:
+    url = create_standin(directory)
+    engine = create_engine(url, future=True, connect_args={"check_same_thread": False}, **kwargs)
+    return attach(engine, directory, latency_s)
+
+
+def seed_gold(engine: Engine, rows: list[tuple]) -> None:
+    """rows: (force_id, 'YYYY-MM-01', outcome, count)"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT OR REPLACE INTO dbo.gold_monthly_outcomes (force_id, [month], outcome, [count]) "
+            "VALUES (?, ?, ?, ?)", rows
+        )
+
+
+def standin_upsert(engine: Engine) -> Callable[[Engine, str, str, List[Dict]], int]:
+    """
+    Drop-in for etl.upsert_bronze_and_silver against the stand-in: the same
+    Python-side work (bronze_rows, to_silver_rows, silver_payload), then
+    INSERT OR IGNORE into bronze/silver and a gold outcome refresh, in one
+    transaction. Returns silver rows inserted.
+    """
+    columns = ", ".join(f"[{c}]" for c in SILVER_COLUMNS)
+    marks = ", ".join("?" for _ in SILVER_COLUMNS)
+
+    def upsert(_engine: Engine, force: str, ym: str, raw_records: List[Dict]) -> int:
+        month = _month_first_day(ym)
+        bronze = bronze_rows(force, month, raw_records)
+        payload = silver_payload(force, month, to_silver_rows(force, ym, raw_records))
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT OR IGNORE INTO dbo.bronze_stop_search (row_hash, force_id, [month], payload) "
+                "VALUES (?, ?, ?, ?)",
+                [(r["row_hash"], r["force_id"], r["month"].isoformat(), r["payload"]) for r in bronze],
+            )
+            before = conn.exec_driver_sql("SELECT total_changes()").scalar()
+            conn.exec_driver_sql(
+                f"INSERT OR IGNORE INTO dbo.fact_stop_search ({columns}) VALUES ({marks})",
+                [tuple(str(v) if hasattr(v, "isoformat") else v for v in (r[c] for c in SILVER_COLUMNS))
+                 for r in payload],
+            )
+            inserted = conn.exec_driver_sql("SELECT total_changes()").scalar() - before
+            conn.exec_driver_sql(
+                "DELETE FROM dbo.gold_monthly_outcomes WHERE force_id = ? AND [month] = ?",
+                (force, month.isoformat()),
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO dbo.gold_monthly_outcomes (force_id, [month], outcome, [count]) "
+                "SELECT force_id, [month], outcome, COUNT(*) FROM dbo.fact_stop_search "
+                "WHERE force_id = ? AND [month] = ? GROUP BY force_id, [month], outcome",
+                (force, month.isoformat()),
+            )
+        return inserted
+
+    return upsert
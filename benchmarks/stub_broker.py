@@ -0,0 +1,238 @@
+# benchmarks/stub_broker.py
+"""
+Minimal in-process STOMP 1.2 broker for load tests: enough of Artemis for
+stomp.py clients (app/mq.py, the AMQ reporter) to connect, subscribe with
+client-individual acks, send, ack/nack and disconnect with a receipt.
+
+Queues are FIFO and anycast; an AMQ_SCHEDULED_DELAY header (ms) holds a
+message back before it is queued, as Artemis does. Each subscription gets
+at most `prefetch` unacked messages, which are redelivered if it nacks or
+its connection drops. Heart-beats are declined (CONNECTED heart-beat:0,0).
+on_send(destination, headers, body) is called for every SEND, which lets
+a harness timestamp completions without consuming the queues.
+"""
+from __future__ import annotations
+
+import itertools
+import socket
+import socketserver
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Optional
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace(":", "\\c").replace("\r", "\\r")
+
+
+def _unescape(v: str) -> str:
+    return v.replace("\\r", "\r").replace("\\n", "\n").replace("\\c", ":").replace("\\\\", "\\")
+
+
+def encode_frame(command: str, headers: dict, body: bytes = b"") -> bytes:
+    lines = [command] + [f"{_escape(str(k))}:{_escape(str(v))}" for k, v in headers.items()]
+    if body:
+        lines.append(f"content-length:{len(body)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8") + body + b"\x00"
+
+
+class FrameReader:
+    """Incremental STOMP frame parser (content-length aware, skips heart-beat EOLs)."""
+    def __init__(self):
+        self.buf = b""
+
+    def feed(self, data: bytes) -> list[tuple[str, dict, bytes]]:
+        self.buf += data
+        frames = []
+        while True:
+            self.buf = self.buf.lstrip(b"\r\n")
+            end = self.buf.find(b"\n\n")
+            if end < 0:
+                return frames
+            head = self.buf[:end].decode("utf-8").replace("\r", "").split("\n")
+            headers: dict = {}
+            for line in head[1:]:
+                k, _, v = line.partition(":")
+                headers.setdefault(_unescape(k), _unescape(v))
+            start = end + 2
+            if "content-length" in headers:
+                stop = start + int(headers["content-length"])
+                if len(self.buf) < stop + 1:
+                    return frames
+            else:
+                stop = self.buf.find(b"\x00", start)
+                if stop < 0:
+                    return frames
+            frames.append((head[0], headers, self.buf[start:stop]))
+            self.buf = self.buf[stop + 1:]
+
+
+class _Subscription:
+    def __init__(self, session: "_Session", sub_id: str, destination: str, ack: str):
+        self.session = session
+        self.id = sub_id
+        self.destination = destination
+        self.auto = ack == "auto"
+        self.unacked: dict[str, tuple[dict, bytes]] = {}
+
+
+class _Session(socketserver.BaseRequestHandler):
+    server: "_Server"
+
+    def setup(self):
+        self.lock = threading.Lock()
+        self.subs: dict[str, _Subscription] = {}
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def write(self, command: str, headers: dict, body: bytes = b"") -> bool:
+        try:
+            with self.lock:
+                self.request.sendall(encode_frame(command, headers, body))
+            return True
+        except OSError:
+            return False
+
+    def handle(self):
+        reader = FrameReader()
+        broker = self.server.broker
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            for command, headers, body in reader.feed(data):
+                if broker.handle_frame(self, command, headers, body) is False:
+                    return
+
+    def finish(self):
+        self.server.broker.drop_session(self)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StubBroker:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, prefetch: int = 1,
+                 on_send: Optional[Callable[[str, dict, bytes], None]] = None):
+        self.prefetch = prefetch
+        self.on_send = on_send
+        self.queues: dict[str, deque] = defaultdict(deque)
+        self.subscriptions: dict[str, list[_Subscription]] = defaultdict(list)
+        self.sent: dict[str, int] = defaultdict(int)
+        self.connections = 0
+        self._ids = itertools.count(1)
+        self._rr = itertools.count()
+        self._lock = threading.RLock()
+        self._server = _Server((host, port), _Session)
+        self._server.broker = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> "StubBroker":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-broker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def depth(self, destination: str) -> int:
+        with self._lock:
+            return len(self.queues[destination])
+
+    # ---------- frames ----------
+    def handle_frame(self, session: _Session, command: str, headers: dict, body: bytes):
+        if command in ("CONNECT", "STOMP"):
+            with self._lock:
+                self.connections += 1
+            session.write("CONNECTED", {"version": "1.2", "heart-beat": "0,0", "server": "stub-broker"})
+        elif command == "SEND":
+            self.publish(headers.get("destination", ""), headers, body)
+        elif command == "SUBSCRIBE":
+            sub = _Subscription(session, headers.get("id", ""), headers.get("destination", ""),
+                                headers.get("ack", "auto"))
+            with self._lock:
+                session.subs[sub.id] = sub
+                self.subscriptions[sub.destination].append(sub)
+            self._dispatch(sub.destination)
+        elif command == "UNSUBSCRIBE":
+            sub = session.subs.pop(headers.get("id", ""), None)
+            if sub:
+                self._remove(sub)
+        elif command in ("ACK", "NACK"):
+            self._settle(session, headers.get("id", ""), requeue=command == "NACK")
+        if "receipt" in headers:
+            session.write("RECEIPT", {"receipt-id": headers["receipt"]})
+        if command == "DISCONNECT":
+            return False
+
+    def publish(self, destination: str, headers: dict, body: bytes):
+        with self._lock:
+            self.sent[destination] += 1
+        if self.on_send:
+            self.on_send(destination, headers, body)
+        message = ({k: v for k, v in headers.items() if k not in ("destination", "receipt", "content-length")}, body)
+        delay_ms = int(headers.get("AMQ_SCHEDULED_DELAY") or 0)
+        if delay_ms > 0:
+            timer = threading.Timer(delay_ms / 1000, self._enqueue, (destination, message))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._enqueue(destination, message)
+
+    def _enqueue(self, destination: str, message: tuple[dict, bytes]):
+        with self._lock:
+            self.queues[destination].append(message)
+        self._dispatch(destination)
+
+    def drop_session(self, session: _Session):
+        for sub in list(session.subs.values()):
+            self._remove(sub)
+        session.subs.clear()
+
+    # ---------- delivery ----------
+    def _remove(self, sub: _Subscription):
+        with self._lock:
+            subs = self.subscriptions[sub.destination]
+            if sub in subs:
+                subs.remove(sub)
+            # unacked messages go back to the head of the queue
+            for headers, body in reversed(list(sub.unacked.values())):
+                self.queues[sub.destination].appendleft((headers, body))
+            sub.unacked.clear()
+        self._dispatch(sub.destination)
+
+    def _settle(self, session: _Session, ack_id: str, requeue: bool):
+        for sub in list(session.subs.values()):
+            with self._lock:
+                msg = sub.unacked.pop(ack_id, None)
+                if msg is not None and requeue:
+                    self.queues[sub.destination].append(msg)
+            if msg is not None:
+                self._dispatch(sub.destination)
+                return
+
+    def _dispatch(self, destination: str):
+        while True:
+            with self._lock:
+                queue = self.queues[destination]
+                ready = [s for s in self.subscriptions[destination] if s.auto or len(s.unacked) < self.prefetch]
+                if not queue or not ready:
+                    return
+                sub = ready[next(self._rr) % len(ready)]
+                headers, body = queue.popleft()
+                message_id = f"ID:stub-{next(self._ids)}"
+                if not sub.auto:
+                    sub.unacked[message_id] = (headers, body)
+            frame_headers = {**headers, "destination": destination, "message-id": message_id,
+                             "subscription": sub.id, "ack": message_id}
+            if not sub.session.write("MESSAGE", frame_headers, body):
+                self._remove(sub)
@@ -0,0 +1,218 @@
+# benchmarks/worker_load.py
+"""
+End-to-end load harness for app/etl_worker.py on a laptop.
+
+Everything the worker talks to is local and in-process:
+  - a STOMP stub broker (benchmarks/stub_broker.py) for the fetch, done,
+    notify and DLQ queues
+  - a fake Police API (benchmarks/fake_police_api.py) with configurable
+    latency, 429 injection and payload sizes
+  - the SQLite stand-in (benchmarks/standin_db.py), with ETL upserts
+    replaced by standin_upsert (same Python-side row preparation, SQLite
+    inserts instead of T-SQL temp tables and MERGE)
+
+The worker itself runs unchanged: its real on_message, rate limiter,
+HTTP backoff, MQClient subscriptions and AMQ reporter. Jobs are enqueued
+(all at once, or at --rate per second) and the harness waits for their
+done messages, then reports throughput, end-to-end latency (enqueue to
+done), handler latency, API status counts, broker connections and
+process memory (RSS sampled over the run; the harness, broker and API
+share the process, so compare runs rather than reading it as absolute).
+
+    python -m benchmarks.worker_load --jobs 200 --records 1000 --api-latency-ms 50 --api-429-rate 0.05
+    python -m benchmarks.worker_load --jobs 500 --records 200-5000 --consumers 4 --api-rps 20 --out worker.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import resource
+import tempfile
+import threading
+import time
+
+from .api_load import summarize
+from .fake_police_api import FakePoliceApi
+from .standin_db import standin_engine, standin_upsert
+from .stub_broker import StubBroker
+
+FETCH_QUEUE = "/queue/police.fetch"
+DONE_QUEUE = "/queue/police.done"
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, interval: float = 0.2):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.samples: list[float] = []
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.is_set():
+            self.samples.append(_rss_mb())
+            self._halt.wait(self.interval)
+
+    def stop(self) -> dict:
+        self._halt.set()
+        self.join()
+        s = self.samples or [_rss_mb()]
+        return {"start_mb": round(s[0], 1), "peak_mb": round(max(s), 1), "end_mb": round(s[-1], 1)}
+
+
+def _records(spec: str) -> int | tuple[int, int]:
+    lo, _, hi = spec.partition("-")
+    return (int(lo), int(hi)) if hi else int(lo)
+
+
+def _jobs(n: int, forces: int) -> list[tuple[str, str]]:
+    out = []
+    for i in range(n):
+        year, month = divmod(2024 * 12 + 4 - i // forces, 12)
+        out.append((f"force-{i % forces:03d}", f"{year}-{month + 1:02d}"))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end worker load harness")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--forces", type=int, default=20, help="distinct forces the jobs cycle through")
+    parser.add_argument("--records", default="1000", help="records per payload: N or MIN-MAX")
+    parser.add_argument("--rate", type=float, default=0.0, help="enqueue rate in jobs/s (0 = all at once)")
+    parser.add_argument("--consumers", type=int, default=1, help="worker subscriptions (one listener thread each)")
+    parser.add_argument("--prefetch", type=int, default=1, help="unacked messages per subscription")
+    parser.add_argument("--api-latency-ms", type=float, default=50.0)
+    parser.add_argument("--api-429-rate", type=float, default=0.0)
+    parser.add_argument("--api-rps", type=float, default=1000.0, help="worker API_RPS")
+    parser.add_argument("--api-burst", type=int, default=20, help="worker API_BURST")
+    parser.add_argument("--backoff-base", type=float, default=0.05, help="worker API_BACKOFF_BASE")
+    parser.add_argument("--retry-delay-base", type=float, default=0.2, help="worker API_RETRY_DELAY_BASE")
+    parser.add_argument("--inline-retries", action="store_true", help="back off in the listener (API_DEFER_RETRIES=0)")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="simulated time per DB statement")
+    parser.add_argument("--amq-reporter", action="store_true", help="also publish notify events (one connection per job)")
+    parser.add_argument("--http-cache", default="", metavar="DIR", help="worker HTTP_CACHE_DIR (default: off)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    memory = MemorySampler()
+    memory.start()
+
+    done: dict[tuple[str, str], tuple[float, str]] = {}
+    all_done = threading.Event()
+
+    def on_send(destination: str, _headers: dict, body: bytes):
+        if destination != DONE_QUEUE:
+            return
+        msg = json.loads(body or b"{}")
+        done[(msg.get("force"), msg.get("month"))] = (time.perf_counter(), msg.get("status", "?"))
+        if len(done) >= args.jobs:
+            all_done.set()
+
+    broker = StubBroker(prefetch=args.prefetch, on_send=on_send).start()
+    api = FakePoliceApi(records=_records(args.records), latency_s=args.api_latency_ms / 1000,
+                        rate_429=args.api_429_rate, seed=args.seed).start()
+    workdir = tempfile.mkdtemp(prefix="worker-load-")
+    engine = standin_engine(workdir, args.db_latency_ms / 1000)
+
+    host, port = broker.address
+    os.environ.update({
+        "MQ_HOST": host, "MQ_PORT": str(port), "MQ_QUEUE_FETCH": FETCH_QUEUE, "MQ_QUEUE_DONE": DONE_QUEUE,
+        "POLICE_API_URL": api.url, "API_RPS": str(args.api_rps), "API_BURST": str(args.api_burst),
+        "API_BACKOFF_BASE": str(args.backoff_base), "API_RETRY_DELAY_BASE": str(args.retry_delay_base),
+        "API_DEFER_RETRIES": "0" if args.inline_retries else "1", "LOG_LEVEL": args.log_level, "DL_EMAIL_TO": "",
+        "ENABLE_AMQ_REPORTER": "1" if args.amq_reporter else "0",
+    })
+
+    # The worker reads its config at import time, so import it after the env is set
+    from app import etl_worker
+    from app.mq import MQClient
+    from app import logging_setup
+    if logging_setup._listener is not None:  # no alert mail from the harness
+        logging_setup._listener.handlers = tuple(
+            h for h in logging_setup._listener.handlers if not isinstance(h, logging.handlers.SMTPHandler)
+        )
+    etl_worker.settings.http_cache_dir = args.http_cache
+    etl_worker.get_engine = lambda _url: engine
+    etl_worker.ensure_schema = lambda _engine: None
+    etl_worker.upsert_bronze_and_silver = standin_upsert(engine)
+
+    handler_s: list[float] = []
+
+    def timed(body: dict, headers: dict):
+        t0 = time.perf_counter()
+        try:
+            etl_worker.on_message(body, headers)
+        finally:
+            handler_s.append(time.perf_counter() - t0)
+
+    consumers = []
+    for _ in range(args.consumers):
+        mq = MQClient(host, port, "admin", "admin")
+        mq.subscribe_json(FETCH_QUEUE, timed)
+        consumers.append(mq)
+
+    jobs = _jobs(args.jobs, args.forces)
+    producer = MQClient(host, port, "admin", "admin")
+    enqueued: dict[tuple[str, str], float] = {}
+    started = time.perf_counter()
+    for i, (force, ym) in enumerate(jobs):
+        if args.rate:
+            time.sleep(max(0.0, started + i / args.rate - time.perf_counter()))
+        enqueued[(force, ym)] = time.perf_counter()
+        producer.send_json(FETCH_QUEUE, {"force": force, "month": ym})
+
+    finished = all_done.wait(args.timeout)
+    wall = (max(t for t, _ in done.values()) if done else time.perf_counter()) - started
+    for mq in consumers + [producer]:
+        mq.conn.remove_listener("police")  # its on_disconnected would reconnect
+        mq.disconnect()
+
+    with engine.connect() as conn:
+        bronze = conn.exec_driver_sql("SELECT COUNT(*) FROM dbo.bronze_stop_search").scalar()
+        silver = conn.exec_driver_sql("SELECT COUNT(*) FROM dbo.fact_stop_search").scalar()
+    statuses = [s for _, s in done.values()]
+    results = {
+        "config": vars(args),
+        "completed": len(done),
+        "timed_out": not finished,
+        "ok": statuses.count("ok"),
+        "errors": len(statuses) - statuses.count("ok"),
+        "deferrals": broker.sent[FETCH_QUEUE] - len(jobs),
+        "wall_s": round(wall, 3),
+        "jobs_per_s": round(len(done) / wall, 2) if wall > 0 else None,
+        "silver_rows_per_s": round(silver / wall, 1) if wall > 0 else None,
+        "latency": summarize({
+            "end_to_end": [t - enqueued[k] for k, (t, _) in done.items() if k in enqueued],
+            "handler": handler_s,
+        }),
+        "api": {"statuses": {str(k): v for k, v in sorted(api.statuses.items())},
+                "mb_sent": round(api.bytes_sent / 2**20, 1)},
+        "broker": {"connections": broker.connections, "sent": dict(broker.sent),
+                   "dlq_depth": broker.depth(os.getenv("MQ_QUEUE_DLQ", "/queue/police.dlq"))},
+        "db": {"bronze_rows": bronze, "silver_rows": silver},
+        "memory": memory.stop(),
+    }
+    api.stop()
+    broker.stop()
+
+    print(json.dumps(results, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,5 @@ from dataclasses import dataclass
 class DownloaderConfig:
     max_workers: int = 4
     timeout_seconds: int = 60 * 30  # 30 minutes
+    chunk_size_bytes: int = 1024 * 1024  # streaming read size
+    min_part_size_bytes: int = 8 * 1024 * 1024  # don't split files into ranges smaller than this
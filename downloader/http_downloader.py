@@ -0,0 +1,256 @@
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+import requests
+
+from .config import DownloaderConfig
+from .downloader import Downloader
+from .file_download import FileDownload
+from .subject import ByteProgressObserver, Observer, Subject
+
+
+class DownloadCancelled(Exception):
+    """A part stopped early because the download timed out or another part failed."""
+
+
+class RemoteChanged(Exception):
+    """A resumed range came back whole (200): the remote file changed since the parts were written."""
+
+
+class HttpDownloader(Downloader, Subject):
+    """
+    Parallel, resumable HTTP downloader.
+
+    A file is split into up to `max_workers` byte ranges fetched concurrently
+    with Range requests. Each range streams into its own `<local>.partN` file,
+    so an interrupted download resumes from where every range stopped. Parts
+    are joined into `<local>.tmp`, size-checked, then atomically renamed.
+    Servers without range support fall back to a single resumable stream.
+
+    `<local>.parts.json` records the part boundaries and the remote validator
+    (strong ETag, else Last-Modified) the parts were written against. Parts are
+    only resumed when both still match, and resumed ranges carry If-Range; a
+    different layout, a changed validator, or a resumed range answered with the
+    whole file (200) discards every part.
+
+    config.timeout_seconds bounds the whole file: on timeout (or the first
+    failed part) the remaining parts stop after their current chunk and
+    download() raises without waiting for them; their .partN files are kept
+    for the next attempt.
+    """
+
+    def __init__(self, config: DownloaderConfig | None = None, session: requests.Session | None = None):
+        self.config = config or DownloaderConfig()
+        self.session = session or requests.Session()
+        self._progress: list[Observer] = []
+        self._complete: list[Observer] = []
+        self._error: list[Observer] = []
+        self._bytes: list[ByteProgressObserver] = []
+        self._lock = threading.Lock()
+
+    # ---------- Subject ----------
+    def add_progress_reporter(self, observer: Observer):
+        self._progress.append(observer)
+
+    def add_complete_reporter(self, observer: Observer):
+        self._complete.append(observer)
+
+    def add_error_reporter(self, observer: Observer):
+        self._error.append(observer)
+
+    def add_byte_progress_reporter(self, observer: ByteProgressObserver):
+        self._bytes.append(observer)
+
+    def _notify(self, observers, downloaded_files, files_to_download, message=''):
+        for obs in observers:
+            try:
+                obs.update(downloaded_files, files_to_download, message)
+            except Exception:
+                logging.exception("[downloader] reporter failed")
+
+    # ---------- Downloader ----------
+    def prepare_download(self, file: FileDownload):
+        """
+        HEAD the remote file. Returns (size, accepts_ranges, validator); size
+        is 0 when the server does not report a Content-Length, validator is the
+        strong ETag, else Last-Modified, else None.
+        """
+        r = self.session.head(file.remote_file, params=file.params, headers=file.headers,
+                              auth=file.auth, timeout=file.timeout_seconds, allow_redirects=True)
+        r.raise_for_status()
+        size = int(r.headers.get("Content-Length") or 0)
+        accepts_ranges = r.headers.get("Accept-Ranges", "").lower() == "bytes"
+        etag = r.headers.get("ETag")
+        validator = etag if etag and not etag.startswith("W/") else r.headers.get("Last-Modified")
+        return size, accepts_ranges, validator
+
+    def confirm(self, file: FileDownload, remote_file_size: int) -> bool:
+        if not os.path.exists(file.local_file):
+            return False
+        local_size = os.path.getsize(file.local_file)
+        if remote_file_size and local_size != remote_file_size:
+            return False
+        if file.expected_size_byte and local_size != file.expected_size_byte:
+            return False
+        return True
+
+    def download(self, file: FileDownload) -> bool:
+        remote_size, accepts_ranges, validator = self.prepare_download(file)
+
+        if not file.always_overwrite and self.confirm(file, remote_size or file.expected_size_byte):
+            logging.info("[downloader] %s already complete, skipping", file.local_file)
+            return True
+
+        d = os.path.dirname(file.local_file)
+        if d:
+            os.makedirs(d, exist_ok=True)
+
+        if accepts_ranges and remote_size:
+            parts = self._split(remote_size)
+        else:
+            parts = [(0, None)]
+        manifest = {"remote": file.remote_file, "size": remote_size, "validator": validator,
+                    "parts": [list(p) for p in parts]}
+        if file.always_overwrite or self._load_manifest(file) != manifest:
+            self._cleanup_parts(file)  # other layout or other remote file: nothing is reusable
+            self._save_manifest(file, manifest)
+
+        progress = {"done": 0, "total": remote_size}
+        cancel = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=max(1, self.config.max_workers), thread_name_prefix="download")
+        try:
+            futures = [pool.submit(self._fetch_part, file, i, start, end, validator, progress, cancel)
+                       for i, (start, end) in enumerate(parts)]
+            done, pending = wait(futures, timeout=self.config.timeout_seconds, return_when=FIRST_EXCEPTION)
+            for f in done:
+                f.result()  # re-raise the first failure
+            if pending:
+                raise TimeoutError(f"Download of {file.remote_file} exceeded {self.config.timeout_seconds}s")
+        except BaseException as e:
+            # stop in-flight parts after their current chunk; don't wait for them
+            cancel.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            if isinstance(e, RemoteChanged):
+                self._cleanup_parts(file)
+            raise
+        pool.shutdown()
+
+        tmp = file.local_file + ".tmp"
+        with open(tmp, "wb") as out:
+            for i in range(len(parts)):
+                with open(self._part_path(file, i), "rb") as src:
+                    shutil.copyfileobj(src, out, self.config.chunk_size_bytes)
+
+        size = os.path.getsize(tmp)
+        if (remote_size and size != remote_size) or (file.expected_size_byte and size != file.expected_size_byte):
+            os.remove(tmp)
+            self._cleanup_parts(file)
+            logging.error("[downloader] %s size mismatch: got %d, remote %d, expected %d",
+                          file.remote_file, size, remote_size, file.expected_size_byte)
+            return False
+
+        os.replace(tmp, file.local_file)
+        self._cleanup_parts(file)
+        return True
+
+    def download_all(self, files: list[FileDownload]) -> list[bool]:
+        """Download files one after another (each in parallel ranges), reporting progress per file."""
+        results = []
+        total = len(files)
+        for n, file in enumerate(files, start=1):
+            try:
+                ok = self.download(file)
+            except Exception as e:
+                logging.exception("[downloader] %s failed", file.remote_file)
+                self._notify(self._error, n - 1, total, f"{file.remote_file}: {e}")
+                ok = False
+            else:
+                if not ok:
+                    self._notify(self._error, n - 1, total, f"{file.remote_file}: size check failed")
+            results.append(ok)
+            self._notify(self._progress, n, total, file.local_file)
+        self._notify(self._complete, sum(results), total, "done")
+        return results
+
+    # ---------- Internals ----------
+    def _split(self, size: int) -> list[tuple[int, int]]:
+        part_size = max(self.config.min_part_size_bytes, -(-size // max(1, self.config.max_workers)))
+        return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+    @staticmethod
+    def _part_path(file: FileDownload, i: int) -> str:
+        return f"{file.local_file}.part{i}"
+
+    @staticmethod
+    def _manifest_path(file: FileDownload) -> str:
+        return f"{file.local_file}.parts.json"
+
+    def _load_manifest(self, file: FileDownload) -> dict | None:
+        try:
+            with open(self._manifest_path(file), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, file: FileDownload, manifest: dict):
+        tmp = self._manifest_path(file) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path(file))
+
+    def _cleanup_parts(self, file: FileDownload):
+        """Remove every .partN (whatever layout wrote them) and the manifest."""
+        for path in glob.glob(glob.escape(file.local_file) + ".part[0-9]*") + [self._manifest_path(file)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _fetch_part(self, file: FileDownload, i: int, start: int, end: int | None, validator: str | None,
+                    progress: dict, cancel: threading.Event):
+        path = self._part_path(file, i)
+        have = os.path.getsize(path) if os.path.exists(path) and not file.always_overwrite else 0
+        if end is not None and have >= end - start + 1:
+            self._add_progress(file, progress, have)
+            return  # range already complete from an earlier run
+
+        headers = dict(file.headers or {})
+        if end is not None:
+            headers["Range"] = f"bytes={start + have}-{end}"
+        elif have:
+            headers["Range"] = f"bytes={have}-"
+        if have and validator:
+            headers["If-Range"] = validator  # 200 instead of 206 if the file changed
+
+        with self.session.get(file.remote_file, params=file.params, headers=headers, auth=file.auth,
+                              stream=True, timeout=file.timeout_seconds) as r:
+            r.raise_for_status()
+            if have and r.status_code != 206:
+                if end is not None:
+                    raise RemoteChanged(f"{file.remote_file} changed since {path} was written")
+                have = 0  # single stream: the 200 body is the whole file, start over
+            self._add_progress(file, progress, have)
+            with open(path, "ab" if have else "wb") as out:
+                for chunk in r.iter_content(chunk_size=self.config.chunk_size_bytes):
+                    if cancel.is_set():
+                        raise DownloadCancelled(f"{path} stopped at {out.tell()} bytes")
+                    if chunk:
+                        out.write(chunk)
+                        self._add_progress(file, progress, len(chunk), report=False)
+        self._add_progress(file, progress, 0)
+
+    def _add_progress(self, file: FileDownload, progress: dict, n: int, report: bool = True):
+        with self._lock:
+            progress["done"] += n
+            done, total = progress["done"], progress["total"]
+        if report:
+            for obs in self._bytes:
+                try:
+                    obs.update_bytes(file.local_file, done, total or None)
+                except Exception:
+                    logging.exception("[downloader] byte reporter failed")
@@ -5,6 +5,11 @@ class Observer(ABC):
     def update(self, downloaded_files, files_to_download, message: str = ''):
         ...
 
+class ByteProgressObserver(ABC):
+    """Byte-level progress of one file (downloaded_files/files_to_download stay file counts)."""
+    @abstractmethod
+    def update_bytes(self, local_file: str, downloaded_bytes: int, total_bytes: int | None): ...
+
 class Subject(ABC):
     @abstractmethod
     def add_progress_reporter(self, observer: Observer): ...
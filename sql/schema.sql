@@ -26,6 +26,19 @@ BEGIN
 END;
 GO
 
+-- where the raw record came from: 'api' (worker) or 'archive' (app/archive_ingest.py).
+-- A partition is loaded from one source only (the two hash rows differently);
+-- archive records are the only ones without an outcome_object key.
+IF COL_LENGTH('dbo.bronze_stop_search', 'source') IS NULL
+BEGIN
+    ALTER TABLE dbo.bronze_stop_search
+        ADD source NVARCHAR(16) NOT NULL CONSTRAINT DF_bronze_source DEFAULT N'api';
+    EXEC(N'UPDATE dbo.bronze_stop_search SET source = N''archive'' WHERE payload NOT LIKE N''%"outcome_object"%'';
+           CREATE INDEX IX_bronze_force_month ON dbo.bronze_stop_search(force_id, [month]) INCLUDE (source)
+               WITH (DROP_EXISTING = ON);');
+END;
+GO
+
 ------------------------------------------------------------
 -- Silver Layer: typed fact table
 ------------------------------------------------------------
@@ -51,10 +64,13 @@ BEGIN
         removal_more_than_outer_clothing BIT NULL,
         latitude FLOAT NULL,
         longitude FLOAT NULL,
+        tile_x INT NULL,
+        tile_y INT NULL,
         street_id BIGINT NULL,
         street_name NVARCHAR(300) NULL,
         [month] DATE NOT NULL,
-        inserted_at DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME()
+        inserted_at DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+        updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_fact_updated_at DEFAULT SYSUTCDATETIME()
     );
     CREATE INDEX IX_fact_force_month ON dbo.fact_stop_search(force_id, [month]);
     CREATE INDEX IX_fact_datetime ON dbo.fact_stop_search(stop_datetime);
@@ -62,10 +78,64 @@ BEGIN
 END;
 GO
 
+-- z16 Web Mercator tile of the stop (app/geo.py); coarser grids divide it
+IF COL_LENGTH('dbo.fact_stop_search', 'tile_x') IS NULL
+BEGIN
+    ALTER TABLE dbo.fact_stop_search ADD tile_x INT NULL, tile_y INT NULL;
+END;
+GO
+
+-- last insert or revision of the row (lake export watermark); existing rows
+-- start from inserted_at so the migration does not trigger a full re-export
+IF COL_LENGTH('dbo.fact_stop_search', 'updated_at') IS NULL
+BEGIN
+    ALTER TABLE dbo.fact_stop_search ADD updated_at DATETIME2(0) NULL;
+    EXEC(N'UPDATE dbo.fact_stop_search SET updated_at = inserted_at;
+           ALTER TABLE dbo.fact_stop_search ALTER COLUMN updated_at DATETIME2(0) NOT NULL;
+           ALTER TABLE dbo.fact_stop_search ADD CONSTRAINT DF_fact_updated_at DEFAULT SYSUTCDATETIME() FOR updated_at;');
+END;
+GO
+
+-- keyset pagination (/stops): stop_datetime is nullable, so page on a
+-- non-null key; undated stops sort first within their month
+IF COL_LENGTH('dbo.fact_stop_search', 'stop_datetime_key') IS NULL
+BEGIN
+    ALTER TABLE dbo.fact_stop_search
+        ADD stop_datetime_key AS ISNULL(stop_datetime, CAST([month] AS DATETIME2(0))) PERSISTED;
+END;
+GO
+
+-- keyset index for /stops: one ordered range seek per page, however deep.
+-- The optional filters (outcome, ethnicity, legislation) are INCLUDEd so
+-- they are applied in the index; only the <= limit rows returned are looked
+-- up for the other columns. Per-filter covering copies of the table are
+-- not kept: they cost every silver write for little read gain.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_fact_stops_keyset' AND object_id = OBJECT_ID(N'dbo.fact_stop_search'))
+    CREATE INDEX IX_fact_stops_keyset ON dbo.fact_stop_search(force_id, [month], stop_datetime_key, row_hash)
+        INCLUDE (outcome, officer_defined_ethnicity, legislation);
+-- one-off migration: narrow the old wide keyset index, drop the per-filter ones
+IF EXISTS (SELECT 1 FROM sys.index_columns ic
+           JOIN sys.indexes i ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+           WHERE i.name = 'IX_fact_stops_keyset' AND i.object_id = OBJECT_ID(N'dbo.fact_stop_search')
+             AND COL_NAME(ic.object_id, ic.column_id) = 'street_name')
+    CREATE INDEX IX_fact_stops_keyset ON dbo.fact_stop_search(force_id, [month], stop_datetime_key, row_hash)
+        INCLUDE (outcome, officer_defined_ethnicity, legislation)
+        WITH (DROP_EXISTING = ON);
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_fact_stops_outcome' AND object_id = OBJECT_ID(N'dbo.fact_stop_search'))
+    DROP INDEX IX_fact_stops_outcome ON dbo.fact_stop_search;
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_fact_stops_ethnicity' AND object_id = OBJECT_ID(N'dbo.fact_stop_search'))
+    DROP INDEX IX_fact_stops_ethnicity ON dbo.fact_stop_search;
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_fact_stops_legislation' AND object_id = OBJECT_ID(N'dbo.fact_stop_search'))
+    DROP INDEX IX_fact_stops_legislation ON dbo.fact_stop_search;
+GO
+
 ------------------------------------------------------------
 -- Gold Layer: monthly outcomes aggregation (fixed PK)
 ------------------------------------------------------------
+-- one-off migration: drop only the legacy table without PK_gold
 IF OBJECT_ID(N'dbo.gold_monthly_outcomes', N'U') IS NOT NULL
+   AND NOT EXISTS (SELECT 1 FROM sys.key_constraints
+                   WHERE name = 'PK_gold' AND parent_object_id = OBJECT_ID(N'dbo.gold_monthly_outcomes'))
 BEGIN
     DROP TABLE dbo.gold_monthly_outcomes;
 END;
@@ -78,7 +148,171 @@ BEGIN
         [month]  DATE NOT NULL,
         outcome  NVARCHAR(200) NOT NULL CONSTRAINT DF_gold_outcome DEFAULT(''),
         [count]  INT NOT NULL,
+        updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_gold_updated_at DEFAULT SYSUTCDATETIME(),
         CONSTRAINT PK_gold PRIMARY KEY (force_id, [month], outcome)
     );
 END;
 GO
+
+-- gold version for HTTP validators (ETag): last time a count changed
+IF COL_LENGTH('dbo.gold_monthly_outcomes', 'updated_at') IS NULL
+BEGIN
+    ALTER TABLE dbo.gold_monthly_outcomes
+        ADD updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_gold_updated_at DEFAULT SYSUTCDATETIME();
+END;
+GO
+
+------------------------------------------------------------
+-- Gold Layer: spatial grid cells per force-month and zoom
+------------------------------------------------------------
+IF NOT EXISTS (SELECT 1 FROM sys.tables WHERE name = 'gold_grid_cells' AND schema_id = SCHEMA_ID('dbo'))
+BEGIN
+    CREATE TABLE dbo.gold_grid_cells (
+        force_id NVARCHAR(100) NOT NULL,
+        [month]  DATE NOT NULL,
+        zoom     TINYINT NOT NULL,
+        tile_x   INT NOT NULL,
+        tile_y   INT NOT NULL,
+        [count]  INT NOT NULL,
+        lat_avg  FLOAT NULL,
+        lon_avg  FLOAT NULL,
+        updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_grid_updated_at DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_gold_grid PRIMARY KEY (force_id, [month], zoom, tile_x, tile_y)
+    );
+END;
+GO
+
+-- one-off backfill: z16 tiles for silver rows loaded before tile_x/tile_y
+-- existed (app/geo.py tile_xy in T-SQL), then the grid cells of every slice
+-- touched (zooms as in GRID_ZOOMS). Runs once; an extended property on
+-- fact_stop_search marks it done. Newer rows get their tiles from the ETL.
+-- The touched slices are taken from the backfill predicate up front, one
+-- row per slice, rather than OUTPUT once per updated row.
+IF NOT EXISTS (SELECT 1 FROM sys.extended_properties
+               WHERE class = 1 AND major_id = OBJECT_ID(N'dbo.fact_stop_search') AND minor_id = 0
+                 AND name = N'tiles_backfilled')
+BEGIN
+    DECLARE @touched TABLE (force_id NVARCHAR(100) NOT NULL, [month] DATE NOT NULL,
+                            PRIMARY KEY (force_id, [month]));
+    INSERT INTO @touched (force_id, [month])
+    SELECT DISTINCT force_id, [month]
+    FROM dbo.fact_stop_search
+    WHERE tile_x IS NULL
+      AND latitude BETWEEN -90 AND 90 AND longitude BETWEEN -180 AND 180;
+
+    DECLARE @n INT = 1;
+    WHILE @n > 0
+    BEGIN
+        UPDATE TOP (50000) f
+        SET tile_x = t.x, tile_y = t.y
+        FROM dbo.fact_stop_search AS f
+        CROSS APPLY (SELECT CASE WHEN f.latitude > 85.05112878 THEN 85.05112878
+                                 WHEN f.latitude < -85.05112878 THEN -85.05112878
+                                 ELSE f.latitude END AS lat) AS c
+        CROSS APPLY (SELECT
+            CAST(FLOOR((f.longitude + 180.0) / 360.0 * 65536) AS INT) AS raw_x,
+            CAST(FLOOR((1.0 - LOG(TAN(RADIANS(c.lat)) + 1.0 / COS(RADIANS(c.lat))) / PI()) / 2.0 * 65536) AS INT) AS raw_y
+        ) AS r
+        CROSS APPLY (SELECT
+            CASE WHEN r.raw_x > 65535 THEN 65535 ELSE r.raw_x END AS x,
+            CASE WHEN r.raw_y > 65535 THEN 65535 WHEN r.raw_y < 0 THEN 0 ELSE r.raw_y END AS y
+        ) AS t
+        WHERE f.tile_x IS NULL
+          AND f.latitude BETWEEN -90 AND 90 AND f.longitude BETWEEN -180 AND 180;
+        SET @n = @@ROWCOUNT;
+    END;
+
+    DELETE g FROM dbo.gold_grid_cells AS g
+    WHERE EXISTS (SELECT 1 FROM @touched AS s WHERE s.force_id = g.force_id AND s.[month] = g.[month]);
+    INSERT INTO dbo.gold_grid_cells (force_id, [month], zoom, tile_x, tile_y, [count], lat_avg, lon_avg)
+    SELECT f.force_id, f.[month], z.zoom, f.tile_x / p.d, f.tile_y / p.d, COUNT(*), AVG(f.latitude), AVG(f.longitude)
+    FROM dbo.fact_stop_search AS f
+    JOIN @touched AS s ON s.force_id = f.force_id AND s.[month] = f.[month]
+    CROSS JOIN (VALUES (8), (10), (12), (14), (16)) AS z(zoom)
+    CROSS APPLY (SELECT POWER(2, 16 - z.zoom) AS d) AS p
+    WHERE f.tile_x IS NOT NULL
+    GROUP BY f.force_id, f.[month], z.zoom, f.tile_x / p.d, f.tile_y / p.d;
+
+    IF NOT EXISTS (SELECT 1 FROM sys.extended_properties
+                   WHERE class = 1 AND major_id = OBJECT_ID(N'dbo.fact_stop_search') AND minor_id = 0
+                     AND name = N'tiles_backfilled')
+        EXEC sys.sp_addextendedproperty @name = N'tiles_backfilled', @value = N'1',
+             @level0type = N'SCHEMA', @level0name = N'dbo',
+             @level1type = N'TABLE', @level1name = N'fact_stop_search';
+END;
+GO
+
+------------------------------------------------------------
+-- Gold Layer: time-series rollups per force-month
+------------------------------------------------------------
+IF NOT EXISTS (SELECT 1 FROM sys.tables WHERE name = 'gold_daily_counts' AND schema_id = SCHEMA_ID('dbo'))
+BEGIN
+    CREATE TABLE dbo.gold_daily_counts (
+        force_id  NVARCHAR(100) NOT NULL,
+        [month]   DATE NOT NULL,
+        stop_date DATE NOT NULL,
+        [count]   INT NOT NULL,
+        updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_daily_updated_at DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_gold_daily PRIMARY KEY (force_id, [month], stop_date)
+    );
+END;
+GO
+
+-- dow: 1 = Monday .. 7 = Sunday; hour in UK local time
+IF NOT EXISTS (SELECT 1 FROM sys.tables WHERE name = 'gold_hour_of_week' AND schema_id = SCHEMA_ID('dbo'))
+BEGIN
+    CREATE TABLE dbo.gold_hour_of_week (
+        force_id NVARCHAR(100) NOT NULL,
+        [month]  DATE NOT NULL,
+        dow      TINYINT NOT NULL,
+        [hour]   TINYINT NOT NULL,
+        [count]  INT NOT NULL,
+        updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_how_updated_at DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_gold_how PRIMARY KEY (force_id, [month], dow, [hour])
+    );
+END;
+GO
+
+-- one-off backfill: stop_date was never written by the silver MERGE. Set it
+-- to the UK local day of stop_datetime (as app/transform.py now does, and
+-- as gold_hour_of_week buckets), then rebuild the daily counts of every
+-- slice touched (collected up front, one row per slice, like the tiles
+-- backfill). Runs once; an extended property marks it done.
+IF NOT EXISTS (SELECT 1 FROM sys.extended_properties
+               WHERE class = 1 AND major_id = OBJECT_ID(N'dbo.fact_stop_search') AND minor_id = 0
+                 AND name = N'stop_date_backfilled')
+BEGIN
+    DECLARE @touched TABLE (force_id NVARCHAR(100) NOT NULL, [month] DATE NOT NULL,
+                            PRIMARY KEY (force_id, [month]));
+    INSERT INTO @touched (force_id, [month])
+    SELECT DISTINCT force_id, [month]
+    FROM dbo.fact_stop_search
+    WHERE stop_date IS NULL AND stop_datetime IS NOT NULL;
+
+    DECLARE @n INT = 1;
+    WHILE @n > 0
+    BEGIN
+        UPDATE TOP (50000) dbo.fact_stop_search
+        SET stop_date = CAST(stop_datetime AT TIME ZONE 'UTC' AT TIME ZONE 'GMT Standard Time' AS DATE),
+            updated_at = SYSUTCDATETIME()
+        WHERE stop_date IS NULL AND stop_datetime IS NOT NULL;
+        SET @n = @@ROWCOUNT;
+    END;
+
+    DELETE d FROM dbo.gold_daily_counts AS d
+    WHERE EXISTS (SELECT 1 FROM @touched AS s WHERE s.force_id = d.force_id AND s.[month] = d.[month]);
+    INSERT INTO dbo.gold_daily_counts (force_id, [month], stop_date, [count])
+    SELECT f.force_id, f.[month], f.stop_date, COUNT(*)
+    FROM dbo.fact_stop_search AS f
+    JOIN @touched AS s ON s.force_id = f.force_id AND s.[month] = f.[month]
+    WHERE f.stop_date IS NOT NULL
+    GROUP BY f.force_id, f.[month], f.stop_date;
+
+    IF NOT EXISTS (SELECT 1 FROM sys.extended_properties
+                   WHERE class = 1 AND major_id = OBJECT_ID(N'dbo.fact_stop_search') AND minor_id = 0
+                     AND name = N'stop_date_backfilled')
+        EXEC sys.sp_addextendedproperty @name = N'stop_date_backfilled', @value = N'1',
+             @level0type = N'SCHEMA', @level0name = N'dbo',
+             @level1type = N'TABLE', @level1name = N'fact_stop_search';
+END;
+GO
@@ -0,0 +1,18 @@
+# tests/test_api_metrics.py
+from fastapi import FastAPI
+from app.api_metrics import UNMATCHED, route_template
+
+def _scope(method, path):
+    return {"type": "http", "method": method, "path": path, "root_path": "", "query_string": b"", "headers": []}
+
+def test_route_template_bounds_label_cardinality():
+    app = FastAPI()
+
+    @app.get("/forces/{force_id}/stops")
+    def stops(force_id: str):
+        return []
+
+    assert route_template(app.router, _scope("GET", "/forces/metropolitan/stops")) == "/forces/{force_id}/stops"
+    assert route_template(app.router, _scope("GET", "/forces/kent/stops")) == "/forces/{force_id}/stops"
+    assert route_template(app.router, _scope("POST", "/forces/kent/stops")) == "/forces/{force_id}/stops"
+    assert route_template(app.router, _scope("GET", "/wp-admin/x.php")) == UNMATCHED
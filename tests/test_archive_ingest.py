@@ -0,0 +1,70 @@
+# tests/test_archive_ingest.py
+import datetime as dt
+import zipfile
+from app.archive_ingest import archive_members, read_member
+from app.transform import to_silver_rows
+
+CSV = (
+    "Type,Date,Part of a policing operation,Policing operation,Latitude,Longitude,Gender,Age range,"
+    "Self-defined ethnicity,Officer-defined ethnicity,Legislation,Object of search,Outcome,"
+    "Outcome linked to object of search,Removal of more than just outer clothing\n"
+    "Person search,2024-05-01T14:23:00+00:00,False,,51.5074,-0.1278,Male,18-24,"
+    "White,White,Misuse of Drugs Act 1971 (section 23),Controlled drugs,Arrest,True,False\n"
+    "Vehicle search,2024-05-02T09:00:00+00:00,,,,,,,,,,Stolen goods,A no further action disposal,,\n"
+)
+
+def test_stream_archive_to_silver_rows(tmp_path):
+    path = tmp_path / "2024-05.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("2024-05/2024-05-metropolitan-stop-and-search.csv", "\ufeff" + CSV)
+        zf.writestr("2024-05/2024-05-metropolitan-street.csv", "ignored")
+
+    with zipfile.ZipFile(path) as zf:
+        members = archive_members(zf)
+        assert [(f, ym) for f, ym, _ in members] == [("metropolitan", "2024-05")]
+        records = list(read_member(zf, members[0][2]))
+
+    rows = to_silver_rows("metropolitan", "2024-05", records)
+    assert len(rows) == 2
+    a, b = rows
+    assert a["type"] == "Person search" and a["involved_person"] is True
+    assert a["latitude"] == 51.5074 and a["outcome"] == "Arrest"
+    assert a["outcome_linked_to_object_of_search"] is True
+    assert a["stop_datetime"] == dt.datetime(2024, 5, 1, 14, 23)
+    assert b["latitude"] is None and b["gender"] is None
+    assert b["month"] == dt.date(2024, 5, 1)
+
+def _zip(tmp_path, members):
+    path = tmp_path / "2024-05.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        for force in members:
+            zf.writestr(f"2024-05/2024-05-{force}-stop-and-search.csv", CSV)
+    return str(path)
+
+def test_ingest_streams_batches_and_skips_partitions_loaded_from_api(tmp_path, monkeypatch):
+    from app import archive_ingest
+    from app.etl import SourceConflict
+    calls = []
+
+    def check_source(engine, force, ym, source):
+        assert source == "archive"
+        if force == "west-midlands":
+            raise SourceConflict(f"{force} {ym} already loaded from api")
+
+    monkeypatch.setattr(archive_ingest, "check_source", check_source)
+    monkeypatch.setattr(archive_ingest, "upsert_bronze",
+                        lambda engine, force, ym, batch, source: calls.append(("bronze", force, len(batch), source)))
+    monkeypatch.setattr(archive_ingest, "upsert_silver",
+                        lambda engine, force, ym, batch: calls.append(("silver", force, len(batch))) or len(batch))
+    monkeypatch.setattr(archive_ingest, "refresh_aggregates",
+                        lambda engine, force, ym: calls.append(("gold", force)))
+    monkeypatch.setattr(archive_ingest.settings, "archive_batch_rows", 1)
+
+    stats = archive_ingest.ingest_archive(None, _zip(tmp_path, ["metropolitan", "west-midlands"]))
+
+    assert stats == {"partitions": 1, "rows": 2, "inserted": 2, "skipped": 1}
+    assert calls == [
+        ("bronze", "metropolitan", 1, "archive"), ("silver", "metropolitan", 1),
+        ("bronze", "metropolitan", 1, "archive"), ("silver", "metropolitan", 1),
+        ("gold", "metropolitan"),  # once per partition, not per batch
+    ]
@@ -0,0 +1,27 @@
+# tests/test_benchmarks.py
+import datetime as dt
+from app.etl import bronze_rows, silver_payload
+from app.transform import to_silver_rows
+from benchmarks.offline import cases, compare, run
+from benchmarks.payloads import generate_stops
+
+def test_generator_is_seedable_and_transforms():
+    a = generate_stops(300, seed=7)
+    assert a == generate_stops(300, seed=7) and a != generate_stops(300, seed=8)
+    silver = to_silver_rows("metropolitan", "2024-05", a)
+    assert len(silver) == 300
+    assert any(r["latitude"] is None for r in silver) and any(r["tile_x"] for r in silver)
+    # exact duplicates collapse in bronze
+    assert len(bronze_rows("metropolitan", dt.date(2024, 5, 1), a)) < 300
+    assert len(silver_payload("metropolitan", dt.date(2024, 5, 1), silver)) == 300
+
+def test_run_and_regression_check():
+    current = run(sizes=(200,), repeat=1)
+    assert set(current["results"]) == set(cases(generate_stops(10)))
+    base = {"thresholds": {"default": 0.25}, "results": {
+        name: {"200": {"us_per_record": r["200"]["us_per_record"] / 2}} for name, r in current["results"].items()
+    }}
+    report = compare(current, base)
+    assert report and all(r["regression"] for r in report)
+    base["thresholds"]["default"] = 1.5
+    assert not any(r["regression"] for r in compare(current, base))
@@ -0,0 +1,79 @@
+# tests/test_cache.py
+import asyncio
+
+from app.cache import SliceCache, TTLCache
+from app.cache_events import make_done_handler
+from app.singleflight import SingleFlight
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_ttl_expiry():
+    clock = _Clock()
+    c = TTLCache(maxsize=10, ttl=5, clock=clock)
+    c.set(("metropolitan", "2024-05"), [1])
+    clock.now = 4.9
+    assert c.get(("metropolitan", "2024-05")) == [1]
+    clock.now = 5.0
+    assert c.get(("metropolitan", "2024-05")) is None
+    assert len(c) == 0
+
+def test_lru_eviction_and_predicate():
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set(("a", "2024-05"), 1)
+    c.set(("b", "2024-05"), 2)
+    c.get(("a", "2024-05"))          # a is now most recent
+    c.set(("c", "2024-05"), 3)       # evicts b
+    assert c.get(("b", "2024-05")) is None
+    assert c.evict(lambda k: k[0] == "a") == 1
+    assert c.get(("c", "2024-05")) == 3
+
+def test_load_started_before_invalidation_is_not_cached():
+    slices = SliceCache(TTLCache(maxsize=10, ttl=60), SingleFlight())
+    key = ("metropolitan", "2024-05")
+
+    async def main():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def stale_load():
+            started.set()
+            await release.wait()
+            return "before ingest"
+
+        async def fresh_load():
+            return "after ingest"
+
+        first = asyncio.create_task(slices.get("gold", key, stale_load))
+        await started.wait()
+        slices.invalidate(*key)
+        # a caller after the event does not join the stale flight
+        assert await slices.get("gold", key, fresh_load) == ("after ingest", "miss")
+        release.set()
+        assert await first == ("before ingest", "miss")
+        return await slices.get("gold", key, stale_load)
+
+    assert asyncio.run(main()) == ("after ingest", "hit")
+
+def test_put_is_dropped_after_invalidation():
+    cache = TTLCache(maxsize=10, ttl=60)
+    slices = SliceCache(cache, SingleFlight())
+    cache.set(("metropolitan", "2024-05", "grid", 12), 1)
+    generation = slices.generation("metropolitan", "2024-05")
+    assert slices.invalidate("metropolitan", "2024-05") == 1
+    assert not slices.put(("metropolitan", "2024-05"), 2, generation)
+    assert cache.get(("metropolitan", "2024-05")) is None
+
+def test_done_handler_swallows_callback_errors():
+    seen = []
+
+    def on_slice_changed(force, ym):
+        seen.append((force, ym))
+        raise RuntimeError("db down")
+
+    handler = make_done_handler(on_slice_changed)
+    handler({"force": "metropolitan", "month": "2024-05", "status": "ok"}, {})
+    handler({"force": "metropolitan", "month": "2024-05", "status": "error"}, {})
+    assert seen == [("metropolitan", "2024-05")]
@@ -0,0 +1,70 @@
+# tests/test_circuit_breaker.py
+import pytest
+import requests
+from app import disk_cache, http_client
+from app.circuit_breaker import CircuitBreaker, CircuitOpenError, RetryLater, endpoint_key
+
+@pytest.fixture(autouse=True)
+def _no_disk_cache(monkeypatch):
+    # these tests are about the upstream path, whatever the local environment sets
+    monkeypatch.setattr(disk_cache.settings, "http_cache_dir", "")
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+class _Resp:
+    def __init__(self, status, headers=None):
+        self.status_code, self.headers, self.content = status, headers or {}, b"[]"
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+def test_breaker_opens_fails_fast_and_recovers_via_half_open():
+    clock = _Clock()
+    b = CircuitBreaker("test/api", failure_threshold=2, reset_seconds=30, clock=clock)
+    b.before_call(); b.record_failure()
+    b.before_call(); b.record_failure()
+    assert b.state == b.OPEN
+    clock.t = 10
+    with pytest.raises(CircuitOpenError) as e:
+        b.before_call()
+    assert e.value.retry_after == pytest.approx(20)
+
+    clock.t = 31
+    b.before_call()  # the single half-open trial
+    with pytest.raises(CircuitOpenError):
+        b.before_call()
+    b.record_failure()
+    assert b.state == b.OPEN and b.opened_at == 31
+
+    clock.t = 62
+    b.before_call(); b.record_success()
+    assert b.state == b.CLOSED and b.failures == 0
+
+def test_deferred_get_raises_instead_of_sleeping(monkeypatch):
+    calls = []
+    monkeypatch.setattr(http_client.requests, "get", lambda *a, **k: calls.append(1) or _Resp(429, {"Retry-After": "7"}))
+    monkeypatch.setattr(http_client.time, "sleep", lambda s: pytest.fail("slept in defer mode"))
+    b = CircuitBreaker("test/defer", failure_threshold=1, reset_seconds=60)
+    with pytest.raises(RetryLater) as e:
+        http_client.http_get_with_backoff("http://x/api", breaker=b, defer=True)
+    assert e.value.retry_after == 7 and len(calls) == 1 and b.state == b.OPEN
+    with pytest.raises(CircuitOpenError):
+        http_client.http_get_with_backoff("http://x/api", breaker=b, defer=True)
+    assert len(calls) == 1  # open circuit: upstream not called
+
+def test_client_errors_are_not_retried(monkeypatch):
+    calls = []
+    monkeypatch.setattr(http_client.requests, "get", lambda *a, **k: calls.append(1) or _Resp(404))
+    b = CircuitBreaker("test/404", failure_threshold=1)
+    with pytest.raises(requests.HTTPError):
+        http_client.http_get_with_backoff("http://x/api", breaker=b)
+    assert len(calls) == 1 and b.state == b.CLOSED
+
+def test_endpoint_key_ignores_query():
+    assert endpoint_key("https://data.police.uk/api/stops-force?force=kent") == "data.police.uk/api/stops-force"
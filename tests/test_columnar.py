@@ -0,0 +1,63 @@
+# tests/test_columnar.py
+import datetime as dt
+from app.columnar import GoldStore, store_window
+
+ROWS = [
+    {"force_id": "metropolitan", "month": dt.date(2024, 4, 1), "outcome": "Arrest", "count": 10},
+    {"force_id": "metropolitan", "month": dt.date(2024, 5, 1), "outcome": "Arrest", "count": 12},
+    {"force_id": "metropolitan", "month": "2024-05-01", "outcome": "Nothing found", "count": 30},
+    {"force_id": "city-of-london", "month": dt.date(2024, 5, 1), "outcome": "Arrest", "count": 5},
+]
+
+def _store():
+    s = GoldStore()
+    s.load(ROWS)
+    return s
+
+def test_group_by_and_filters():
+    s = _store()
+    assert s.group_counts(()) == [{"count": 57}]
+    assert s.group_counts(("force",)) == [{"force": "metropolitan", "count": 52}, {"force": "city-of-london", "count": 5}]
+    assert s.group_counts(("month", "outcome"), forces=["metropolitan"], start="2024-05") == [
+        {"month": "2024-05", "outcome": "Arrest", "count": 12},
+        {"month": "2024-05", "outcome": "Nothing found", "count": 30},
+    ]
+    assert s.group_counts(("force",), outcomes=["Arrest"], end="2024-04") == [{"force": "metropolitan", "count": 10}]
+    assert s.group_counts(("force",), forces=["unknown"]) == []
+
+def test_replace_slice_swaps_only_that_slice():
+    s = _store()
+    v = s.version
+    s.replace_slice("metropolitan", "2024-05", [
+        {"force_id": "metropolitan", "month": "2024-05-01", "outcome": "Arrest", "count": 13,
+         "updated_at": dt.datetime(2024, 6, 2, 3, 0)},
+        {"force_id": "metropolitan", "month": "2024-05-01", "outcome": "Summons", "count": 1,
+         "updated_at": "2024-06-02 03:00:00"},
+    ])
+    assert s.version != v and s.version == f"{int(dt.datetime(2024, 6, 2, 3, tzinfo=dt.timezone.utc).timestamp())}-4"
+    assert len(s) == 4
+    assert s.group_counts(("outcome",), forces=["metropolitan"], start="2024-05") == [
+        {"outcome": "Arrest", "count": 13}, {"outcome": "Summons", "count": 1},
+    ]
+    assert s.group_counts(("force",), start="2024-04", end="2024-04") == [{"force": "metropolitan", "count": 10}]
+
+def test_version_is_derived_from_the_data():
+    rows = [dict(r, updated_at=dt.datetime(2024, 6, 1)) for r in ROWS]
+    a, b = GoldStore(), GoldStore()
+    a.load(rows)
+    b.load(rows[:3])
+    assert a.version != b.version  # row count differs
+    b.load(rows)
+    b.load(rows)
+    assert a.version == b.version  # same data, another process or reload: same ETag
+
+def test_compare_shares():
+    out = _store().compare(["metropolitan", "city-of-london"], start="2024-05", end="2024-05")
+    assert out["metropolitan"]["total"] == 42
+    assert out["metropolitan"]["outcomes"]["Arrest"] == {"count": 12, "share": 0.2857}
+    assert out["city-of-london"]["outcomes"] == {"Arrest": {"count": 5, "share": 1.0}}
+
+def test_store_window_spans_year_boundaries():
+    assert store_window("2024-05", 36) == ("2021-06", "2024-05")
+    assert store_window("2024-01", 1) == ("2024-01", "2024-01")
+    assert store_window("2024-01", 2) == ("2023-12", "2024-01")
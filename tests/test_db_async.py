@@ -0,0 +1,69 @@
+# tests/test_db_async.py
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.db_async import AsyncDB
+from benchmarks.standin_db import attach, create_standin, seed_gold
+
+# several seconds on sqlite unless interrupted
+SLOW_SQL = text("""
+    WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 10000000)
+    SELECT MAX(x) AS n FROM c
+""")
+GOLD_SQL = text("SELECT outcome, [count] FROM dbo.gold_monthly_outcomes WHERE force_id = :force")
+
+class _Request:
+    """Starlette-like request that reports a disconnect after `after` seconds."""
+    def __init__(self, after: float):
+        self.deadline = time.monotonic() + after
+
+    async def is_disconnected(self):
+        return time.monotonic() >= self.deadline
+
+@pytest.fixture
+def db(tmp_path):
+    d = AsyncDB(create_standin(str(tmp_path)), pool_size=1, pool_timeout=0.2, query_timeout=5)
+    attach(d.engine, str(tmp_path))
+    seed_gold(d.engine, [("metropolitan", "2024-05-01", "Arrest", 3)])
+    yield d
+    d.close()
+
+def _after_interrupt(db):
+    # one connection, one executor thread: this only runs in time if the slow query was interrupted
+    return asyncio.run(db.fetch_all(GOLD_SQL, {"force": "metropolitan"}, timeout=2))
+
+def test_fetch_all_returns_dicts(db):
+    assert _after_interrupt(db) == [{"outcome": "Arrest", "count": 3}]
+
+def test_timeout_raises_504_and_interrupts_query(db):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(db.fetch_all(SLOW_SQL, timeout=0.2))
+    assert e.value.status_code == 504
+    assert _after_interrupt(db) == [{"outcome": "Arrest", "count": 3}]
+
+def test_client_disconnect_raises_499_and_interrupts_query(db):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(db.fetch_all(SLOW_SQL, request=_Request(after=0.2), timeout=30))
+    assert e.value.status_code == 499
+    assert _after_interrupt(db) == [{"outcome": "Arrest", "count": 3}]
+
+def test_cancelled_caller_interrupts_query(db):
+    async def main():
+        task = asyncio.ensure_future(db.fetch_all(SLOW_SQL, timeout=30))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert _after_interrupt(db) == [{"outcome": "Arrest", "count": 3}]
+
+def test_exhausted_pool_raises_503(db):
+    with db.engine.connect():  # holds the only pooled connection
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(db.fetch_all(GOLD_SQL, {"force": "metropolitan"}))
+    assert e.value.status_code == 503
@@ -0,0 +1,35 @@
+# tests/test_db_instrument.py
+import logging
+from prometheus_client import CollectorRegistry
+from sqlalchemy import create_engine, text
+from app.db_instrument import DbMetrics, TimedQueuePool, instrument_engine
+
+def _engine(slow_ms=1000.0):
+    registry = CollectorRegistry()
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool, pool_size=1, max_overflow=0)
+    instrument_engine(engine, DbMetrics(registry, prefix="t_db"), slow_ms=slow_ms)
+    return engine, registry
+
+def _count(registry, name, **labels):
+    return registry.get_sample_value(f"{name}_count", labels) or 0
+
+def test_statements_named_or_fall_back_to_verb():
+    engine, registry = _engine()
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INT)"))
+        conn.execute(text("INSERT INTO t VALUES (:x)").execution_options(statement_name="t_load"),
+                     [{"x": 1}, {"x": 2}, {"x": 3}])
+        conn.execute(text("SELECT * FROM t"))
+    assert _count(registry, "t_db_statement_seconds", statement="t_load") == 1
+    assert _count(registry, "t_db_statement_seconds", statement="select") == 1
+    assert _count(registry, "t_db_statement_seconds", statement="create") == 1
+    assert registry.get_sample_value("t_db_statement_rows_sum", {"statement": "t_load"}) == 3
+    assert _count(registry, "t_db_pool_wait_seconds") >= 1
+
+def test_slow_statement_logged_with_param_count(caplog):
+    engine, _ = _engine(slow_ms=0)
+    with caplog.at_level(logging.WARNING, logger="app.db"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :a + :b").execution_options(statement_name="sum_ab"), {"a": 1, "b": 2})
+    slow = [r.getMessage() for r in caplog.records if "sum_ab" in r.getMessage()]
+    assert slow and "params=2 in 1 set(s)" in slow[0]
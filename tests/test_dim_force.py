@@ -0,0 +1,78 @@
+# tests/test_dim_force.py
+import json
+import pytest
+from app import db, etl
+
+class _Conn:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt, params=None):
+        self.engine.statements.append((str(stmt), params))
+        return [("INSERT",)] * len(json.loads(params["payload"]))
+
+class _Engine:
+    url = "mssql+pyodbc://test/db"
+
+    def __init__(self):
+        self.statements = []
+
+    def begin(self):
+        return _Conn(self)
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.setattr(db, "_dim_force_versions", {})
+    monkeypatch.setattr(etl, "_force_names", {})
+    monkeypatch.setattr(etl, "_force_names_at", None)
+
+def test_upsert_forces_sends_one_openjson_payload_and_caches_version():
+    engine = _Engine()
+    forces = [{"id": "metropolitan", "name": "Metropolitan Police Service"},
+              {"id": "city-of-london", "name": "City of London Police"}]
+    assert db.upsert_forces(engine, forces) == 2
+    (sql, params), = engine.statements
+    assert "OPENJSON(:payload)" in sql
+    assert json.loads(params["payload"]) == [  # sorted by id
+        {"id": "city-of-london", "name": "City of London Police"},
+        {"id": "metropolitan", "name": "Metropolitan Police Service"},
+    ]
+    assert db.upsert_forces(engine, list(reversed(forces))) == 0  # same list: no round-trip
+    assert len(engine.statements) == 1
+    assert db.upsert_forces(engine, forces + [{"id": "kent", "name": "Kent Police"}]) == 3
+    assert db.upsert_forces(engine, []) == 0
+
+def _api(monkeypatch, present, fail=False):
+    calls, upserts = [], []
+    def list_forces():
+        calls.append(1)
+        if fail:
+            raise ConnectionError("down")
+        return [{"id": "metropolitan", "name": "Metropolitan Police Service"}]
+    monkeypatch.setattr(etl.client, "list_forces", list_forces)
+    monkeypatch.setattr(etl, "force_ids", lambda engine: set(present))
+    monkeypatch.setattr(etl, "upsert_forces", lambda engine, rows: upserts.append(rows) or len(rows))
+    return calls, upserts
+
+def test_load_dim_force_skips_api_when_table_is_complete(monkeypatch):
+    calls, upserts = _api(monkeypatch, present={"metropolitan", "kent"})
+    etl.load_dim_force(None, ["metropolitan", "kent"], max_age=3600)
+    etl.load_dim_force(None, ["metropolitan", "kent"], max_age=3600)
+    assert calls == []
+    assert upserts == [[], []]  # existing names are not overwritten with derived ones
+
+    etl.load_dim_force(None, ["metropolitan", "kent"], max_age=0)  # stale: refresh
+    assert calls == [1]
+    assert upserts[-1] == [{"id": "metropolitan", "name": "Metropolitan Police Service"}]
+
+def test_load_dim_force_fetches_for_missing_forces_and_survives_api_outage(monkeypatch):
+    calls, upserts = _api(monkeypatch, present=set(), fail=True)
+    assert etl.load_dim_force(None, ["west-midlands"], max_age=3600) == 1
+    assert upserts == [[{"id": "west-midlands", "name": "West Midlands"}]]
+    assert calls == [1]
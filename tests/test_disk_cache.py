@@ -0,0 +1,70 @@
+# tests/test_disk_cache.py
+import json
+import os
+import pytest
+from app import disk_cache, http_client
+from app.disk_cache import HttpDiskCache, endpoint_class
+from app.utils import last_month_yyyymm
+
+STOPS = "https://data.police.uk/api/stops-force"
+TTLS = {"stops_historical": 3600, "stops_recent": 60, "availability": 60, "reference": 60}
+
+def test_endpoint_classes():
+    assert endpoint_class(STOPS, {"force": "kent", "date": "2019-01"}) == "stops_historical"
+    assert endpoint_class(STOPS, {"force": "kent", "date": last_month_yyyymm()}) == "stops_recent"
+    assert endpoint_class("https://data.police.uk/api/crimes-street-dates") == "availability"
+    assert endpoint_class("https://data.police.uk/api/forces") == "reference"
+    assert endpoint_class("https://example.com/other") == "other"
+
+def test_roundtrip_content_addressed_and_ttl(tmp_path, monkeypatch):
+    cache = HttpDiskCache(str(tmp_path), max_bytes=1 << 20, ttls=TTLS)
+    body = json.dumps([{"outcome": "Arrest"}] * 200).encode()
+    assert cache.put(STOPS, {"force": "kent", "date": "2019-01"}, body, "application/json")
+    assert cache.put(STOPS, {"date": "2019-02", "force": "kent"}, body)
+    assert not cache.put("https://example.com/other", None, body)  # uncached class
+
+    hit = cache.get(STOPS, {"date": "2019-01", "force": "kent"})  # param order doesn't matter
+    assert hit.body == body and hit.to_response(STOPS).json()[0]["outcome"] == "Arrest"
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bodies"] == 1 and stats["bytes"] < len(body)
+
+    now = disk_cache.time.time()
+    monkeypatch.setattr(disk_cache.time, "time", lambda: now + 7200)
+    assert cache.get(STOPS, {"force": "kent", "date": "2019-01"}) is None
+
+def test_lru_eviction_by_total_size(tmp_path):
+    cache = HttpDiskCache(str(tmp_path), max_bytes=2500, ttls=TTLS)
+    bodies = {m: os.urandom(1000) for m in ("2019-01", "2019-02", "2019-03")}
+    cache.put(STOPS, {"date": "2019-01"}, bodies["2019-01"])
+    cache.put(STOPS, {"date": "2019-02"}, bodies["2019-02"])
+    assert cache.get(STOPS, {"date": "2019-01"})  # 2019-02 is now least recently used
+    cache.put(STOPS, {"date": "2019-03"}, bodies["2019-03"])
+    assert cache.get(STOPS, {"date": "2019-02"}) is None
+    assert cache.get(STOPS, {"date": "2019-01"}).body == bodies["2019-01"]
+    assert cache.stats()["bodies"] == 2
+    assert sum(len(f) for _, _, f in os.walk(tmp_path / "objects")) == 2
+
+def test_http_get_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache.settings, "http_cache_dir", str(tmp_path))
+    calls = []
+
+    class _Resp:
+        status_code, headers, content = 200, {"Content-Type": "application/json"}, b"[1, 2]"
+
+        def raise_for_status(self):
+            pass
+
+    monkeypatch.setattr(http_client.requests, "get", lambda *a, **k: calls.append(1) or _Resp())
+    params = {"force": "kent", "date": "2019-01"}
+    waits = []
+
+    def limited():  # the worker's rate limiter
+        waits.append(1)
+
+    assert http_client.http_get_with_backoff(STOPS, params=params, before_request=limited).content == b"[1, 2]"
+    assert http_client.http_get_with_backoff(STOPS, params=params, before_request=limited).json() == [1, 2]
+    assert len(calls) == 1 and len(waits) == 1  # the hit skipped the limiter
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(disk_cache.settings, "http_cache_dir", "")
+        http_client.http_get_with_backoff(STOPS, params=params)
+    assert len(calls) == 2
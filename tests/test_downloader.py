@@ -0,0 +1,191 @@
+# tests/test_downloader.py
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from downloader.config import DownloaderConfig
+from downloader.file_download import FileDownload
+from downloader.http_downloader import HttpDownloader, RemoteChanged
+from downloader.subject import ByteProgressObserver, Observer
+
+BLOB = os.urandom(300_000)
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    ranges = []
+    blob, etag = BLOB, '"v1"'
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.blob)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+
+    def do_GET(self):
+        rng = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if rng and if_range in (None, self.etag):
+            self.ranges.append(rng)
+            start, end = rng.split("=")[1].split("-")
+            start, end = int(start), int(end) if end else len(self.blob) - 1
+            body = self.blob[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(self.blob)}")
+        else:
+            body = self.blob
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _SlowHandler(_RangeHandler):
+    """Ranges trickle out at 1 KiB per 50 ms."""
+    def do_GET(self):
+        start, end = self.headers["Range"].split("=")[1].split("-")
+        body = BLOB[int(start):int(end) + 1]
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            for i in range(0, len(body), 1024):
+                self.wfile.write(body[i:i + 1024])
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            pass
+
+
+def _serve(handler):
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+@pytest.fixture
+def server():
+    _RangeHandler.ranges = []
+    _RangeHandler.blob, _RangeHandler.etag = BLOB, '"v1"'
+    srv = _serve(_RangeHandler)
+    yield f"http://127.0.0.1:{srv.server_port}/archive.zip"
+    srv.shutdown()
+
+
+def _interrupted(tmp_path, server, parts, etag='"v1"', blob=BLOB):
+    """Leave 1000 bytes of every part and the manifest, as an interrupted run would."""
+    for i, (start, _) in enumerate(parts):
+        (tmp_path / f"archive.zip.part{i}").write_bytes(blob[start:start + 1000])
+    (tmp_path / "archive.zip.parts.json").write_text(json.dumps(
+        {"remote": server, "size": len(blob), "validator": etag, "parts": parts}))
+
+
+class _Collect(Observer, ByteProgressObserver):
+    def __init__(self):
+        self.calls = []
+        self.bytes = []
+
+    def update(self, downloaded_files, files_to_download, message=''):
+        self.calls.append((downloaded_files, files_to_download, message))
+
+    def update_bytes(self, local_file, downloaded_bytes, total_bytes):
+        self.bytes.append((downloaded_bytes, total_bytes))
+
+
+def test_parallel_download_reports_progress(server, tmp_path):
+    dl = HttpDownloader(DownloaderConfig(max_workers=4, min_part_size_bytes=50_000))
+    progress, complete = _Collect(), _Collect()
+    dl.add_progress_reporter(progress)
+    dl.add_byte_progress_reporter(progress)
+    dl.add_complete_reporter(complete)
+
+    local = tmp_path / "archive.zip"
+    assert dl.download_all([FileDownload(remote_file=server, local_file=str(local))]) == [True]
+
+    assert local.read_bytes() == BLOB
+    assert len(_RangeHandler.ranges) == 4
+    assert not list(tmp_path.glob("*.part*"))
+    assert complete.calls == [(1, 1, "done")]
+    assert progress.calls == [(1, 1, str(local))]  # file counts only; bytes go to update_bytes
+    assert progress.bytes[-1] == (len(BLOB), len(BLOB))
+
+
+def test_resume_from_partial_part(server, tmp_path):
+    dl = HttpDownloader(DownloaderConfig(max_workers=2, min_part_size_bytes=50_000))
+    local = tmp_path / "archive.zip"
+    _interrupted(tmp_path, server, [[0, 149999], [150000, 299999]])
+
+    assert dl.download(FileDownload(remote_file=server, local_file=str(local)))
+    assert local.read_bytes() == BLOB
+    assert sorted(_RangeHandler.ranges) == ["bytes=1000-149999", "bytes=151000-299999"]
+    assert not list(tmp_path.glob("archive.zip.part*"))
+
+
+def test_resume_with_other_layout_starts_over(server, tmp_path):
+    _interrupted(tmp_path, server, [[0, 149999], [150000, 299999]])  # written with max_workers=2
+    dl = HttpDownloader(DownloaderConfig(max_workers=4, min_part_size_bytes=50_000))
+    local = tmp_path / "archive.zip"
+
+    assert dl.download(FileDownload(remote_file=server, local_file=str(local)))
+    assert local.read_bytes() == BLOB
+    assert sorted(_RangeHandler.ranges) == ["bytes=0-74999", "bytes=150000-224999",
+                                            "bytes=225000-299999", "bytes=75000-149999"]
+
+
+def test_resume_against_changed_remote_starts_over(server, tmp_path):
+    old = os.urandom(len(BLOB))
+    _interrupted(tmp_path, server, [[0, 149999], [150000, 299999]], etag='"v0"', blob=old)
+    dl = HttpDownloader(DownloaderConfig(max_workers=2, min_part_size_bytes=50_000))
+    local = tmp_path / "archive.zip"
+
+    assert dl.download(FileDownload(remote_file=server, local_file=str(local)))
+    assert local.read_bytes() == BLOB
+    assert sorted(_RangeHandler.ranges) == ["bytes=0-149999", "bytes=150000-299999"]
+
+
+def test_resumed_range_answered_with_200_discards_parts(server, tmp_path):
+    # HEAD still says v1, but the file changes before the ranges are fetched
+    _interrupted(tmp_path, server, [[0, 149999], [150000, 299999]])
+    _RangeHandler.blob, _RangeHandler.etag = os.urandom(len(BLOB)), '"v2"'
+    dl = HttpDownloader(DownloaderConfig(max_workers=2, min_part_size_bytes=50_000))
+    dl.prepare_download = lambda file: (len(BLOB), True, '"v1"')
+    local = tmp_path / "archive.zip"
+
+    with pytest.raises(RemoteChanged):
+        dl.download(FileDownload(remote_file=server, local_file=str(local)))
+    assert not local.exists()
+    assert not list(tmp_path.glob("archive.zip.part*"))
+
+
+def test_expected_size_mismatch_fails(server, tmp_path):
+    dl = HttpDownloader(DownloaderConfig(max_workers=2, min_part_size_bytes=50_000))
+    local = tmp_path / "archive.zip"
+    ok = dl.download(FileDownload(remote_file=server, local_file=str(local), expected_size_byte=123))
+    assert ok is False
+    assert not local.exists()
+
+
+def test_timeout_returns_without_waiting_for_parts(tmp_path):
+    srv = _serve(_SlowHandler)
+    try:
+        dl = HttpDownloader(DownloaderConfig(max_workers=2, min_part_size_bytes=50_000, timeout_seconds=0.5,
+                                             chunk_size_bytes=1024))
+        local = tmp_path / "archive.zip"
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            dl.download(FileDownload(remote_file=f"http://127.0.0.1:{srv.server_port}/a.zip", local_file=str(local)))
+        assert time.monotonic() - started < 2  # a full download takes ~7s
+        time.sleep(0.5)
+        assert not [t for t in threading.enumerate() if t.name.startswith("download")]
+        assert 0 < (tmp_path / "archive.zip.part0").stat().st_size < 150_000  # kept for resume
+        assert not local.exists()
+    finally:
+        srv.shutdown()
@@ -0,0 +1,42 @@
+# tests/test_export.py
+import csv
+import datetime as dt
+import io
+import json
+import pyarrow.parquet as pq
+from app.export import SILVER_COLUMNS, csv_chunks, month_range, ndjson_chunks, parquet_chunks
+
+def _row(i):
+    return (f"h{i}", "metropolitan", dt.datetime(2024, 5, 3, 14, 0), dt.date(2024, 5, 3), "Person search",
+            True, "Male", "18-24", None, "White", "Misuse of Drugs Act 1971 (section 23)", "Controlled drugs",
+            "Arrest", False, None, None, None, 51.5, -0.12, 1234, "On or near High Street",
+            dt.date(2024, 5, 1), dt.datetime(2024, 6, 1, 3, 10), dt.datetime(2024, 6, 1, 3, 10))
+
+CHUNKS = [[_row(i) for i in range(3)], [_row(i) for i in range(3, 5)]]
+
+def test_month_range():
+    assert month_range("2023-11", "2024-02") == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    assert month_range("2024-03", "2024-03") == ["2024-03"]
+    assert month_range("2024-03", "2024-01") == []
+
+def test_ndjson_and_csv_stream_one_block_per_chunk():
+    blocks = list(ndjson_chunks(iter(CHUNKS)))
+    assert len(blocks) == 2
+    rows = [json.loads(line) for b in blocks for line in b.decode().splitlines()]
+    assert [r["row_hash"] for r in rows] == ["h0", "h1", "h2", "h3", "h4"]
+    assert rows[0]["stop_datetime"] == "2024-05-03T14:00:00" and rows[0]["month"] == "2024-05-01"
+
+    text = b"".join(csv_chunks(iter(CHUNKS))).decode()
+    parsed = list(csv.reader(io.StringIO(text)))
+    assert parsed[0] == SILVER_COLUMNS
+    assert len(parsed) == 6
+
+def test_parquet_stream_is_one_valid_file():
+    blocks = list(parquet_chunks(iter(CHUNKS)))
+    assert len(blocks) >= 2  # bytes leave as each row group is written
+    f = pq.ParquetFile(io.BytesIO(b"".join(blocks)))
+    assert f.metadata.num_row_groups == 2
+    table = f.read()
+    assert table.column_names == SILVER_COLUMNS
+    assert table.num_rows == 5
+    assert table.column("street_id").to_pylist()[0] == 1234
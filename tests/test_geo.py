@@ -0,0 +1,29 @@
+# tests/test_geo.py
+import pytest
+from app.geo import GRID_MAX_ZOOM, bbox_tiles, parse_bbox, tile_bounds, tile_xy
+from app.transform import to_silver_rows
+
+def test_tile_xy_and_coarser_zooms_are_shifts():
+    x, y = tile_xy(51.5074, -0.1278)  # Whitehall
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(x, y, GRID_MAX_ZOOM)
+    assert min_lon <= -0.1278 <= max_lon and min_lat <= 51.5074 <= max_lat
+    for z in (8, 12):
+        assert tile_xy(51.5074, -0.1278, z) == (x >> (GRID_MAX_ZOOM - z), y >> (GRID_MAX_ZOOM - z))
+    assert tile_xy(None, -0.1) is None and tile_xy(91.0, 0.0) is None
+
+def test_bbox_tiles_cover_corners():
+    bbox = parse_bbox("-0.2,51.4,0.0,51.6")
+    x0, y0, x1, y1 = bbox_tiles(bbox, 12)
+    assert x0 <= x1 and y0 <= y1
+    for lat, lon in ((51.4, -0.2), (51.6, 0.0), (51.5, -0.1)):
+        x, y = tile_xy(lat, lon, 12)
+        assert x0 <= x <= x1 and y0 <= y <= y1
+    with pytest.raises(ValueError):
+        parse_bbox("0,51,-1,52")
+
+def test_silver_rows_carry_grid_key():
+    rec = {"location": {"latitude": "51.5074", "longitude": "-0.1278"}, "datetime": "2024-05-01T14:23:00+00:00"}
+    nowhere = {"location": None, "datetime": "2024-05-01T14:23:00+00:00"}
+    r, missing = to_silver_rows("metropolitan", "2024-05", [rec, nowhere])
+    assert (r["tile_x"], r["tile_y"]) == tile_xy(51.5074, -0.1278)
+    assert missing["tile_x"] is None and missing["tile_y"] is None
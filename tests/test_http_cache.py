@@ -0,0 +1,72 @@
+# tests/test_http_cache.py
+import gzip
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.http_cache import CompressionMiddleware, choose_encoding, conditional_response, make_etag
+
+BIG = b'{"rows":[' + b",".join(b'{"outcome":"Arrest","count":1}' for _ in range(100)) + b"]}"
+ETAG = make_etag("outcomes", "metropolitan", "2024-05", "2024-06-01 00:00:00")
+
+def _client(body: bytes = BIG) -> TestClient:
+    renders = []
+
+    def render():
+        renders.append(1)
+        return body
+
+    async def endpoint(request: Request):
+        return conditional_response(request, ETAG, "public, max-age=60", render)
+
+    app = Starlette(routes=[Route("/x", endpoint)])
+    app.add_middleware(CompressionMiddleware, minimum_size=512)
+    client = TestClient(app)
+    client.renders = renders
+    return client
+
+def test_etag_is_weak_and_stable():
+    assert ETAG.startswith('W/"') and ETAG == make_etag("outcomes", "metropolitan", "2024-05", "2024-06-01 00:00:00")
+    assert ETAG != make_etag("outcomes", "metropolitan", "2024-05", "2024-06-02 00:00:00")
+
+def test_if_none_match_returns_304_without_rendering():
+    client = _client()
+    r = client.get("/x", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200 and r.headers["etag"] == ETAG and client.renders == [1]
+    for tag in (ETAG, ETAG.removeprefix("W/"), f'"other", {ETAG}', "*"):
+        r = client.get("/x", headers={"If-None-Match": tag, "Accept-Encoding": "gzip"})
+        assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == ETAG
+        assert "content-encoding" not in r.headers
+    assert client.renders == [1]
+    assert client.get("/x", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_same_etag_across_encodings():
+    client = _client()
+    raw = client.get("/x", headers={"Accept-Encoding": "identity"})
+    gz = client.get("/x", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in raw.headers and raw.content == BIG
+    assert gz.headers["content-encoding"] == "gzip" and gz.headers["vary"] == "Accept-Encoding"
+    assert gz.content == BIG  # httpx decodes
+    assert raw.headers["etag"] == gz.headers["etag"] == ETAG  # weak: bodies differ
+
+def test_below_minimum_size_is_not_compressed():
+    r = _client(b'{"rows":[]}').get("/x", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers and r.content == b'{"rows":[]}'
+    assert r.headers["content-length"] == str(len(b'{"rows":[]}'))
+
+def test_accept_encoding_q_values():
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*;q=0.5") in ("br", "gzip")
+    assert choose_encoding("gzip;q=0.2, identity;q=0.9") is None
+    assert choose_encoding("br;q=0.1, gzip;q=0.8") == "gzip"
+    assert choose_encoding("gzip;q=bogus") is None
+
+def test_gzip_body_is_valid_gzip():
+    client = _client()
+    with client.stream("GET", "/x", headers={"Accept-Encoding": "gzip"}) as r:
+        body = b"".join(r.iter_raw())
+    assert gzip.decompress(body) == BIG and r.headers["content-length"] == str(len(body))
@@ -0,0 +1,26 @@
+# tests/test_keyset.py
+import datetime as dt
+import pytest
+from app.keyset import decode_cursor, encode_cursor, row_key, stops_query
+
+def test_cursor_round_trip():
+    key = (dt.date(2024, 5, 1), dt.datetime(2024, 5, 3, 14, 0), "ab" * 32)
+    token = encode_cursor(key)
+    assert "=" not in token
+    assert decode_cursor(token) == key
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_row_key_accepts_driver_strings():
+    row = {"month": "2024-05-01", "stop_datetime_key": "2024-05-03 14:00:00", "row_hash": "h"}
+    assert row_key(row) == (dt.date(2024, 5, 1), dt.datetime(2024, 5, 3, 14, 0), "h")
+
+def test_stops_query_filters_and_seek():
+    sql, params = stops_query({"outcome": "Arrest", "ethnicity": None, "legislation": None}, None)
+    assert "outcome = :f_outcome" in sql.text and "officer_defined_ethnicity" not in sql.text.split("WHERE")[1]
+    assert "OFFSET" not in sql.text and params == {"f_outcome": "Arrest"}
+
+    key = (dt.date(2024, 5, 1), dt.datetime(2024, 5, 3, 14, 0), "h")
+    sql, params = stops_query({}, key)
+    assert "[month] >= :k_month" in sql.text
+    assert (params["k_month"], params["k_at"], params["k_hash"]) == key
@@ -0,0 +1,49 @@
+# tests/test_load_harness.py
+import json
+import threading
+import requests
+import stomp
+from benchmarks.fake_police_api import FakePoliceApi
+from benchmarks.stub_broker import StubBroker
+
+class _Collect(stomp.ConnectionListener):
+    def __init__(self):
+        self.frames, self.got = [], threading.Event()
+
+    def on_message(self, frame):
+        self.frames.append(frame)
+        self.got.set()
+
+def test_stub_broker_delivers_acks_and_redelivers_on_nack():
+    sent = []
+    broker = StubBroker(on_send=lambda d, h, b: sent.append(d)).start()
+    try:
+        conn = stomp.Connection12([broker.address])
+        listener = _Collect()
+        conn.set_listener("t", listener)
+        conn.connect("u", "p", wait=True)
+        conn.subscribe("/queue/jobs", id="s1", ack="client-individual")
+        conn.send("/queue/jobs", json.dumps({"force": "kent"}))
+        assert listener.got.wait(5)
+        first = listener.frames[0]
+        assert json.loads(first.body) == {"force": "kent"}
+
+        listener.got.clear()
+        conn.nack(first.headers["ack"])
+        assert listener.got.wait(5) and listener.frames[1].body == first.body
+        conn.ack(listener.frames[1].headers["ack"])
+        conn.disconnect()
+        assert sent == ["/queue/jobs"] and broker.depth("/queue/jobs") == 0
+    finally:
+        broker.stop()
+
+def test_fake_api_sizes_and_429s():
+    api = FakePoliceApi(records=(5, 50), latency_s=0, seed=3).start()
+    try:
+        r = requests.get(api.url, params={"force": "kent", "date": "2024-05"}, timeout=5)
+        assert r.status_code == 200 and len(r.json()) == api.size_for("kent", "2024-05")
+        api.rate_429 = 1.0
+        assert requests.get(api.url, params={"force": "kent", "date": "2024-05"}, timeout=5).status_code == 429
+        assert api.statuses == {200: 1, 429: 1}
+    finally:
+        api.stop()
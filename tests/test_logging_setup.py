@@ -0,0 +1,111 @@
+# tests/test_logging_setup.py
+import datetime as dt
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import pytest
+from app import logging_setup
+from app.logging_setup import HAS_ORJSON, BatchingSMTPHandler, BoundedQueueHandler, JsonFormatter, SamplingFilter
+
+def _record(msg, level=logging.INFO, name="t"):
+    return logging.makeLogRecord({"name": name, "levelno": level, "levelname": logging.getLevelName(level), "msg": msg})
+
+def test_bounded_queue_overflow_policies():
+    q = queue.Queue(2)
+    h = BoundedQueueHandler(q, overflow="drop_new")
+    for i in range(4):
+        h.emit(_record(f"m{i}"))
+    assert h.dropped == 2 and [q.get_nowait().msg for _ in range(2)] == ["m0", "m1"]
+    # once there is room, the drop is reported before the next record
+    h.emit(_record("m4"))
+    assert [q.get_nowait().msg for _ in range(2)] == ["[logging] Queue full: dropped 2 log record(s)", "m4"]
+
+    q = queue.Queue(2)
+    h = BoundedQueueHandler(q, overflow="drop_oldest")
+    for i in range(4):
+        h.emit(_record(f"m{i}"))
+    assert [q.get_nowait().msg for _ in range(2)] == ["m2", "m3"]
+
+def test_queue_handler_renders_args_and_traceback():
+    q = queue.Queue()
+    h = BoundedQueueHandler(q)
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        rec = logging.getLogger("t").makeRecord("t", logging.ERROR, "f.py", 1, "boom %s", ("x",),
+                                                 exc_info=sys.exc_info())
+    h.emit(rec)
+    out = q.get_nowait()
+    assert out.getMessage() == "boom x" and out.exc_info is None and "ZeroDivisionError" in out.exc_text
+
+def test_smtp_alerts_batched_and_rate_limited(monkeypatch):
+    sent = []
+    monkeypatch.setattr(BatchingSMTPHandler, "_send", lambda self, records, suppressed: sent.append(
+        (len(records), threading.current_thread() is threading.main_thread())))
+    h = BatchingSMTPHandler(("localhost", 1025), "a@local", ["b@local"], "alert",
+                            batch_seconds=3600, batch_size=3, max_per_hour=1)
+    for i in range(3):
+        h.emit(_record(f"e{i}", logging.ERROR))
+    deadline = time.monotonic() + 2
+    while not sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sent == [(3, False)]  # batch_size reached: one mail for three records, sent off the caller's thread
+    h.emit(_record("e3", logging.ERROR))
+    h.flush()
+    assert len(sent) == 1 and len(h.buffer) == 1  # over the hourly limit: held back
+    h._timer.cancel()
+
+def test_smtp_full_buffer_over_limit_keeps_one_timer(monkeypatch):
+    monkeypatch.setattr(BatchingSMTPHandler, "_send", lambda self, records, suppressed: None)
+    h = BatchingSMTPHandler(("localhost", 1025), "a@local", ["b@local"], "alert",
+                            batch_seconds=3600, batch_size=2, max_per_hour=1, max_buffer=2)
+    h.sent_at = [time.monotonic()]  # hourly cap already used
+    h.emit(_record("e0", logging.ERROR))
+    timer = h._timer
+    for i in range(1, 50):
+        h.emit(_record(f"e{i}", logging.ERROR))
+    assert h._timer is timer and h._due - time.monotonic() > 3500  # waits for the window, not re-armed per record
+    assert len(h.buffer) == 2 and h.suppressed == 48
+    timer.cancel()
+
+def test_setup_logging_runs_handlers_on_listener(tmp_path):
+    path = tmp_path / "app.log"
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    try:
+        logging_setup.setup_logging(app="t", use_stream=False, filename=str(path), use_concurrent_file_handler=False)
+        assert [type(h) for h in root.handlers] == [BoundedQueueHandler]
+        logging.getLogger("t").warning("queued %d", 1)
+        logging_setup._stop_listener()
+        assert "queued 1" in path.read_text()
+    finally:
+        logging_setup._stop_listener()
+        root.handlers[:] = saved[0]
+        root.setLevel(saved[1])
+
+@pytest.mark.parametrize("use_orjson", [False, True] if HAS_ORJSON else [False])
+def test_json_formatter_fields(use_orjson):
+    f = JsonFormatter(extra_static={"app": "police-tracker", "env": "Test"}, use_orjson=use_orjson)
+    rec = _record("rows=%d")
+    rec.args, rec.rows, rec.when, rec._private = (3,), 3, dt.date(2024, 5, 1), 1
+    out = json.loads(f.format(rec))
+    assert out["msg"] == "rows=3" and out["logger"] == "t" and out["level"] == "INFO"
+    assert out["rows"] == 3 and out["when"] == "2024-05-01" and "_private" not in out
+    assert out["app"] == "police-tracker" and out["env"] == "Test"
+    assert json.loads(JsonFormatter().format(_record("x")))["msg"] == "x"
+
+def test_sampling_and_rate_limit_per_logger():
+    f = SamplingFilter(sample={"app.worker.jobs": 0.25}, rate_limit={"app.producer": 2})
+    kept = [f.filter(_record(str(i), name="app.worker.jobs")) for i in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    assert f.filter(_record("warn", logging.WARNING, "app.worker.jobs"))
+    assert all(f.filter(_record("other", name="app.etl")) for _ in range(5))
+
+    burst = [f.filter(_record("enq", name="app.producer.jobs")) for _ in range(5)]
+    assert burst == [True, True, False, False, False]
+    f._tokens["app.producer"] = (2, 0.0)  # refill
+    rec = _record("enq", name="app.producer.jobs")
+    assert f.filter(rec) and rec.suppressed == 3
@@ -0,0 +1,69 @@
+# tests/test_singleflight.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from app.singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_computation():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"count": 42}
+
+    async def main():
+        sf = SingleFlight()
+        results = await asyncio.gather(*(sf.do(("gold", "metropolitan", "2024-05"), load) for _ in range(20)))
+        assert len(sf) == 0
+        return results
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r == {"count": 42} for r, _ in results)
+    assert sum(shared for _, shared in results) == 19
+
+def test_errors_propagate_to_all_waiters():
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def main():
+        sf = SingleFlight()
+        return await asyncio.gather(*(sf.do("k", boom) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+
+def test_task_is_cancelled_only_when_last_waiter_leaves():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    class _Gone:
+        async def is_disconnected(self):
+            return True
+
+    async def main():
+        sf = SingleFlight()
+        a = asyncio.ensure_future(sf.do("k", slow))
+        b = asyncio.ensure_future(sf.do("k", slow))
+        await asyncio.sleep(0.01)
+        a.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled and len(sf) == 1      # b still waits on it
+        with pytest.raises(HTTPException) as e:
+            await sf.do("k", slow, request=_Gone())
+        assert e.value.status_code == 499 and not cancelled
+        b.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled == [1] and len(sf) == 0   # last waiter gone: query cancelled
+        # a later caller starts a fresh flight rather than joining the cancelled one
+        assert await sf.do("k", lambda: asyncio.sleep(0, result=7)) == (7, False)
+
+    asyncio.run(main())
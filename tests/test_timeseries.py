@@ -0,0 +1,40 @@
+# tests/test_timeseries.py
+import datetime as dt
+import pytest
+from app.timeseries import date_series, hour_of_week_series, month_bounds
+
+ROWS = [
+    {"stop_date": dt.date(2024, 2, 1), "count": 3},   # Thursday
+    {"stop_date": "2024-02-05", "count": 2},           # Monday, as some drivers return it
+    {"stop_date": dt.date(2024, 3, 31), "count": 1},
+]
+
+def test_month_bounds_handles_december_and_leap_years():
+    assert month_bounds("2024-02", "2024-02") == (dt.date(2024, 2, 1), dt.date(2024, 2, 29))
+    assert month_bounds("2023-11", "2023-12") == (dt.date(2023, 11, 1), dt.date(2023, 12, 31))
+
+def test_month_bounds_rejects_out_of_range_years_and_wide_ranges():
+    assert month_bounds("9998-01", "9998-12")[1] == dt.date(9998, 12, 31)
+    for start, end in (("2024-01", "9999-12"), ("0000-01", "2024-01")):
+        with pytest.raises(ValueError):
+            month_bounds(start, end)
+    assert month_bounds("2015-01", "2024-12", max_months=120)[0] == dt.date(2015, 1, 1)
+    with pytest.raises(ValueError):
+        month_bounds("2014-12", "2024-12", max_months=120)
+
+def test_date_series_zero_fills_each_grain():
+    first, last = month_bounds("2024-02", "2024-03")
+    days = date_series(ROWS, first, last, "day")
+    assert len(days) == 29 + 31 and days[0] == {"period": "2024-02-01", "count": 3} and days[1]["count"] == 0
+
+    weeks = date_series(ROWS, first, last, "week")
+    assert weeks[0] == {"period": "2024-01-29", "count": 3}  # week containing 1 Feb starts Monday 29 Jan
+    assert weeks[1] == {"period": "2024-02-05", "count": 2}
+
+    months = date_series(ROWS, first, last, "month")
+    assert months == [{"period": "2024-02-01", "count": 5}, {"period": "2024-03-01", "count": 1}]
+
+def test_hour_of_week_series_has_every_bucket():
+    series = hour_of_week_series([{"dow": 1, "hour": 0, "count": 4}, {"dow": 7, "hour": 23, "count": 2}])
+    assert len(series) == 168
+    assert series[0] == {"dow": 1, "hour": 0, "count": 4} and series[-1] == {"dow": 7, "hour": 23, "count": 2}
@@ -0,0 +1,54 @@
+# tests/test_tracing.py
+import json
+import pytest
+from app import tracing
+from app.metrics import STAGE_SECONDS
+from app.tracing import job_trace, span
+
+def _count(stage, force):
+    return STAGE_SECONDS.labels(stage=stage, force=force)._sum.get(), \
+        sum(b.get() for b in STAGE_SECONDS.labels(stage=stage, force=force)._buckets)
+
+def test_spans_feed_histogram_and_trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces" / "jobs.jsonl"
+    monkeypatch.setattr(tracing.settings, "trace_file", str(path))
+    _, before = _count("decode", "test-force")
+
+    with job_trace("test-force", "2024-05", message_id="m-1") as trace:
+        with span("fetch") as s:
+            with span("http_request", attempt=0):
+                pass
+            s["bytes"] = 123
+        with span("decode"):
+            pass
+        trace.attrs["rows"] = 7
+
+    with pytest.raises(ValueError):
+        with job_trace("test-force", "2024-06"):
+            with span("silver_merge"):
+                raise ValueError("boom")
+
+    assert _count("decode", "test-force")[1] == before + 1
+    ok, failed = [json.loads(line) for line in path.read_text().splitlines()]
+    assert ok["status"] == "ok" and ok["rows"] == 7 and ok["message_id"] == "m-1"
+    assert [(s["stage"], s["parent"]) for s in ok["spans"]] == [
+        ("http_request", "fetch"), ("fetch", None), ("decode", None)
+    ]
+    assert ok["spans"][1]["bytes"] == 123
+    assert failed["status"] == "error" and failed["spans"][0]["error"] is True
+
+def test_span_outside_job_only_records_metric(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing.settings, "trace_file", str(tmp_path / "t.jsonl"))
+    with span("gold_refresh", "other-force"):
+        pass
+    assert _count("gold_refresh", "other-force")[1] == 1
+    assert not (tmp_path / "t.jsonl").exists()
+
+def test_unwritable_trace_file_does_not_change_job_outcome(tmp_path, monkeypatch):
+    (tmp_path / "not-a-dir").write_text("")
+    monkeypatch.setattr(tracing.settings, "trace_file", str(tmp_path / "not-a-dir" / "t.jsonl"))
+    with job_trace("test-force", "2024-05"):
+        pass
+    with pytest.raises(ValueError):
+        with job_trace("test-force", "2024-06"):
+            raise ValueError("boom")
@@ -1,5 +1,6 @@
 # tests/test_transform.py
 import datetime as dt
+from app.etl import silver_payload
 from app.transform import to_silver_rows
 
 def test_to_silver_rows_happy_path():
@@ -32,3 +33,14 @@ def test_to_silver_rows_happy_path():
     assert r["object_of_search"] == "Controlled drugs"
     assert r["street_name"] == "Whitehall"
     assert r["month"] == dt.date(2024, 5, 1)
+
+def test_stop_date_is_uk_local_day_and_reaches_silver_payload():
+    payload = [
+        {"datetime": "2024-06-30T23:30:00+00:00"},  # 00:30 BST on 1 July
+        {"datetime": "2024-01-31T23:30:00+00:00"},  # GMT: same day
+        {"datetime": "2024-07-01T00:30:00+01:00"},  # offset in the source
+        {"datetime": None},
+    ]
+    rows = silver_payload("metropolitan", dt.date(2024, 6, 1), to_silver_rows("metropolitan", "2024-06", payload))
+    assert [r["stop_date"] for r in rows] == [dt.date(2024, 7, 1), dt.date(2024, 1, 31), dt.date(2024, 7, 1), None]
+    assert rows[2]["stop_datetime"] == dt.datetime(2024, 6, 30, 23, 30)  # stored as UTC
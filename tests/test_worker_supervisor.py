@@ -0,0 +1,63 @@
+# tests/test_worker_supervisor.py
+import sys
+import time
+
+from prometheus_client import CollectorRegistry, multiprocess
+from app.worker_supervisor import CHILD_ENV, MULTIPROC_ENV, Supervisor, child_env, child_log_filename
+
+_COUNTING_CHILD = """
+import os, time
+from prometheus_client import Counter
+Counter("police_jobs_total", "jobs", ["status"]).labels(status="ok").inc(int(os.environ["WORKER_CHILD_INDEX"]) + 1)
+time.sleep(30)
+"""
+
+def _wait(cond, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return cond()
+
+def test_child_env_splits_rate_limit_across_children():
+    env = child_env(2, 4, api_rps=2.0, api_burst=4, base={"MQ_HOST": "activemq"})
+    assert env[CHILD_ENV] == "2" and env["MQ_HOST"] == "activemq"
+    assert float(env["API_RPS"]) == 0.5 and env["API_BURST"] == "1"
+    assert child_env(0, 8, api_rps=2.0, api_burst=4, base={})["API_BURST"] == "1"
+
+def test_processes_capped_at_burst_and_logs_per_child(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_ENV, str(tmp_path))
+    assert Supervisor(8, api_rps=2, api_burst=4).processes == 4  # 8 children x burst 1 would be 8 > 4
+    assert Supervisor(3, api_rps=2, api_burst=0).processes == 1
+    monkeypatch.delenv(CHILD_ENV, raising=False)
+    assert child_log_filename("logs/police-tracker.log") == "logs/police-tracker.log"
+    monkeypatch.setenv(CHILD_ENV, "2")
+    assert child_log_filename("logs/police-tracker.log") == "logs/police-tracker.worker-2.log"
+
+def test_crashing_child_is_restarted_with_backoff(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_ENV, str(tmp_path))
+    sup = Supervisor(1, api_rps=2, api_burst=4, command=[sys.executable, "-c", "raise SystemExit(3)"],
+                     min_backoff=0.05, max_backoff=0.2)
+    sup.start()
+    try:
+        assert _wait(lambda: (sup.poll(), sup.children[0].restarts >= 3)[1])
+    finally:
+        sup.stop()
+    child = sup.children[0]
+    assert child.exits[:3] == [3, 3, 3]
+    assert 0.05 <= child.backoff <= 0.2
+    assert child.proc is None
+
+def test_children_metrics_are_aggregated_and_stop_terminates(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_ENV, str(tmp_path / "stale"))
+    (tmp_path / "stale").mkdir()
+    (tmp_path / "stale" / "counter_1.db").write_bytes(b"stale")
+    sup = Supervisor(2, api_rps=2, api_burst=4, command=[sys.executable, "-c", _COUNTING_CHILD])
+    assert not (tmp_path / "stale" / "counter_1.db").exists()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=sup.metrics_dir)
+    sup.start()
+    try:
+        assert _wait(lambda: registry.get_sample_value("police_jobs_total", {"status": "ok"}) == 3.0)
+    finally:
+        sup.stop(timeout=5)
+    assert all(c.proc is None and c.restarts == 0 for c in sup.children)